@@ -1,5 +1,7 @@
 from   .tab import *
 
-from   . import fn
+from   . import fn, pred
+from   .builder import TableBuilder
 from   .groupby import GroupBy
+from   .strarr import StrArray
 
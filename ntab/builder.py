@@ -0,0 +1,81 @@
+"""
+Incremental construction of tables.
+"""
+
+#-------------------------------------------------------------------------------
+
+from   . import nplib
+from   .tab import Table
+
+#-------------------------------------------------------------------------------
+
+class TableBuilder:
+    """
+    Builds a table by appending records and tables.
+
+      >>> builder = TableBuilder()
+      >>> builder.append(x=1, y=2.5)
+      >>> builder.append_rows([dict(x=2, y=3.5), dict(x=3)])
+      >>> builder.append_table(Table(x=[4], y=[4.5]))
+      >>> tab = builder.finish()
+      >>> tab.a.x
+      array([1, 2, 3, 4])
+      >>> tab.a.y
+      array([2.5, 3.5, nan, 4.5])
+
+    Rows are accumulated in chunks, which are allocated as needed and
+    concatenated once by `finish()`.  A column's dtype is inferred from its
+    first value.  Values missing from records are filled with the dtype's
+    default, as given by `nplib.default_for_dtype`.
+    """
+
+    def __init__(self, size_hint=1024, growth=1.25):
+        """
+        :param size_hint:
+          The number of rows to allocate initially.
+        :param growth:
+          The factor by which allocated space grows; unused allocated space is
+          at most `growth - 1` times the number of rows.
+        """
+        self.__acc = nplib.RecAccumulator(size_hint, growth)
+
+
+    def __len__(self):
+        return len(self.__acc)
+
+
+    @property
+    def num_rows(self):
+        return len(self.__acc)
+
+
+    def append(self, **rec):
+        """
+        Appends a row, given as keyword arguments.
+        """
+        self.__acc.append(**rec)
+
+
+    def append_rows(self, recs):
+        """
+        Appends rows from an iterable of mappings from names to values.
+        """
+        self.__acc.extend(recs)
+
+
+    def append_table(self, tab):
+        """
+        Appends the rows of a table.  Its arrays are copied.
+        """
+        self.__acc.append_arrs(tab.arrs)
+
+
+    def finish(self):
+        """
+        Returns the table of all rows appended, and resets the builder.
+        """
+        # The arrays are new and of equal lengths.
+        return Table.wrap(self.__acc.pop_arrays(), check=False)
+
+
+
@@ -1,6 +1,7 @@
 import numpy as np
 
-from   .lib import container
+from   . import nplib, pred
+from   .lib import container, tupleize
 from   .tab import Table
 
 #-------------------------------------------------------------------------------
@@ -21,7 +22,7 @@ def concat(*tabs):
 
     # Collect and concatenate arrays.
     return Table(
-        (n, np.concatenate([ t.arrs[n] for t in tabs ]))
+        (n, nplib.concat([ t.arrs[n] for t in tabs ]))
         for n in dtypes
     )
         
@@ -54,6 +55,34 @@ def rename(tab, *args, **kw_args):
         tab.arrs[str(new)] = tab.arrs.pop(old)
 
 
+# Number of rows in each block when evaluating predicates.
+FILTER_BLOCK_ROWS = 65536
+
+# Approximate number of rows sampled to estimate predicate selectivity.
+FILTER_SAMPLE_ROWS = 1024
+
+def _order_predicates(preds, length):
+    """
+    Orders `(arr, predicate)` pairs cheapest and most selective first.
+
+    The selectivity of each predicate is estimated from an evenly spaced
+    sample of rows.
+    """
+    if len(preds) < 2:
+        return preds
+
+    step = max(1, length // FILTER_SAMPLE_ROWS)
+
+    def rank(item):
+        arr, p = item
+        sample = arr[:: step]
+        passed = p.mask(sample).mean() if len(sample) > 0 else 0
+        # Cost per row eliminated.
+        return p.cost(arr) / max(1 - passed, 1e-3)
+
+    return sorted(preds, key=rank)
+
+
 def filter_mask(tab, **selections):
     """
     Constructs a mask from selections of array values.
@@ -61,20 +90,145 @@ def filter_mask(tab, **selections):
       >>> tab = Table(x=[1, 2, 1, 2], y=[3, 4, 5, 6])
       >>> filter_mask(tab, x=2)
       array([False,  True, False,  True])
+      >>> filter_mask(tab, x=pred.Ne(2), y=pred.Between(4, 6))
+      array([False, False,  True, False])
+
+    Predicates are evaluated a block of rows at a time, cheapest and most
+    selective first; the rest are skipped for a block once no rows in it
+    remain.
 
     :keywords:
-      Names and values specifying specific values of arrays to select.
+      Names and values or `pred.Predicate` instances specifying values of
+      arrays to select.
     :return:
       A boolean mask.
     """
-    mask = None
+    length = tab.num_rows
+    preds = _order_predicates(
+        [ (tab.arrs[n], pred.as_predicate(v)) for n, v in selections.items() ],
+        length
+    )
+
+    mask = np.ones(length, dtype=bool)
+    if len(preds) == 0:
+        return mask
+
+    (arr0, pred0), *rest = preds
+    scratch = np.empty(min(length, FILTER_BLOCK_ROWS), dtype=bool)
+    for start in range(0, length, FILTER_BLOCK_ROWS):
+        stop = min(start + FILTER_BLOCK_ROWS, length)
+        out = mask[start : stop]
+        pred0(arr0[start : stop], out)
+        for arr, p in rest:
+            if not out.any():
+                break
+            buf = scratch[: stop - start]
+            p(arr[start : stop], buf)
+            out &= buf
+
+    return mask
+
+
+def _equality_value(value):
+    """
+    Returns the value selected by an equality selection, else the predicate.
+    """
+    return value.value if isinstance(value, pred.Eq) else value
+
+
+def _without_missing(arr):
+    """
+    Returns sorted `arr` without its NaN or NaT values, which sort last.
+    """
+    kind = arr.dtype.kind if isinstance(arr, np.ndarray) else None
+    if kind == "f":
+        return arr[: arr.searchsorted(np.nan)]
+    elif kind in ("m", "M"):
+        return arr[: arr.searchsorted(np.array("NaT", dtype=arr.dtype))]
+    else:
+        return arr
+
+
+def _search_sorted(tab, selections):
+    """
+    Selects rows by values of the columns by which `tab` is sorted.
+
+    Equality selections on a leading subsequence of the sort columns, and
+    optionally a `pred.Between` on the next sort column, select a contiguous
+    range of rows, which is found by binary search.
+
+    :return:
+      `start, stop, rest`, where `rest` are the remaining selections.
+    """
+    start, stop = 0, tab.num_rows
+    rest = dict(selections)
+    for name in tab.sorted_by:
+        if name not in rest:
+            break
+        value = _equality_value(rest[name])
+        if isinstance(value, pred.Between):
+            del rest[name]
+            arr = _without_missing(tab.arrs[name][start : stop])
+            lo, hi = value.lo, value.hi
+            start, stop = (
+                start + (0 if lo is None else arr.searchsorted(lo, "left")),
+                start + (len(arr) if hi is None else arr.searchsorted(hi, "left")),
+            )
+            break
+        if isinstance(value, pred.Predicate):
+            break
+        del rest[name]
+        arr = _without_missing(tab.arrs[name][start : stop])
+        start, stop = (
+            start + arr.searchsorted(value, "left"),
+            start + arr.searchsorted(value, "right"),
+        )
+    return start, stop, rest
+
+
+def _select_idxs(tab, selections):
+    """
+    Selects rows by array values, using sort order, an index, or a cached
+    grouping if available.
+
+    :return:
+      A slice of the selected rows, indices of them, or a boolean mask.
+    """
+    start, stop, rest = _search_sorted(tab, selections)
+    if len(rest) < len(selections):
+        if len(rest) == 0:
+            return slice(start, stop)
+        # Check remaining selections only for these rows.
+        idxs, = filter_mask(tab.rows[start : stop], **rest).nonzero()
+        return start + idxs
+
     for name, value in selections.items():
-        arr = tab.arrs[name]
-        if mask is None:
-            mask = arr == value
+        value = _equality_value(value)
+        if isinstance(value, pred.Predicate):
+            continue
+        index = tab._peek_cached("index", name)
+        if index is not None:
+            idxs = index.get(value)
         else:
-            mask[mask] &= arr[mask] == value
-    return mask
+            grouping = tab._peek_cached("argunique", name)
+            if grouping is None:
+                continue
+
+            order, unique, edge = grouping
+            i = np.searchsorted(unique, value)
+            if i < len(unique) and unique[i] == value:
+                idxs = order[edge[i] : edge[i + 1]]
+            else:
+                idxs = order[: 0]
+
+        # Check remaining selections only for these rows.
+        for other, value in selections.items():
+            if other != name:
+                p = pred.as_predicate(value)
+                idxs = idxs[p.mask(tab.arrs[other][idxs])]
+        return idxs
+
+    return filter_mask(tab, **selections)
 
 
 def filter(tab, **selections):
@@ -90,7 +244,7 @@ def filter(tab, **selections):
       <BLANKLINE>
 
     """
-    return tab.rows[filter_mask(tab, **selections)]
+    return tab.rows[_select_idxs(tab, selections)]
 
 
 def find(tab, **selections):
@@ -102,7 +256,11 @@ def find(tab, **selections):
       Row(2, x=1, y=5)
 
     """
-    idx = filter_mask(tab, **selections).nonzero()[0]
+    idx = _select_idxs(tab, selections)
+    if isinstance(idx, slice):
+        idx = np.arange(idx.start, idx.stop)
+    elif idx.dtype == bool:
+        idx, = idx.nonzero()
     if len(idx) == 0:
         raise LookupError("no item")
     elif len(idx) == 1:
@@ -111,6 +269,38 @@ def find(tab, **selections):
         raise LookupError("multiple items")
 
 
+def select_range(tab, name, lo=None, hi=None):
+    """
+    Selects a subtable of rows whose values of `name` are in `[lo, hi)`.
+
+      >>> tab = Table(t=[1, 3, 4, 6, 8], x=[3, 4, 5, 6, 7])
+      >>> tab.sort_by("t")
+      >>> select_range(tab, "t", 3, 6).a.x
+      array([4, 5])
+
+    If `tab` is sorted by `name`, rows are located by binary search, and the
+    subtable is a view of `tab`; otherwise, the column is scanned.
+
+    :param lo:
+      The inclusive lower bound, or `None` for no bound.
+    :param hi:
+      The exclusive upper bound, or `None` for no bound.
+    """
+    arr = tab.arrs[name]
+    if tab.sorted_by[: 1] == (name, ):
+        arr = _without_missing(arr)
+        start = 0 if lo is None else arr.searchsorted(lo, "left")
+        stop = len(arr) if hi is None else arr.searchsorted(hi, "left")
+        return tab.rows[start : max(start, stop)]
+
+    mask = np.ones(len(arr), dtype=bool)
+    if lo is not None:
+        mask &= arr >= lo
+    if hi is not None:
+        mask &= arr < hi
+    return tab.rows[mask]
+
+
 def get_const(tab):
     """
     Finds cols in `tab` whose values are constant (same everywhere).
@@ -147,3 +337,508 @@ def remove_const(tab):
     return const
 
 
+#-------------------------------------------------------------------------------
+# Sorting
+
+def _descending_flags(descending, num):
+    """
+    Returns a tuple of `num` descending flags.
+    """
+    if isinstance(descending, (bool, np.bool_)):
+        return (bool(descending), ) * num
+    descending = tuple( bool(d) for d in descending )
+    if len(descending) != num:
+        raise ValueError(f"expected {num} descending flags")
+    return descending
+
+
+def _sort_order(tab, names, descending):
+    """
+    Returns the stable order that sorts `tab` by columns `names`.
+    """
+    if any(descending):
+        return nplib.argsort_keys([ tab.arrs[n] for n in names ], descending)
+    else:
+        # Use the same cached grouping as `Table.sort_by`.
+        key = names[0] if len(names) == 1 else names
+        order, _, _ = tab._get_cached(
+            "argunique", key,
+            nplib.argunique if len(names) == 1 else nplib.argunique_keys
+        )
+        return order
+
+
+def sort(tab, *names, descending=False):
+    """
+    Returns a table of the rows of `tab` sorted by one or more columns.
+
+      >>> tab = Table(x=[2, 1, 2, 1], y=[5, 6, 7, 8])
+      >>> sort(tab, "x", "y", descending=[False, True]).a.y
+      array([8, 6, 7, 5])
+
+    Rows are sorted by the first column, then by the second column among rows
+    with equal values in the first, and so on.  The sort is stable, also for
+    descending columns.  Unlike `Table.sort_by`, `tab` is not modified.
+
+    If all columns are ascending, the result records that it is sorted by
+    them, and the sort order is cached in `tab`, so sorting it again by the
+    same columns costs only gathering the rows.
+
+    :param descending:
+      True to sort by all columns in descending order, or a sequence of
+      flags, one for each column.
+    """
+    if len(names) == 0:
+        raise TypeError("no names given")
+    names = tuple( str(n) for n in names )
+    descending = _descending_flags(descending, len(names))
+    order = _sort_order(tab, names, descending)
+    return tab._take_rows(order, () if any(descending) else names)
+
+
+def _rank_masks(arr, kth, largest):
+    """
+    Compares values to `kth`, in ascending order with NaN and NaT last.
+
+    :return:
+      `better, tied`, masks of values that sort after `kth`, or before it if
+      not `largest`, and of values that sort equal to it.
+    """
+    missing = _is_missing(arr)
+    if _is_missing(np.array([kth]))[0]:
+        tied = missing
+        better = np.zeros(len(arr), dtype=bool) if largest else ~missing
+    else:
+        tied = arr == kth
+        better = (arr > kth) | missing if largest else arr < kth
+    return better, tied
+
+
+def _top_k_idxs(arr, k, largest):
+    """
+    Returns the indices of the top `k` values of `arr`, in order.
+    """
+    n = len(arr)
+    candidates = np.arange(n)
+    if k == 0:
+        return candidates[: 0]
+    elif k < n:
+        # Find the k'th value by partitioning, which is linear time.
+        i = n - k if largest else k - 1
+        try:
+            kth = np.partition(arr, i)[i]
+        except TypeError:
+            # Not orderable by partition; sort all values.
+            pass
+        else:
+            better, tied = _rank_masks(arr, kth, largest)
+            better, = better.nonzero()
+            tied, = tied.nonzero()
+            # Break ties by row order.
+            candidates = np.sort(
+                np.concatenate((better, tied[: k - len(better)])))
+
+    order = nplib.argsort_keys([arr[candidates]], [largest])
+    return candidates[order[: k]]
+
+
+# Min mean group size for which `top_k` partitions each group separately,
+# rather than sorting all rows by group and value.
+TOP_K_MIN_GROUP_ROWS = 1024
+
+def top_k(tab, name, k, by=None, largest=True):
+    """
+    Returns the `k` rows with the largest values of `name`, in descending
+    order.
+
+      >>> tab = Table(g=[1, 1, 2, 1, 2], x=[3, 9, 4, 6, 1])
+      >>> top_k(tab, "x", 2).a.x
+      array([9, 6])
+      >>> top_k(tab, "x", 2, by="g").a.x
+      array([9, 6, 4, 1])
+
+    The result is the first `k` rows of `sort(tab, name, descending=True)`,
+    but the rows are selected by partitioning, so only they are sorted.
+
+    :param by:
+      A column name or sequence of column names.  If given, selects the top
+      `k` rows in each group of rows with the same values of these columns,
+      ordered by group and then by `name`.
+    :param largest:
+      If false, selects the rows with the smallest values, in ascending order.
+    """
+    if k < 0:
+        raise ValueError(f"negative k: {k}")
+    arr = tab.arrs[name]
+    if not isinstance(arr, np.ndarray):
+        # An array type such as `StrArray`.  Its sorted codes rank its values.
+        arr, _ = nplib.factorize(arr)
+    if by is None:
+        idxs = _top_k_idxs(arr, min(k, len(arr)), largest)
+        return tab._take_rows(idxs, () if largest else (name, ))
+
+    by = tuple( str(n) for n in tupleize(by) )
+    order, _, edge = tab._get_cached(
+        "argunique", by[0] if len(by) == 1 else by,
+        nplib.argunique if len(by) == 1 else nplib.argunique_keys
+    )
+    counts = np.diff(edge)
+    if len(counts) * TOP_K_MIN_GROUP_ROWS <= len(arr):
+        # Few large groups; partition each separately.
+        vals = nplib.take(arr, order)
+        idxs = np.concatenate([order[: 0]] + [
+            order[i0 : i1][_top_k_idxs(vals[i0 : i1], min(k, i1 - i0), largest)]
+            for i0, i1 in zip(edge[: -1], edge[1 :])
+        ])
+        return tab._take_rows(idxs, by if largest else by + (name, ))
+
+    # Sort by group and then value, and take the first k rows of each group.
+    codes = np.empty(len(arr), dtype=np.intp)
+    codes[order] = np.repeat(np.arange(len(counts)), counts)
+    order = nplib.argsort_keys([codes, arr], [False, largest])
+    rank = np.arange(len(arr)) - np.repeat(edge[: -1], counts)
+    return tab._take_rows(order[rank < k], by if largest else by + (name, ))
+
+
+#-------------------------------------------------------------------------------
+# Joins
+
+JOIN_HOWS = ("inner", "left", "outer", "semi", "anti")
+
+def _group_sorted(arr):
+    """
+    Groups a sorted array, as `nplib.argunique` does, without sorting it.
+    """
+    starts, = np.concatenate(([True], arr[1 :] != arr[: -1])).nonzero()
+    return (
+        np.arange(len(arr)),
+        arr[starts],
+        np.concatenate((starts, [len(arr)])),
+    )
+
+
+def _join_groups(left, right, names):
+    """
+    Groups the rows of `right` by join key, and matches `left` to the groups.
+
+    If `right` is already grouped or sorted by a single key column, the left
+    keys may be located among its groups by binary search.  This is done if
+    the left keys are sorted too, or if there are few enough of them.
+    Otherwise, the keys of both tables are factorized together.
+
+    :return:
+      `codes, order, edge`, where `codes` gives the group of each row of
+      `left`, or -1 if the key doesn't occur in `right`; and `order, edge`
+      locate each group's rows in `right`, as for `nplib.argunique`.
+    """
+    grouping = None
+    if len(names) == 1:
+        name, = names
+        grouping = right._peek_cached("argunique", name)
+        if grouping is None and right.sorted_by[: 1] == names:
+            grouping = _group_sorted(right.arrs[name])
+        if grouping is not None and left.sorted_by[: 1] != names:
+            # Binary search for unsorted keys costs roughly an eighth as much
+            # per step as factorization costs per row.
+            steps = np.log2(len(grouping[1]) + 1)
+            if left.num_rows * steps > 8 * (left.num_rows + right.num_rows):
+                grouping = None
+
+    if grouping is not None:
+        order, unique, edge = grouping
+        if len(unique) == 0:
+            return np.full(left.num_rows, -1), order, np.zeros(1, dtype=int)
+        keys = left.arrs[name]
+        codes = np.searchsorted(unique, keys)
+        codes[codes == len(unique)] = 0
+        codes[unique[codes] != keys] = -1
+        return codes, order, edge
+
+    else:
+        codes, num = nplib.factorize_keys([
+            np.concatenate((left.arrs[n], right.arrs[n])) for n in names ])
+        order, edge = nplib.argsort_codes(codes[left.num_rows :], num)
+        codes = codes[: left.num_rows]
+        # Factorizing merges NaNs, but like binary search, a NaN or NaT key
+        # should match nothing.
+        for name in names:
+            codes[_is_missing(left.arrs[name])] = -1
+        return codes, order, edge
+
+
+def _gather(tab, names, idxs):
+    """
+    Gathers columns `names` of `tab`, filling in defaults for -1 indices.
+    """
+    arrs = { n: tab.arrs[n] for n in names }
+    if (idxs < 0).any():
+        return { n: nplib.take_fill(a, idxs) for n, a in arrs.items() }
+    else:
+        return nplib.take_arrs(arrs, idxs)
+
+
+def join(left, right, on, how="inner"):
+    """
+    Joins two tables on equal values of key columns.
+
+      >>> left = Table(k=[1, 2, 3], x=[4, 5, 6])
+      >>> right = Table(k=[3, 1, 1], y=[7, 8, 9])
+      >>> res = join(left, right, "k")
+      >>> res.a.k, res.a.x, res.a.y
+      (array([1, 1, 3]), array([4, 4, 6]), array([8, 9, 7]))
+
+    Result rows are in the order of `left` rows and, for each of these, of
+    matching `right` rows.  Where a row has no match, its columns from the
+    other table are filled with `nplib.default_for_dtype` values.  NaN and NaT
+    keys don't match any key.
+
+    :param on:
+      A key column name, or a sequence of them, in both tables.
+    :param how:
+      `"inner"` for rows with matching keys in both tables.  `"left"` also
+      includes `left` rows with no match, and `"outer"` also includes `right`
+      rows with no match, after all others.  `"semi"` and `"anti"` select
+      `left` rows with and without matches, respectively.
+    :raise ValueError:
+      Both tables have a column with the same name that isn't a key column.
+    """
+    if how not in JOIN_HOWS:
+        raise ValueError(f"unknown how: {how}")
+    names = tupleize(on)
+    codes, order, edge = _join_groups(left, right, names)
+
+    # Locate the matching right rows for each left row.
+    matched = codes >= 0
+    counts = np.zeros(len(codes), dtype=np.intp)
+    starts = np.zeros(len(codes), dtype=np.intp)
+    counts[matched] = np.diff(edge)[codes[matched]]
+    starts[matched] = edge[codes[matched]]
+    matched = counts > 0
+
+    if how == "semi":
+        return left.rows[matched]
+    elif how == "anti":
+        return left.rows[~matched]
+
+    left_names = [ n for n in left.names if n not in names ]
+    right_names = [ n for n in right.names if n not in names ]
+    dup = set(left_names) & set(right_names)
+    if len(dup) > 0:
+        raise ValueError(f"duplicate names: {', '.join(sorted(dup))}")
+
+    if how == "inner":
+        left_idxs = np.repeat(np.arange(len(codes)), counts)
+        right_idxs = order[nplib.expand_ranges(starts, counts)]
+    else:
+        # Unmatched left rows appear once, without a right row.
+        counts = np.maximum(counts, 1)
+        left_idxs = np.repeat(np.arange(len(codes)), counts)
+        pos = nplib.expand_ranges(starts, counts)
+        right_idxs = np.full(len(pos), -1)
+        sel = np.repeat(matched, counts)
+        right_idxs[sel] = order[pos[sel]]
+
+    # Key columns.
+    arrs = { n: nplib.take(left.arrs[n], left_idxs) for n in names }
+
+    if how == "outer":
+        # Append right rows whose keys don't occur in left.
+        hit = np.zeros(len(edge) - 1, dtype=bool)
+        hit[codes[codes >= 0]] = True
+        right_codes = np.empty(len(order), dtype=np.intp)
+        right_codes[order] = np.repeat(np.arange(len(edge) - 1), np.diff(edge))
+        rest, = (~hit[right_codes]).nonzero()
+        for n in names:
+            arrs[n] = nplib.concat((arrs[n], nplib.take(right.arrs[n], rest)))
+        left_idxs = np.concatenate((left_idxs, np.full(len(rest), -1)))
+        right_idxs = np.concatenate((right_idxs, rest))
+
+    arrs.update(_gather(left, left_names, left_idxs))
+    arrs.update(_gather(right, right_names, right_idxs))
+    return Table.wrap(arrs, check=False)
+
+
+
+
+def _is_missing(arr):
+    """
+    Returns a mask of NaN or NaT values.
+    """
+    if arr.dtype.kind in "mM":
+        return np.isnat(arr)
+    elif arr.dtype.kind in "fc":
+        return np.isnan(arr)
+    else:
+        return np.zeros(len(arr), dtype=bool)
+
+
+def _pack_asof_keys(codes, num, vals):
+    """
+    Packs group codes and values into int64 keys that sort by group, then by
+    value.
+    """
+    if vals.dtype.kind in "mM":
+        ints = vals.view(np.int64)
+    elif vals.dtype.kind in "iu" and vals.dtype.itemsize < 8:
+        ints = vals.astype(np.int64)
+    elif vals.dtype.kind == "i":
+        ints = vals
+    else:
+        ints = None
+
+    if ints is not None:
+        valid = ints[~_is_missing(vals)]
+        lo = int(valid.min()) if len(valid) > 0 else 0
+        span = int(valid.max()) - lo + 1 if len(valid) > 0 else 1
+        if num * span < 1 << 62:
+            # Offset the values directly.
+            return codes * span + (ints - lo)
+
+    # Use ranks of the values instead.
+    ranks, unique = nplib.factorize(vals)
+    return codes * len(unique) + ranks
+
+
+def asof_join(left, right, on, by=None, tolerance=None):
+    """
+    Joins each row of `left` to the last row of `right` at or before it.
+
+      >>> trades = Table(t=[2, 5, 9], sym=["a", "b", "a"])
+      >>> quotes = Table(
+      ...     t=[1, 3, 4, 6], sym=["a", "a", "b", "b"], px=[10, 11, 20, 21])
+      >>> asof_join(trades, quotes, "t", by="sym").a.px
+      array([10, 20, 11])
+
+    For each `left` row, the matching `right` row is the one with the greatest
+    value of `on` that is not greater than the `left` row's; of several such
+    rows, the last.  If `by` is given, only rows with equal values of these
+    columns match.  Where a `left` row has no match, columns from `right` are
+    filled with `nplib.default_for_dtype` values, such as `NAT` or NaN.
+
+    The result has the rows of `left`, in order, followed by the columns of
+    `right` other than `on` and `by`.
+
+    :param on:
+      The name of the ordering column, such as a time, in both tables.  NaN
+      and NaT values never match.
+    :param by:
+      A column name, or sequence of column names, to match exactly.
+    :param tolerance:
+      If not `None`, rows match only if the difference in `on` values is no
+      greater than this.
+    :raise ValueError:
+      Both tables have a column with the same name that isn't a key column.
+    """
+    names = () if by is None else tupleize(by)
+    left_on = left.arrs[on]
+    right_on = right.arrs[on]
+    num_left = len(left_on)
+
+    right_names = [ n for n in right.names if n != on and n not in names ]
+    dup = set(left.names) & set(right_names)
+    if len(dup) > 0:
+        raise ValueError(f"duplicate names: {', '.join(sorted(dup))}")
+
+    right_sorted = right.sorted_by[: 1] == (on, )
+    if len(names) > 0:
+        # Pack the group and the `on` value into a single key, so that one
+        # binary search searches within each group.
+        codes, num = nplib.factorize_keys([
+            np.concatenate((left.arrs[n], right.arrs[n])) for n in names ])
+        key = _pack_asof_keys(
+            codes, num, np.concatenate((left_on, right_on)))
+        left_key, right_key = key[: num_left], key[num_left :]
+        if right_sorted:
+            # Grouping stably keeps the values sorted within each group.
+            order, _ = nplib.argsort_codes(codes[num_left :], num)
+        else:
+            order = nplib.argsort_stable(right_key)
+    else:
+        left_key, right_key = left_on, right_on
+        if right_sorted:
+            order = np.arange(len(right_key))
+        else:
+            order = nplib.argsort_stable(right_key)
+
+    order = order[~_is_missing(right_on)[order]]
+    if len(order) == 0:
+        idxs = np.full(num_left, -1)
+    else:
+        # Binary search is much faster for sorted keys.
+        left_order = (
+            np.arange(num_left) if left.sorted_by[: 1] == (on, ) and not names
+            else nplib.argsort_stable(left_key)
+        )
+        pos = np.empty(num_left, dtype=np.intp)
+        pos[left_order] = np.searchsorted(
+            right_key[order], left_key[left_order], "right") - 1
+        idxs = order[pos]
+        # Discard matches in other groups, with missing values, or too far.
+        found = pos >= 0
+        if len(names) > 0:
+            found &= codes[num_left :][idxs] == codes[: num_left]
+        found &= ~_is_missing(left_on)
+        if tolerance is not None:
+            found &= left_on - right_on[idxs] <= tolerance
+        idxs[~found] = -1
+
+    arrs = dict(left.arrs)
+    arrs.update(_gather(right, right_names, idxs))
+    return Table.wrap(arrs, check=False)
+
+
+def interval_join(events, windows, point, start, end):
+    """
+    Joins each event to every window that contains it.
+
+      >>> events = Table(t=[1, 5, 3, 8])
+      >>> windows = Table(t0=[0, 2, 6], t1=[4, 6, 7], w=["x", "y", "z"])
+      >>> res = interval_join(events, windows, "t", "t0", "t1")
+      >>> res.a.t, res.a.w
+      (array([1, 3, 3, 5]), array(['x', 'x', 'y', 'y'], dtype='<U1'))
+
+    A window contains an event if the event's `point` value is in the
+    half-open range `[start, end)` of the window.  Windows may overlap.
+    Events with NaN or NaT points, and windows with missing endpoints, don't
+    match.
+
+    The events are sorted by `point`, and each window's range of events is
+    found by binary search, so the cost is proportional to the number of
+    matches, rather than to the product of the table lengths.
+
+    :param point:
+      The name of the events' column of points.
+    :param start:
+      The name of the windows' column of inclusive starts.
+    :param end:
+      The name of the windows' column of exclusive ends.
+    :return:
+      A table with the columns of `events` followed by the columns of
+      `windows`, with a row for each match.  Rows are in order of window,
+      and for each window, in order of `point`.
+    :raise ValueError:
+      Both tables have a column with the same name.
+    """
+    dup = set(events.names) & set(windows.names)
+    if len(dup) > 0:
+        raise ValueError(f"duplicate names: {', '.join(sorted(dup))}")
+
+    points = events.arrs[point]
+    if events.sorted_by[: 1] == (point, ):
+        order = np.arange(len(points))
+    else:
+        order = nplib.argsort_stable(points)
+    # Missing values sort last; leave them out.
+    order = order[: len(order) - _is_missing(points).sum()]
+    points = points[order]
+
+    starts = points.searchsorted(windows.arrs[start], "left")
+    counts = points.searchsorted(windows.arrs[end], "left") - starts
+    counts[_is_missing(windows.arrs[start]) | _is_missing(windows.arrs[end])] = 0
+    counts = np.maximum(counts, 0)
+
+    event_idxs = order[nplib.expand_ranges(starts, counts)]
+    window_idxs = np.repeat(np.arange(len(counts)), counts)
+    arrs = nplib.take_arrs(dict(events.arrs), event_idxs)
+    arrs.update(nplib.take_arrs(dict(windows.arrs), window_idxs))
+    return Table.wrap(arrs, check=False)
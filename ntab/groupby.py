@@ -1,19 +1,30 @@
+import builtins
 import collections.abc
 import numpy as np
 
 from   .lib import tupleize
 from   . import nplib
+from   .tab import Table
 
 #-------------------------------------------------------------------------------
 
 class Aggregation(object):
     """
     Encapsulates grouped aggregations over an array.
+
+    Values are arranged so that each group is contiguous, in original order.
+    Built-in aggregations are vectorized over all groups at once.
     """
 
     def __init__(self, arr, order, edge):
-        self.__arr      = arr[order]
+        """
+        :param order:
+          The group sort order, or `None` if `arr` is already in group order.
+        """
+        self.__arr      = arr if order is None else arr[order]
         self.__edge     = edge
+        # Start index of each group.
+        self.__start    = edge[: -1]
 
 
     def __call__(self, fn):
@@ -22,8 +33,16 @@ class Aggregation(object):
 
         `fn` takes a single argument, an array of values in a single group.
         It is invoked once for each group.  If a ufunc is given, its special
-        methods are used.
+        methods are used.  If a numpy function with a built-in equivalent is
+        given, such as `np.mean`, the built-in aggregation is used instead.
         """
+        try:
+            name = self.FUNCTIONS[fn]
+        except (KeyError, TypeError):
+            pass
+        else:
+            return getattr(self, name)()
+
         try:
             reduceat = fn.reduceat
         except AttributeError:
@@ -33,34 +52,272 @@ class Aggregation(object):
                 for e0, e1 in zip(self.__edge[: -1], self.__edge[1 :])
             ])
         else:
-            return reduceat(self.__arr, self.__edge)
+            return reduceat(self.__arr, self.__start)
+
+
+    def __reduce(self, ufunc, arr=None, dtype=None):
+        if arr is None:
+            arr = self.__arr
+        return ufunc.reduceat(arr, self.__start, dtype=dtype)
+
+
+    def __broadcast(self, vals):
+        """
+        Repeats a value for each group to each of its elements.
+        """
+        return np.repeat(vals, self.count())
+
+
+    def __is_float(self):
+        return self.__arr.dtype.kind in "fc"
+
+
+    def __valid(self):
+        """
+        Returns a mask of values that aren't NaN.
+        """
+        return ~np.isnan(self.__arr)
+
+
+    def __fill_nan(self, val):
+        return np.where(np.isnan(self.__arr), val, self.__arr)
+
+
+    def __mean_dtype(self):
+        return self.__arr.dtype if self.__is_float() else np.dtype(float)
+
+
+    def count(self):
+        """
+        Returns the number of values in each group.
+        """
+        return np.diff(self.__edge)
+
+
+    def sum(self):
+        arr = self.__arr
+        # Use the same result dtype as `np.sum`, which widens small ints.
+        dtype = np.sum(arr[: 0]).dtype if arr.dtype.kind in "biu" else None
+        return self.__reduce(np.add, dtype=dtype)
+
+
+    def min(self): return self.__reduce(np.minimum)
+    def max(self): return self.__reduce(np.maximum)
+
+
+    def any(self): return self.__reduce(np.logical_or, self.__arr.astype(bool))
+    def all(self): return self.__reduce(np.logical_and, self.__arr.astype(bool))
+
+
+    def mean(self):
+        dtype = self.__mean_dtype()
+        return (self.__reduce(np.add, dtype=dtype) / self.count()).astype(dtype)
+
+
+    def var(self, ddof=0):
+        dev = self.__arr - self.__broadcast(self.mean())
+        dev2 = (dev * dev.conj()).real
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = self.__reduce(np.add, dev2) / (self.count() - ddof)
+        # Dividing by int counts promotes float32.
+        return var.astype(dev2.dtype, copy=False)
+
+
+    def std(self, ddof=0):
+        return np.sqrt(self.var(ddof))
+
+
+    def first(self):
+        return self.__arr[self.__start]
+
+
+    def last(self):
+        return self.__arr[self.__edge[1 :] - 1]
+
+
+    def nunique(self):
+        """
+        Returns the number of distinct values in each group.
+
+        NaNs are counted as a single distinct value.
+        """
+        if len(self.__arr) == 0:
+            return self.count()
+        codes, unique = nplib.factorize(self.__arr)
+        group = self.__broadcast(np.arange(len(self.__start)))
+        # Distinct (group, value) pairs.
+        pairs = np.unique(group * len(unique) + codes)
+        return np.bincount(pairs // len(unique), minlength=len(self.__start))
+
+
+    def __arg(self, vals):
+        """
+        Returns the position in each group of the first value equal to the
+        group's value in `vals`.
+        """
+        vals = self.__broadcast(vals)
+        match = self.__arr == vals
+        if self.__is_float():
+            match |= np.isnan(self.__arr) & np.isnan(vals)
+        idxs, = match.nonzero()
+        return idxs[np.searchsorted(idxs, self.__start)] - self.__start
+
+
+    def argmin(self): return self.__arg(self.min())
+    def argmax(self): return self.__arg(self.max())
+
+
+    def nancount(self):
+        """
+        Returns the number of non-NaN values in each group.
+        """
+        if self.__is_float():
+            return self.__reduce(np.add, self.__valid(), dtype=np.intp)
+        else:
+            return self.count()
+
+
+    def nansum(self):
+        if self.__is_float():
+            return self.__reduce(np.add, self.__fill_nan(0))
+        else:
+            return self.sum()
+
+
+    def __nan_minmax(self, ufunc, fill):
+        vals = self.__reduce(ufunc, self.__fill_nan(fill))
+        # Groups with only NaNs.
+        vals[self.nancount() == 0] = np.nan
+        return vals
 
 
-    def sum(self): return self(np.sum)
-    def min(self): return self(np.min)
-    def max(self): return self(np.max)
+    def nanmin(self):
+        if self.__is_float():
+            return self.__nan_minmax(np.minimum, np.inf)
+        else:
+            return self.min()
+
+
+    def nanmax(self):
+        if self.__is_float():
+            return self.__nan_minmax(np.maximum, -np.inf)
+        else:
+            return self.max()
+
+
+    def nanmean(self):
+        if self.__is_float():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mean = self.nansum() / self.nancount()
+            return mean.astype(self.__arr.dtype, copy=False)
+        else:
+            return self.mean()
+
+
+    def nanvar(self, ddof=0):
+        if self.__is_float():
+            dev = self.__arr - self.__broadcast(self.nanmean())
+            dev2 = np.where(self.__valid(), (dev * dev.conj()).real, 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                var = self.__reduce(np.add, dev2) / (self.nancount() - ddof)
+            return var.astype(dev2.dtype, copy=False)
+        else:
+            return self.var(ddof)
+
+
+    def nanstd(self, ddof=0):
+        return np.sqrt(self.nanvar(ddof))
+
+
+    # Functions with built-in equivalents.
+    # The builtins are shadowed by methods of the same names in this class body.
+    FUNCTIONS = {
+        len             : "count",
+        builtins.sum    : "sum",
+        builtins.min    : "min",
+        builtins.max    : "max",
+        builtins.any    : "any",
+        builtins.all    : "all",
+        np.sum      : "sum",
+        np.min      : "min",
+        np.max      : "max",
+        np.amin     : "min",
+        np.amax     : "max",
+        np.any      : "any",
+        np.all      : "all",
+        np.mean     : "mean",
+        np.var      : "var",
+        np.std      : "std",
+        np.argmin   : "argmin",
+        np.argmax   : "argmax",
+        np.size     : "count",
+        np.nansum   : "nansum",
+        np.nanmin   : "nanmin",
+        np.nanmax   : "nanmax",
+        np.nanmean  : "nanmean",
+        np.nanvar   : "nanvar",
+        np.nanstd   : "nanstd",
+    }
 
 
 
 class GroupBy(collections.abc.Mapping):
+    """
+    Groups rows of a table by the values of one or more key columns.
+
+    If `name` is a single column name, group keys are values of that column.
+    If it is a sequence of names, group keys are tuples of values of those
+    columns.
+    """
 
     def __init__(self, table, name):
         self.__table    = table
-        self.__arr      = table.arrs[name]
+        self.__names    = None if isinstance(name, str) else tupleize(name)
         self.__name     = name
+        # Check that the columns exist.
+        for n in tupleize(name):
+            table.arrs[n]
         self.__cache    = None
+        self.__index    = None
 
 
     @property
     def __argunique(self):
         if self.__cache is None:
-             self.__cache = nplib.argunique(self.__arr)
+            # The table caches the grouping, for reuse by other groupbys.
+            if self.__names is None:
+                self.__cache = self.__table._get_cached(
+                    "argunique", self.__name, nplib.argunique)
+            else:
+                self.__cache = self.__table._get_cached(
+                    "argunique", self.__names, nplib.argunique_keys)
         return self.__cache
 
 
+    def __unique_vals(self):
+        """
+        Returns the group keys, as values or as tuples.
+        """
+        _, unique, _ = self.__argunique
+        if self.__names is None:
+            return unique
+        else:
+            return zip(*( u.tolist() for u in unique ))
+
+
     def keys(self):
+        """
+        Returns the sorted group keys.
+
+        :return:
+          An array of keys, or for multiple key columns, a table with a row
+          for each key tuple.
+        """
         _, unique, _ = self.__argunique
-        return unique
+        if self.__names is None:
+            return unique
+        else:
+            return Table.wrap(dict(zip(self.__names, unique)), check=False)
 
 
     def values(self):
@@ -71,27 +328,63 @@ class GroupBy(collections.abc.Mapping):
 
 
     def items(self):
-        order, unique, edge = self.__argunique
+        order, _, edge = self.__argunique
         subtable = self.__table._take_rows
-        for u, e0, e1 in zip(unique, edge[: -1], edge[1 :]):
+        for u, e0, e1 in zip(self.__unique_vals(), edge[: -1], edge[1 :]):
             yield u, subtable(order[e0 : e1])
 
 
-    __iter__ = keys
+    def __iter__(self):
+        return iter(self.__unique_vals())
 
 
     def __len__(self):
-        _, unique, _ = self.__argunique
-        return len(unique)
+        _, _, edge = self.__argunique
+        return len(edge) - 1 if len(edge) > 0 else 0
 
 
-    def __getitem__(self, val):
-        order, unique, edge = self.__argunique
-        i = np.searchsorted(unique, val)
-        if unique[i] == val:
-            return self.__table._take_rows(order[edge[i] : edge[i + 1]])
+    def __find(self, val):
+        """
+        Returns the index of group key `val`.
+        """
+        _, unique, _ = self.__argunique
+        if self.__names is None:
+            i = np.searchsorted(unique, val)
+            if i < len(unique) and unique[i] == val:
+                return i
         else:
+            if self.__index is None:
+                self.__index = {
+                    u: i for i, u in enumerate(self.__unique_vals()) }
+            try:
+                return self.__index[self.__normalize_key(unique, val)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        raise KeyError(val)
+
+
+    @staticmethod
+    def __normalize_key(unique, val):
+        """
+        Converts the elements of a key tuple to the Python values that key
+        columns `unique` produce, such as dates for datetime64 values.
+        """
+        if len(val) != len(unique):
             raise KeyError(val)
+        key = []
+        for u, v in zip(unique, val):
+            c = np.asarray(v).astype(u.dtype)
+            # The value must convert exactly, as for a single key.
+            if not c == v:
+                raise KeyError(val)
+            key.append(c.item())
+        return tuple(key)
+
+
+    def __getitem__(self, val):
+        order, _, edge = self.__argunique
+        i = self.__find(val)
+        return self.__table._take_rows(order[edge[i] : edge[i + 1]])
 
 
     def counts(self):
@@ -121,6 +414,64 @@ class GroupBy(collections.abc.Mapping):
         return self.AggregateArrays(self.__table, order, edge)
 
 
+    def aggregate(self, **aggs):
+        """
+        Computes aggregations over any number of columns.
+
+          >>> tab = Table(k=[1, 2, 1, 1], x=[3, 4, 5, 6])
+          >>> agg = GroupBy(tab, "k").aggregate(x=["sum", "max"], n="count")
+          >>> agg.a.k, agg.a.x_sum, agg.a.x_max, agg.a.n
+          (array([1, 2]), array([14,  4]), array([6, 4]), array([3, 1]))
+
+        Each column is gathered into group order only once, regardless of how
+        many aggregations use it.
+
+        :param aggs:
+          Mapping from column name to an aggregation, or a list of them.  An
+          aggregation is the name of an `Aggregation` method, or a function
+          as accepted by `Aggregation.__call__`.  For a single aggregation,
+          the result column has the same name; for a list, the result columns
+          are named `{name}_{agg}`.  As a special case, `"count"` of a name
+          that isn't a column gives the group sizes.
+        :return:
+          A table with the group keys, followed by the result columns.
+        """
+        order, unique, edge = self.__argunique
+        names = [ n for n in aggs if n in self.__table.arrs ]
+        arrs = nplib.take_arrs(
+            { n: self.__table.arrs[n] for n in names }, order)
+
+        if self.__names is None:
+            result = {self.__name: unique}
+        else:
+            result = dict(zip(self.__names, unique))
+
+        def add(name, val):
+            if name in result:
+                raise ValueError(f"duplicate result name: {name}")
+            result[name] = val
+
+        for name, fns in aggs.items():
+            single = isinstance(fns, str) or callable(fns)
+            for fn in [fns] if single else fns:
+                if isinstance(fn, str):
+                    fn_name = fn
+                else:
+                    fn_name = getattr(fn, "__name__", str(fn))
+                res_name = name if single else f"{name}_{fn_name}"
+
+                if name not in arrs:
+                    if fn == "count":
+                        add(res_name, np.diff(edge))
+                        continue
+                    raise KeyError(name)
+
+                agg = Aggregation(arrs[name], None, edge)
+                add(res_name, agg(fn) if callable(fn) else getattr(agg, fn)())
+
+        return Table.wrap(result, check=False)
+
+
 
 #-------------------------------------------------------------------------------
 
@@ -138,7 +489,7 @@ class MultiGroupBy(collections.abc.Mapping):
 
         self.__tables   = tables
         self.__names    = names
-        self.__arrays   = [ t.arrays[n] for t, n in zip(tables, names) ]
+        self.__arrays   = [ t.arrs[n] for t, n in zip(tables, names) ]
         self.__cache    = None
 
 
@@ -175,7 +526,9 @@ class MultiGroupBy(collections.abc.Mapping):
         return unique
 
 
-    __iter__ = keys
+    def __iter__(self):
+        return iter(self.keys())
+
 
     def itervalues(self):
         """
@@ -0,0 +1,156 @@
+"""
+Indexes for looking up rows by column value.
+"""
+
+#-------------------------------------------------------------------------------
+
+import numpy as np
+
+from   . import nplib
+
+#-------------------------------------------------------------------------------
+
+class Index:
+    """
+    Index from the values of a column to the positions of rows with them.
+
+    Point lookups with `get()` use a hash table, which is built the first time
+    it is needed.  Vectorized lookups with `lookup()` use binary search over
+    the sorted distinct values, or for strings, over their sorted hashes.
+    """
+
+    def __init__(self, arr, grouping=None):
+        """
+        :param arr:
+          The column array.
+        :param grouping:
+          The result of `nplib.argunique(arr)`, if already available.
+        """
+        if grouping is None:
+            grouping = nplib.argunique(arr)
+        self.__order, self.__unique, self.__edge = grouping
+        self.__table    = None
+        self.__hashes   = None
+
+
+    def __len__(self):
+        """
+        The number of distinct values.
+        """
+        return len(self.__unique)
+
+
+    def __contains__(self, value):
+        return self.__find(value) is not None
+
+
+    @property
+    def values(self):
+        """
+        The sorted distinct values.
+        """
+        return self.__unique
+
+
+    @property
+    def __hash_table(self):
+        if self.__table is None:
+            # Map each distinct value to its group number.
+            self.__table = {
+                v: i for i, v in enumerate(self.__unique.tolist()) }
+        return self.__table
+
+
+    def __find(self, value):
+        """
+        Returns the position of `value` in the distinct values, or `None`.
+        """
+        unique = self.__unique
+        if unique.dtype.kind in "mM":
+            # Datetimes and timedeltas convert to Python objects that don't
+            # hash like numpy scalars, so use binary search instead.
+            try:
+                i = int(np.searchsorted(unique, value))
+                found = i < len(unique) and bool(unique[i] == value)
+            except (TypeError, ValueError):
+                return None
+            return i if found else None
+
+        try:
+            return self.__hash_table[value]
+        except (KeyError, TypeError):
+            return None
+
+
+    def __search_hashes(self, keys):
+        """
+        Finds the distinct values that may equal string `keys`, by hash.
+
+        :return:
+          Positions in the distinct values, or `None` if this can't be done.
+        """
+        unique = self.__unique
+        if unique.dtype.kind not in "SU" or keys.dtype.kind != unique.dtype.kind:
+            return None
+
+        if self.__hashes is None:
+            hashes = nplib.hash_strs(unique)
+            order = np.argsort(hashes)
+            hashes = hashes[order]
+            if (hashes[1 :] == hashes[: -1]).any():
+                # Hash collision.
+                self.__hashes = False
+            else:
+                self.__hashes = order, hashes
+        if self.__hashes is False:
+            return None
+
+        order, hashes = self.__hashes
+        # The hash depends on the string width.  Longer keys are truncated,
+        # but as they can't be equal to any value, they are rejected later.
+        keys = keys.astype(unique.dtype)
+        i = np.searchsorted(hashes, nplib.hash_strs(keys))
+        i[i == len(hashes)] = 0
+        return order[i]
+
+
+    def get(self, value):
+        """
+        Returns the positions of rows with `value`.
+
+        :return:
+          An array of positions, in increasing order.  If no rows have `value`,
+          the array is empty.
+        """
+        i = self.__find(value)
+        if i is None:
+            return self.__order[: 0]
+        else:
+            return self.__order[self.__edge[i] : self.__edge[i + 1]]
+
+
+    def lookup(self, keys):
+        """
+        Looks up many values at once.
+
+        :param keys:
+          An array of values to look up.
+        :return:
+          An array of the position of the first row with each key, or -1 if
+          there is none.
+        """
+        keys = np.asarray(keys)
+        unique = self.__unique
+        if len(unique) == 0:
+            return np.full(len(keys), -1, dtype=np.intp)
+
+        i = self.__search_hashes(keys)
+        if i is None:
+            i = np.searchsorted(unique, keys)
+            # Keys greater than all values.
+            i[i == len(unique)] = 0
+        found = unique[i] == keys
+        return np.where(found, self.__order[self.__edge[i]], -1)
+
+
+
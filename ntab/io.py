@@ -1,17 +1,774 @@
+import concurrent.futures
 import csv
+from   io import StringIO
+import itertools
+import json
+import mmap
+import numpy as np
+import os
+from   pathlib import Path
+import pickle
+import warnings
 
-from   . import tab
+from   .nplib import default_for_dtype
+from   .tab import Table
 
 #-------------------------------------------------------------------------------
 
-def load_csv(lines):
-    reader = csv.reader(lines)
-    names = next(reader)
-    return tab.from_row_seqs(names, reader)
+# CSV fields that parse as true and false bools.
+TRUE_STRS   = ("True", "true", "TRUE")
+FALSE_STRS  = ("False", "false", "FALSE")
 
+# Dtypes to try, in order, when inferring the dtype of a CSV column.
+INFER_DTYPES = (
+    np.dtype(np.int64),
+    np.dtype(np.float64),
+    np.dtype(bool),
+    np.dtype("datetime64"),
+)
 
-def load_csv_file(path, **kwargs):
-    with open(path, "r") as file:
+def _parse_strs(strs, dtype, *, strict=False):
+    """
+    Converts an array of CSV fields to `dtype`.
+
+    Empty fields are missing values, and are converted to NaN for float
+    dtypes, NaT for datetime dtypes, and empty strings for string and object
+    dtypes.  For int and bool dtypes, empty fields are converted to the
+    default value for the dtype, unless `strict`.
+
+    :param strs:
+      A `str` array of fields.
+    :raise ValueError:
+      A field could not be converted.
+    """
+    try:
+        return _convert_strs(strs, dtype, strict)
+    except OverflowError as exc:
+        raise ValueError(str(exc)) from None
+
+
+def _convert_strs(strs, dtype, strict):
+    kind = dtype.kind
+    if kind == "U":
+        return strs if dtype.itemsize == 0 else strs.astype(dtype)
+    elif kind == "O":
+        return strs.astype(dtype)
+
+    empty = strs == ""
+    any_empty = empty.any()
+    if any_empty and strict and kind in "iub":
+        raise ValueError("missing value")
+
+    if kind == "b":
+        arr = np.isin(strs, TRUE_STRS)
+        if not (arr | empty | np.isin(strs, FALSE_STRS)).all():
+            raise ValueError("invalid bool")
+        return arr
+
+    elif kind in "iu":
+        if any_empty:
+            arr = np.full(len(strs), default_for_dtype(dtype), dtype=dtype)
+            arr[~empty] = strs[~empty].astype(dtype)
+            return arr
+        else:
+            return strs.astype(dtype)
+
+    elif kind == "f":
+        if any_empty:
+            strs = np.where(empty, "nan", strs)
+        return strs.astype(dtype)
+
+    elif kind == "M":
+        if any_empty:
+            strs = np.where(empty, "NaT", strs)
+        # Dates and times are slow to parse but tend to repeat, so parse each
+        # distinct value only once.
+        unique, inverse = np.unique(strs, return_inverse=True)
+        return unique.astype(dtype)[inverse]
+
+    else:
+        return strs.astype(dtype)
+
+
+def _infer_dtype(strs):
+    """
+    Infers the dtype of a column from a sample of its CSV fields.
+    """
+    for dtype in INFER_DTYPES:
+        try:
+            _parse_strs(strs, dtype, strict=True)
+        except ValueError:
+            pass
+        else:
+            return dtype
+    return np.dtype(str)
+
+
+def _promote_dtype(dtype):
+    """
+    Returns the dtype to try for a column of inferred `dtype`, when a field
+    failed to parse.
+    """
+    return np.dtype(np.float64) if dtype.kind in "iu" else np.dtype(str)
+
+
+def _promote_arr(arr, dtype):
+    """
+    Converts an array parsed from CSV fields to a promoted `dtype`.
+    """
+    if dtype.kind == "U":
+        # Convert back to strings; we don't have the original fields.
+        return arr.astype(str)
+    else:
+        return arr.astype(dtype)
+
+
+def _is_generic(dtype):
+    return dtype.kind in "mM" and np.datetime_data(dtype)[0] == "generic"
+
+
+class _CsvCol:
+    """
+    A column of a CSV file, parsed block by block.
+    """
+
+    def __init__(self, name, dtype=None):
+        """
+        :param dtype:
+          The column dtype, or `None` to infer it from the first values.
+        """
+        self.name   = name
+        self.dtype  = None if dtype is None else np.dtype(dtype)
+        self.infer  = dtype is None
+        # If true, missing int and bool values are errors.
+        self.strict = False
+        self.arrs   = []
+
+
+    def copy(self):
+        """
+        Returns a new, empty column with the same name and dtype.
+        """
+        col = self.__class__(self.name, self.dtype)
+        col.infer = self.infer
+        col.strict = self.strict
+        return col
+
+
+    @property
+    def load_dtype(self):
+        """
+        The dtype in which `np.loadtxt` should load values.
+        """
+        dtype = self.dtype
+        if dtype.kind in "iuf" or (dtype.kind == "M" and not _is_generic(dtype)):
+            return dtype
+        else:
+            # Load anything else as strings, and parse them ourselves.
+            return np.dtype(object)
+
+
+    def add(self, vals):
+        """
+        Adds a block of values loaded by `np.loadtxt` in `load_dtype`.
+        """
+        if vals.dtype == self.dtype:
+            self.arrs.append(np.ascontiguousarray(vals))
+        else:
+            self.add_strs(vals.astype(str))
+
+
+    def add_strs(self, strs):
+        """
+        Parses a block of fields and adds them to the column.
+
+        If the dtype is inferred, and a field fails to parse, promotes the
+        dtype, along with any previously parsed blocks.
+        """
+        dtype = self.dtype
+        while True:
+            try:
+                arr = _parse_strs(strs, dtype, strict=self.infer or self.strict)
+            except ValueError as exc:
+                if not self.infer:
+                    raise ValueError(
+                        f"can't parse {self.name} as {dtype}: {exc}")
+                dtype = _promote_dtype(dtype)
+            else:
+                break
+
+        if dtype != self.dtype:
+            self.arrs = [ _promote_arr(a, dtype) for a in self.arrs ]
+            self.dtype = dtype
+        self.arrs.append(arr)
+
+
+    def finish(self):
+        """
+        Returns the array of parsed values.
+        """
+        if len(self.arrs) == 0:
+            # No rows.
+            return np.empty(0, self.dtype)
+        elif len(self.arrs) == 1:
+            return self.arrs[0]
+        else:
+            return np.concatenate(self.arrs)
+
+
+
+def _read_block(lines, block_rows):
+    """
+    Reads up to `block_rows` lines, plus any more lines needed to complete a
+    quoted field that spans lines.
+    """
+    block = list(itertools.islice(lines, block_rows))
+    # A newline is within a quoted field iff an odd number of quotes precede
+    # it.  (An escaped quote in a quoted field is doubled.)
+    quotes = "".join(block).count('"')
+    while quotes % 2 == 1:
+        try:
+            line = next(lines)
+        except StopIteration:
+            break
+        block.append(line)
+        quotes += line.count('"')
+    return block
+
+
+def _split_fields(block, num_cols):
+    """
+    Splits a block of CSV lines into arrays of fields, one per column.
+    """
+    rows = [ r for r in csv.reader(block) if len(r) > 0 ]
+    lengths = set(map(len, rows))
+    if len(lengths - {num_cols}) > 0:
+        raise ValueError(f"wrong number of fields: {lengths - {num_cols}}")
+    if len(rows) == 0:
+        return [ np.empty(0, dtype=str) for _ in range(num_cols) ]
+    else:
+        return [ np.array(c, dtype=str) for c in zip(*rows) ]
+
+
+def _parse_block(block, cols):
+    """
+    Parses a block of CSV lines and adds the values to `cols`.
+
+    Parses all columns at once with `np.loadtxt` where possible, converting
+    fields directly to their dtypes.  If this fails, for instance because of
+    missing values or values that require the dtype be promoted, splits the
+    lines into fields and parses each column separately.
+    """
+    dtype = np.dtype([ (str(i), c.load_dtype) for i, c in enumerate(cols) ])
+    try:
+        with warnings.catch_warnings():
+            # Ignore warnings about blank lines.
+            warnings.simplefilter("ignore", UserWarning)
+            recs = np.loadtxt(
+                block, dtype=dtype, delimiter=",", quotechar='"',
+                comments=None, ndmin=1)
+    except ValueError:
+        for col, strs in zip(cols, _split_fields(block, len(cols))):
+            col.add_strs(strs)
+    else:
+        for i, col in enumerate(cols):
+            col.add(recs[str(i)])
+
+
+def load_csv(lines, *, dtypes={}, block_rows=65536, sample_rows=1024):
+    """
+    Loads a table from CSV.
+
+    The first row contains column names.  Each column's dtype is taken from
+    `dtypes`, if given, or else inferred as int, float, bool, datetime, or
+    str.  The dtype is inferred from a sample of values at the start of the
+    column; if a later value doesn't fit, the dtype is promoted.
+
+    Rows are parsed in blocks.  Each block is parsed directly into typed
+    arrays where possible.
+
+    :param lines:
+      An iterable of lines of text.
+    :param dtypes:
+      Mapping from column names to dtypes.
+    :param block_rows:
+      The number of rows to parse at a time.
+    :param sample_rows:
+      The number of values from which to infer a column's dtype.
+    """
+    lines, cols, block = _start_csv(lines, dtypes, block_rows, sample_rows)
+    while len(block) > 0:
+        _parse_block(block, cols)
+        block = _read_block(lines, block_rows)
+
+    return Table( (c.name, c.finish()) for c in cols )
+
+
+def iter_csv(path, chunk_rows=65536, *, dtypes={}, sample_rows=1024):
+    """
+    Generates tables of consecutive rows from a CSV file.
+
+    Reads and parses one chunk of rows at a time, so that memory use is
+    bounded by the chunk size rather than the file size.
+
+    All tables have the same names and dtypes.  Any dtypes not given in
+    `dtypes` are inferred from the first chunk.  Since later chunks may
+    contain longer strings, str columns are given object dtype.
+
+    :param chunk_rows:
+      The maximum number of rows in each table.
+    :param dtypes:
+      Mapping from column names to dtypes.
+    :param sample_rows:
+      The number of values from which to infer a column's dtype.
+    :raise ValueError:
+      A value in a later chunk cannot be converted to its column's dtype, is
+      missing from a column whose int or bool dtype was inferred, or is a
+      datetime finer than the unit inferred for its column.
+    """
+    with open(path, "r", newline="") as file:
+        lines, cols, block = _start_csv(file, dtypes, chunk_rows, sample_rows)
+        first = True
+        # Units of inferred datetime columns, fixed by the first chunk.
+        units = {}
+        while len(block) > 0:
+            chunk = [ c.copy() for c in cols ]
+            _parse_block(block, chunk)
+
+            if first:
+                # Fix the dtypes inferred from the first chunk, for the rest.
+                for col in chunk:
+                    if col.infer:
+                        arr = col.finish()
+                        if arr.dtype.kind == "U":
+                            arr = arr.astype(object)
+                        col.arrs = [arr]
+                        col.dtype = arr.dtype
+                        col.infer = False
+                        # The inferred dtype can't be promoted, so don't fill
+                        # in missing values that it didn't have.
+                        col.strict = True
+                        if arr.dtype.kind == "M":
+                            # Parse later chunks with their own units, to
+                            # check rather than truncate finer values.
+                            units[col.name] = arr.dtype
+                            col.dtype = np.dtype("M8")
+                cols = chunk
+                first = False
+
+            arrs = {}
+            for col in chunk:
+                arr = col.finish()
+                unit = units.get(col.name)
+                if unit is not None and arr.dtype != unit:
+                    if not np.can_cast(arr.dtype, unit, "safe"):
+                        raise ValueError(
+                            f"can't parse {col.name} as {unit}: "
+                            f"values have finer unit {arr.dtype}"
+                        )
+                    arr = arr.astype(unit)
+                arrs[col.name] = arr
+            yield Table(arrs)
+            block = _read_block(lines, chunk_rows)
+
+
+def _start_csv(lines, dtypes, block_rows, sample_rows):
+    """
+    Starts parsing CSV: reads column names, reads the first block, and infers
+    dtypes from a sample.
+
+    :return:
+      `lines, cols, block`, where `lines` is an iterator of the remaining
+      lines, `cols` the columns, and `block` the first block of lines.
+    """
+    lines = iter(lines)
+    names = next(csv.reader(lines))
+    cols = [ _CsvCol(n, dtypes.get(n, None)) for n in names ]
+
+    block = _read_block(lines, block_rows)
+    if any( c.dtype is None for c in cols ):
+        # Infer dtypes from a sample.
+        sample = _read_block(iter(block), sample_rows)
+        for col, strs in zip(cols, _split_fields(sample, len(cols))):
+            if col.dtype is None:
+                col.dtype = _infer_dtype(strs)
+
+    return lines, cols, block
+
+
+def _find_record_end(data, pos, quotes):
+    """
+    Finds the end of the CSV record containing position `pos` in `data`.
+
+    :param quotes:
+      The number of quote characters in `data[: pos]`.
+    :return:
+      `end, quotes`, where `end` is the position after the newline ending the
+      record, and `quotes` is the number of quote characters in `data[: end]`.
+    """
+    while True:
+        nl = data.find(b"\n", pos)
+        if nl == -1:
+            return len(data), quotes + data[pos :].count(b'"')
+        quotes += data[pos : nl + 1].count(b'"')
+        pos = nl + 1
+        # The newline ends a record unless it is in a quoted field.
+        if quotes % 2 == 0:
+            return pos, quotes
+
+
+def _partition(data, start, num):
+    """
+    Partitions `data[start :]` into up to `num` byte ranges of about equal
+    size, each consisting of whole CSV records.
+
+    :return:
+      A list of partition boundaries, starting with `start` and ending with
+      `len(data)`.
+    """
+    bounds = [start]
+    pos = start
+    quotes = 0
+    for i in range(1, num):
+        target = start + (len(data) - start) * i // num
+        if target <= pos:
+            continue
+        quotes += data[pos : target].count(b'"')
+        pos, quotes = _find_record_end(data, target, quotes)
+        if pos >= len(data):
+            break
+        bounds.append(pos)
+    bounds.append(len(data))
+    return bounds
+
+
+def _split_lines(data):
+    """
+    Decodes bytes and splits them into lines, as a file opened with
+    `newline=""` would.
+    """
+    # Unlike `str.splitlines()`, this splits only on CR and LF.
+    return StringIO(data.decode(), newline="")
+
+
+def _parse_range(path, start, end, cols, block_rows):
+    """
+    Parses the CSV records in bytes `start` to `end` of a file into copies of
+    `cols`.
+    """
+    cols = [ c.copy() for c in cols ]
+    with open(path, "rb") as file:
+        file.seek(start)
+        lines = _split_lines(file.read(end - start))
+    while True:
+        block = _read_block(lines, block_rows)
+        if len(block) == 0:
+            break
+        _parse_block(block, cols)
+    return cols
+
+
+def _stitch(cols):
+    """
+    Concatenates parts of a column parsed separately.
+
+    If the parts' inferred dtypes were promoted differently, promotes them
+    all to the same dtype.
+    """
+    kinds = { c.dtype.kind for c in cols }
+    if len(kinds) > 1:
+        dtype = np.dtype(str if "U" in kinds else np.float64)
+        for col in cols:
+            col.arrs = [ _promote_arr(a, dtype) for a in col.arrs ]
+            col.dtype = dtype
+
+    col = cols[0].copy()
+    col.arrs = [ a for c in cols for a in c.arrs ]
+    return col.finish()
+
+
+def _load_csv_parallel(
+        path, num_procs, *, dtypes={}, block_rows=65536, sample_rows=1024):
+    """
+    Loads a table from a CSV file, parsing parts of it in multiple processes.
+    """
+    with open(path, "rb") as file, \
+         mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # Parse the header.
+        start, _ = _find_record_end(data, 0, 0)
+        names = next(csv.reader(_split_lines(data[: start])))
+        cols = [ _CsvCol(n, dtypes.get(n, None)) for n in names ]
+
+        if any( c.dtype is None for c in cols ):
+            # Infer dtypes from a sample.
+            end = start
+            quotes = 0
+            for _ in range(sample_rows):
+                end, quotes = _find_record_end(data, end, quotes)
+            sample = list(_split_lines(data[start : end]))
+            for col, strs in zip(cols, _split_fields(sample, len(cols))):
+                if col.dtype is None:
+                    col.dtype = _infer_dtype(strs)
+
+        # Use a few more partitions than processes, to balance the load.
+        bounds = _partition(data, start, 4 * num_procs)
+
+    # Parsing holds the GIL, so parse in processes rather than threads.  Each
+    # reads its own byte range of the file.
+    num_parts = len(bounds) - 1
+    with concurrent.futures.ProcessPoolExecutor(num_procs) as executor:
+        parts = list(executor.map(
+            _parse_range,
+            [path] * num_parts,
+            bounds[: -1],
+            bounds[1 :],
+            [cols] * num_parts,
+            [block_rows] * num_parts,
+        ))
+
+    return Table(
+        (c.name, _stitch([ p[i] for p in parts ]))
+        for i, c in enumerate(cols)
+    )
+
+
+def load_csv_file(path, *, num_procs=1, **kwargs):
+    """
+    Loads a table from a CSV file.
+
+    :param num_procs:
+      If greater than one, splits the file into byte ranges of whole records,
+      and parses them in this many processes.  Quoted fields that span lines
+      are handled correctly.  The parts are then concatenated.
+    :keywords:
+      See `load_csv`.
+    """
+    if num_procs > 1 and os.stat(path).st_size > 0:
+        return _load_csv_parallel(path, num_procs, **kwargs)
+
+    with open(path, "r", newline="") as file:
         return load_csv(file, **kwargs)
 
 
+def _format_vals(arr, float_precision, datetime_unit):
+    """
+    Formats the values in an array for CSV.
+
+    :return:
+      A list of strings, or for values that `csv.QUOTE_NONNUMERIC` quotes,
+      such as str, object, and datetime values, an array of strings.
+    """
+    kind = arr.dtype.kind
+    # For numbers, Python's own formatting, mapped over a list of values, is
+    # considerably faster than numpy's conversion to str.
+    if kind == "f" and float_precision is not None:
+        return list(map(f"%.{float_precision}f".__mod__, arr.tolist()))
+    elif arr.dtype == np.float64:
+        return list(map(repr, arr.tolist()))
+    elif kind in "iu":
+        return list(map(str, arr.tolist()))
+    elif kind == "b":
+        return np.where(arr, TRUE_STRS[0], FALSE_STRS[0]).tolist()
+    elif kind == "M":
+        return np.datetime_as_string(arr, unit=datetime_unit)
+    elif kind == "U":
+        return arr
+    elif kind == "S":
+        return np.char.decode(arr)
+    elif kind == "O":
+        # As `csv.writer` does, write `None` as an empty field.
+        return np.array(
+            [ "" if v is None else str(v) for v in arr.tolist() ], dtype=str)
+    else:
+        return arr.astype(str).tolist()
+
+
+def _quote_strs(strs):
+    return np.char.add(np.char.add('"', np.char.replace(strs, '"', '""')), '"')
+
+
+def _quote_vals(vals, quoting):
+    """
+    Quotes formatted values as needed.
+
+    :param vals:
+      Values as returned by `_format_vals`.
+    :return:
+      A list of strings.
+    """
+    if isinstance(vals, list):
+        # Formatted numbers, which never require quoting.
+        if quoting == csv.QUOTE_ALL:
+            return list(map('"{}"'.format, vals))
+        else:
+            return vals
+
+    if quoting in (csv.QUOTE_ALL, csv.QUOTE_NONNUMERIC):
+        return _quote_strs(vals).tolist()
+
+    needs = np.zeros(len(vals), dtype=bool)
+    for c in ',"\r\n':
+        needs |= np.char.find(vals, c) >= 0
+    if quoting == csv.QUOTE_NONE:
+        if needs.any():
+            raise ValueError("field requires quoting")
+        return vals.tolist()
+    elif quoting == csv.QUOTE_MINIMAL:
+        strs = vals.tolist()
+        idxs = np.flatnonzero(needs)
+        if len(idxs) > 0:
+            for i, q in zip(idxs.tolist(), _quote_strs(vals[idxs]).tolist()):
+                strs[i] = q
+        return strs
+    else:
+        raise ValueError(f"unsupported quoting: {quoting}")
+
+
+def dump_csv(
+        tab, file, *,
+        float_precision =None,
+        datetime_unit   =None,
+        quoting         =csv.QUOTE_MINIMAL,
+        block_rows      =65536,
+):
+    """
+    Writes a table as CSV.
+
+    Writes a header row of column names, then a row for each table row.  Rows
+    are formatted in blocks, one column at a time, and each block is written
+    with a single write.
+
+    :param file:
+      A text file.
+    :param float_precision:
+      If not `None`, the number of digits after the decimal point for float
+      values.  Otherwise, each float is written with as many digits as are
+      required to represent it exactly.
+    :param datetime_unit:
+      The unit for datetime values, as for `np.datetime_as_string`.  If
+      `None`, uses each column's unit.
+    :param quoting:
+      One of the `csv.QUOTE_*` constants.  With `csv.QUOTE_NONNUMERIC`, str
+      and object values are quoted.
+    :param block_rows:
+      The number of rows to format at a time.
+    """
+    writer = csv.writer(file, quoting=quoting, lineterminator="\n")
+    writer.writerow(tab.names)
+
+    arrs = list(tab.arrs.values())
+    for start in range(0, tab.num_rows, block_rows):
+        cols = [
+            _quote_vals(
+                _format_vals(
+                    a[start : start + block_rows],
+                    float_precision, datetime_unit
+                ),
+                quoting
+            )
+            for a in arrs
+        ]
+        if len(cols) == 1:
+            # As `csv.writer` does, quote an empty field that is alone in its
+            # row, which would otherwise be read as a blank line.
+            col, = cols
+            if "" in col:
+                if quoting == csv.QUOTE_NONE:
+                    raise ValueError("field requires quoting")
+                cols = [[ '""' if v == "" else v for v in col ]]
+        file.write("\n".join(map(",".join, zip(*cols))) + "\n")
+
+
+def dump_csv_file(tab, path, **kwargs):
+    with open(path, "w", newline="") as file:
+        dump_csv(tab, file, **kwargs)
+
+
+#-------------------------------------------------------------------------------
+# Columnar format
+
+# Name of the schema manifest in a table directory.
+SCHEMA_NAME = "schema.json"
+
+SCHEMA_VERSION = 1
+
+def save(tab, path):
+    """
+    Saves a table in columnar format to a directory.
+
+    Each column is stored in its own file, in `.npy` format; object columns,
+    which cannot be stored as raw data, are pickled instead.  A schema
+    manifest lists the columns in order.
+
+    :param path:
+      Path to the directory, which is created if necessary.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    cols = []
+    for i, (name, arr) in enumerate(tab.arrs.items()):
+        if arr.dtype.hasobject:
+            encoding = "pickle"
+            filename = f"{i}.pickle"
+            with open(path / filename, "wb") as file:
+                pickle.dump(arr, file, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            encoding = "npy"
+            filename = f"{i}.npy"
+            np.save(path / filename, arr, allow_pickle=False)
+        cols.append({
+            "name"      : name,
+            "dtype"     : str(arr.dtype),
+            "encoding"  : encoding,
+            "filename"  : filename,
+        })
+
+    # Write the schema last, so that a partially-saved table is not loaded.
+    schema = {
+        "version"   : SCHEMA_VERSION,
+        "num_rows"  : tab.num_rows,
+        "cols"      : cols,
+    }
+    with open(path / SCHEMA_NAME, "w") as file:
+        json.dump(schema, file, indent=2)
+
+
+def load(path, *, mmap=True):
+    """
+    Loads a table in columnar format from a directory, as written by `save`.
+
+    :param mmap:
+      If true, memory-maps column files read-only, so that column data is
+      read from disk only as it is accessed.  Pickled object columns are
+      always read in full.
+    """
+    path = Path(path)
+    with open(path / SCHEMA_NAME, "r") as file:
+        schema = json.load(file)
+    if schema["version"] != SCHEMA_VERSION:
+        raise ValueError(f"unknown schema version: {schema['version']}")
+
+    arrs = {}
+    for col in schema["cols"]:
+        name = col["name"]
+        encoding = col["encoding"]
+        if encoding == "npy":
+            arr = np.load(
+                path / col["filename"],
+                mmap_mode="r" if mmap else None,
+                allow_pickle=False,
+            )
+        elif encoding == "pickle":
+            with open(path / col["filename"], "rb") as file:
+                arr = pickle.load(file)
+        else:
+            raise ValueError(f"unknown encoding for {name}: {encoding}")
+
+        if len(arr) != schema["num_rows"]:
+            raise ValueError(f"wrong length: {name}")
+        arrs[name] = arr
+
+    return Table(arrs)
+
+
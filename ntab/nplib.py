@@ -1,6 +1,8 @@
 import collections.abc
+import itertools
 import logging as log  # FIXME
 import numpy as np
+import operator
 
 #-------------------------------------------------------------------------------
 
@@ -13,52 +15,203 @@ def get_dtype(name, val):
         return np.array([val]).dtype
 
 
-def resize(arr, size):
-    assert size > len(arr)
-    default = default_for_dtype(arr.dtype)
-    new_arr = np.full(size, default, dtype=arr.dtype)
-    new_arr[: len(arr)] = arr
-    return new_arr
+class RecAccumulator(object):
+    """
+    Accumulates records into column arrays.
 
+    Records are written into chunks of preallocated arrays.  When a chunk is
+    full, a new one is allocated; existing arrays are never resized or
+    copied.  Each new chunk has room for `growth - 1` times the rows so far,
+    so at most that fraction of the allocated space is unused.  The chunks
+    are concatenated once, when the arrays are retrieved.
 
-class RecAccumulator(object):
+    A column missing from a record, or from the records before it first
+    appears, is filled with `default_for_dtype`.
+    """
 
-    def __init__(self, size_hint=1024):
-        self.__cols = {}
+    def __init__(self, size_hint=1024, growth=1.25, get_dtype=get_dtype):
+        """
+        :param size_hint:
+          The number of rows in the first chunk.
+        :param growth:
+          The factor by which the allocated space grows with each chunk.
+        :param get_dtype:
+          Function of a column name and its first value, that returns the
+          column's dtype.
+        """
+        if not growth > 1:
+            raise ValueError(f"growth must be greater than 1: {growth}")
+        self.__size_hint = max(1, int(size_hint))
+        self.__growth = growth
+        self.__get_dtype = get_dtype
+        # Column dtypes, in order of first appearance.
+        self.__dtypes = {}
+        # Full chunks, as `length, arrs` pairs.
+        self.__chunks = []
         self.__length = 0
-        self.__size = size_hint
+        # The current chunk.
+        self.__cols = {}
+        self.__pos = 0
+        self.__size = 0
 
 
-    def append(self, **rec):
-        if self.__length == self.__size:
-            self.__size *= 4
-            log.debug("resizing columns: {}".format(self.__size))
-            self.__cols = { 
-                n: resize(a, self.__size) 
-                for n, a in self.__cols.items() 
-            }
+    def __len__(self):
+        return self.__length + self.__pos
+
 
+    def __flush(self):
+        """
+        Ends the current chunk, keeping any unused space for the next chunk.
+        """
+        pos = self.__pos
+        if pos > 0:
+            cols = self.__cols
+            self.__chunks.append((pos, { n: a[: pos] for n, a in cols.items() }))
+            self.__cols = { n: a[pos :] for n, a in cols.items() }
+            self.__length += pos
+            self.__size -= pos
+            self.__pos = 0
+
+
+    def __new_chunk(self):
+        self.__flush()
+        self.__size = max(
+            self.__size_hint, int(self.__length * (self.__growth - 1)))
+        log.debug("new chunk: {}".format(self.__size))
+        # Allocate columns when they are first used in this chunk.
+        self.__cols = {}
+
+
+    def __add_dtype(self, name, dtype):
+        """
+        Sets the dtype in which to accumulate a new column.
+        """
+        if dtype.kind in ("S", "U"):
+            # Don't use fixed-length strings, as subsequent values
+            # may not fit (and will be truncated).
+            dtype = np.dtype(object)
+        log.debug("new column: {} [{}]".format(name, dtype))
+        self.__dtypes[name] = dtype
+        return dtype
+
+
+    def __add_col(self, name, val):
+        try:
+            dtype = self.__dtypes[name]
+        except KeyError:
+            dtype = self.__add_dtype(
+                name, np.dtype(self.__get_dtype(name, val)))
+        arr = self.__cols[name] = np.full(
+            self.__size, default_for_dtype(dtype), dtype=dtype)
+        return arr
+
+
+    def __append(self, rec):
+        if self.__pos == self.__size:
+            self.__new_chunk()
+        cols = self.__cols
+        pos = self.__pos
         for name, val in rec.items():
             try:
-                arr = self.__cols[name]
+                arr = cols[name]
             except KeyError:
-                dtype = np.dtype(get_dtype(name, val))
-                if dtype.kind in ("S", "U"):
-                    # Don't use fixed-length strings, as subsequent values
-                    # may not fit (and will be truncated).
-                    dtype = np.dtype(object)
-                log.debug("new column: {} [{}]".format(name, dtype))
-                default = default_for_dtype(dtype)
-                arr = self.__cols[name] \
-                    = np.full(self.__size, default, dtype=dtype)
-            arr[self.__length] = val
-        self.__length += 1
+                arr = self.__add_col(name, val)
+            arr[pos] = val
+        self.__pos = pos + 1
+
+
+    def append(self, **rec):
+        """
+        Appends a record, given as keyword arguments.
+        """
+        self.__append(rec)
+
+
+    def extend(self, recs):
+        """
+        Appends records from an iterable of mappings.
+        """
+        append = self.__append
+        for rec in recs:
+            append(rec)
+
+
+    def append_arrs(self, arrs, copy=True):
+        """
+        Appends rows from a mapping of parallel arrays.
+
+        :param copy:
+          If false, the accumulator takes ownership of the arrays, which must
+          not be modified subsequently.
+        """
+        arrs = { n: np.array(a, copy=copy or None) for n, a in arrs.items() }
+        lengths = { len(a) for a in arrs.values() }
+        if len(lengths) > 1:
+            raise ValueError("arrays have different lengths")
+        if len(lengths) == 0 or lengths == {0}:
+            return
+
+        self.__flush()
+        for name, arr in arrs.items():
+            if name not in self.__dtypes:
+                self.__add_dtype(name, arr.dtype)
+        length, = lengths
+        self.__chunks.append((length, arrs))
+        self.__length += length
+
+
+    def __concat(self, name, chunks):
+        # Chunks may have different dtypes, which are promoted.
+        dtypes = [ a[name].dtype for _, a in chunks if name in a ]
+        try:
+            dtype = np.result_type(*dtypes) if dtypes else self.__dtypes[name]
+        except (TypeError, ValueError):
+            dtype = np.dtype(object)
+        parts = [
+            arrs[name][: length] if name in arrs
+            else np.full(length, default_for_dtype(dtype), dtype=dtype)
+            for length, arrs in chunks
+        ]
+        if len(parts) == 0:
+            return np.empty(0, dtype=dtype)
+        elif len(parts) == 1 and parts[0].base is None:
+            return parts[0]
+        else:
+            return np.concatenate(parts, dtype=dtype)
 
 
     @property
     def arrays(self):
-        return { n: a[: self.__length] for n, a in self.__cols.items() }
-        
+        """
+        The accumulated arrays.  These are copies.
+        """
+        chunks = self.__chunks + [(self.__pos, self.__cols)]
+        return { n: self.__concat(n, chunks) for n in self.__dtypes }
+
+
+    def pop_arrays(self):
+        """
+        Returns the accumulated arrays, and resets to no rows.
+
+        Each column's chunks are freed once it is concatenated, so the peak
+        memory use is little more than the size of the result.
+        """
+        self.__flush()
+        self.__cols = {}
+        chunks = self.__chunks
+        arrs = {}
+        for name in self.__dtypes:
+            arrs[name] = self.__concat(name, chunks)
+            for _, chunk in chunks:
+                chunk.pop(name, None)
+
+        self.__dtypes = {}
+        self.__chunks = []
+        self.__length = 0
+        self.__cols = {}
+        self.__size = 0
+        return arrs
+
 
 
 def arrs_from_recs(recs, size_hint=1024, get_dtype=get_dtype):
@@ -78,49 +231,595 @@ def arrs_from_recs(recs, size_hint=1024, get_dtype=get_dtype):
       array([  30.,   nan, 1042.])
 
     """
-    def resize(arr, size):
-        assert size > len(arr)
-        default = default_for_dtype(arr.dtype)
-        new_arr = np.full(size, default, dtype=arr.dtype)
-        new_arr[: len(arr)] = arr
-        return new_arr
+    acc = RecAccumulator(size_hint, get_dtype=get_dtype)
+    acc.extend(recs)
+    return acc.pop_arrays()
 
-    cols = {}
-    length = 0
-    size = size_hint
-    for rec in recs:
-        if length == size:
-            size *= 4
-            log.debug("resizing columns: {}".format(size))
-            cols = { n: resize(a, size) for n, a in cols.items() }
 
-        for name, val in rec.items():
+def _infer_arr(vals):
+    """
+    Converts a list of values to an array, inferring its dtype.
+
+    `None` is a missing value: if the other values are float, complex, or
+    datetime, it becomes NaN or NaT; otherwise, the array is object.  As in
+    `RecAccumulator`, strings are stored as objects.
+    """
+    arr = np.array(vals)
+    kind = arr.dtype.kind
+    if kind == "O" and any( v is None for v in vals ):
+        present = [ v for v in vals if v is not None ]
+        dtype = np.array(present).dtype if len(present) > 0 else arr.dtype
+        if dtype.kind in "fcmM":
+            arr = np.array(vals, dtype=dtype)
+    elif kind in "SU":
+        arr = np.empty(len(vals), dtype=object)
+        arr[:] = vals
+    return arr
+
+
+def _col_from_recs(recs, name, dtype, strict):
+    """
+    Extracts the values of `name` from a list of records into an array.
+
+    :param dtype:
+      The dtype to convert values to, or `None` to infer it.
+    :param strict:
+      If false and values can't be converted to `dtype`, infers it instead.
+    :return:
+      `arr, missing`, where `missing` are the positions of records that don't
+      have `name`.  These are filled later, once the column's dtype is known.
+      If no records have `name` and `dtype` is `None`, `arr` is `None`.
+    """
+    get = operator.itemgetter(name)
+    try:
+        if dtype is not None:
             try:
-                arr = cols[name]
-            except KeyError:
-                dtype = np.dtype(get_dtype(name, val))
-                log.debug("new column: {} [{}]".format(name, dtype))
-                default = default_for_dtype(dtype)
-                arr = cols[name] = np.full(size, default, dtype=dtype)
-            arr[length] = val
-        length += 1
+                if dtype.kind in "biufcmM":
+                    # Write values directly into the array.
+                    arr = np.fromiter(map(get, recs), dtype, count=len(recs))
+                else:
+                    arr = np.array(list(map(get, recs)), dtype=dtype)
+                return arr, []
+            except (TypeError, ValueError):
+                if strict:
+                    raise
+        return _infer_arr(list(map(get, recs))), []
+    except KeyError:
+        pass
+
+    # Some records don't have the column.
+    idxs = []
+    missing = []
+    for i, rec in enumerate(recs):
+        (idxs if name in rec else missing).append(i)
+    if len(idxs) > 0:
+        vals, _ = _col_from_recs([ recs[i] for i in idxs ], name, dtype, strict)
+        dtype = vals.dtype
+    elif dtype is None:
+        # No values to infer the dtype from.
+        return None, missing
+    arr = np.full(len(recs), default_for_dtype(dtype), dtype=dtype)
+    if len(idxs) > 0:
+        arr[idxs] = vals
+    return arr, missing
+
+
+# Number of records converted at a time by `columnize_recs`.  Each column is
+# extracted from a batch in turn, so a batch's records should fit in cache.
+RECS_BATCH_SIZE = 1024
+
+def columnize_recs(recs, schema=None, batch_size=RECS_BATCH_SIZE):
+    """
+    Converts an iterable of mapping records to a mapping of arrays.
 
-    return { n: a[: length] for n, a in cols.items() }
+      >>> arrs = columnize_recs([dict(x=1, y=2.5), dict(x=2), dict(x=3, z="a")])
+      >>> arrs["y"]
+      array([2.5, nan, nan])
+      >>> arrs["z"]
+      array([None, None, 'a'], dtype=object)
+
+    Records are converted in batches, one column at a time.  A column's dtype
+    is inferred from its values in the first batch that has it.  In later
+    batches, float, complex, and datetime values are written directly to
+    arrays of this dtype; other dtypes are inferred for each batch, and
+    promoted as needed when the batches are concatenated.  The result doesn't
+    depend on the batch size.
+
+    Values missing from records are filled with `default_for_dtype` of the
+    column's final dtype.  `None` values are missing in float, complex, and
+    datetime columns.  Strings are stored as objects, as by `RecAccumulator`.
+
+    :param schema:
+      A mapping from names to dtypes.  If given, only these columns are
+      extracted, and values are converted to their dtypes without inference.
+    """
+    strict = schema is not None
+    # Column names and dtypes for conversion, or `None` to infer.
+    names = {} if schema is None else {
+        str(n): np.dtype(d) for n, d in schema.items() }
+    # Positions of records missing each column, in batches that have it.
+    missing = {}
+
+    acc = RecAccumulator()
+    recs = iter(recs)
+    offset = 0
+    while True:
+        batch = list(itertools.islice(recs, batch_size))
+        if len(batch) == 0:
+            break
+
+        arrs = {}
+        complete = True
+        def add(name, dtype):
+            nonlocal complete
+            arr, idxs = _col_from_recs(batch, name, dtype, strict)
+            if arr is not None:
+                arrs[name] = arr
+                if len(idxs) > 0:
+                    missing.setdefault(name, []).append(
+                        offset + np.array(idxs, dtype=np.intp))
+            complete &= len(idxs) == 0
+            return arr
+
+        for name, dtype in names.items():
+            add(name, dtype)
+
+        # If every record has exactly the known columns, there are no others.
+        if not strict and (not complete or set(map(len, batch)) != {len(names)}):
+            for name in dict.fromkeys(itertools.chain.from_iterable(batch)):
+                if name not in names:
+                    arr = add(name, None)
+                    names[name] = arr.dtype if arr.dtype.kind in "fcmM" else None
+
+        acc.append_arrs(arrs, copy=False)
+        offset += len(batch)
+
+    arrs = acc.pop_arrays()
+    for name, idxs in missing.items():
+        # Earlier batches may have been filled in another dtype.
+        arr = arrs[name]
+        arr[np.concatenate(idxs)] = default_for_dtype(arr.dtype)
+    if strict:
+        # Include schema columns even if there were no records.
+        arrs = {
+            n: arrs[n] if n in arrs else np.empty(0, dtype=d)
+            for n, d in names.items()
+        }
+    return arrs
 
 
 def default_for_dtype(dtype):
-    if dtype.kind == "i":
+    if dtype.kind in "iu":
         return np.iinfo(dtype).min  # Sadness.
     else:
         return {
             "b": False,   # Very sadness.
             "f": np.nan,
+            "c": np.nan,
+            "m": np.timedelta64("nat"),
             "M": NAT,
             "O": None,
             "S": "",
+            "U": "",
         }[dtype.kind]
 
 
+#-------------------------------------------------------------------------------
+# Gather functions
+
+def prepare_idxs(idxs, length):
+    """
+    Validates and normalizes an index array, for gathering from arrays.
+
+    The result may be reused to gather from any number of arrays of `length`.
+
+    :param idxs:
+      An array of integer indices.  Negative indices count from the end.
+    :return:
+      A slice, if the indices are a consecutive increasing run; otherwise an
+      `intp` array of nonnegative indices.
+    :raise IndexError:
+      An index is out of range.
+    """
+    idxs = np.asarray(idxs).astype(np.intp, copy=False)
+    if len(idxs) == 0:
+        return slice(0, 0)
+
+    lo = idxs.min()
+    hi = idxs.max()
+    if lo < -length or hi >= length:
+        raise IndexError("index out of range")
+    if lo < 0:
+        idxs = np.where(idxs < 0, idxs + length, idxs)
+        lo = idxs.min()
+        hi = idxs.max()
+
+    if hi - lo + 1 == len(idxs) and (np.diff(idxs) == 1).all():
+        # A consecutive run, which we can gather by slicing.
+        return slice(int(lo), int(hi) + 1)
+    else:
+        return idxs
+
+
+def take(arr, idxs):
+    """
+    Gathers elements of `arr`.
+
+    :param idxs:
+      Indices as returned by `prepare_idxs`.
+    :return:
+      A new array; for a consecutive run, a copy of the slice.
+    """
+    if isinstance(idxs, slice):
+        return arr[idxs].copy()
+    elif arr.dtype.kind in "SUV":
+        # For flexible dtypes, fancy indexing is faster than `take()`.
+        return arr[idxs]
+    else:
+        # The indices have already been checked.  Any mode other than "raise"
+        # avoids handling index errors; "wrap" still reduces each index, but
+        # this doesn't change valid ones.
+        return arr.take(idxs, mode="wrap")
+
+
+def concat(arrs):
+    """
+    Concatenates arrays.
+
+    If all are of an array type such as `StrArray`, concatenates them with
+    that type, which keeps it.  Otherwise, converts them to ndarrays.
+    """
+    types = { type(a) for a in arrs }
+    if len(types) == 1:
+        cls, = types
+        if not issubclass(cls, np.ndarray):
+            return cls.concat(arrs)
+    return np.concatenate(arrs)
+
+
+def expand_ranges(starts, counts):
+    """
+    Concatenates ranges of consecutive integers.
+
+      >>> expand_ranges(np.array([5, 0, 2]), np.array([2, 0, 3]))
+      array([5, 6, 2, 3, 4])
+
+    :return:
+      The concatenation of `arange(s, s + c)` for corresponding `starts` and
+      `counts`.
+    """
+    nonempty = counts > 0
+    starts = starts[nonempty]
+    counts = counts[nonempty]
+    if len(counts) == 0:
+        return np.array((), dtype=np.intp)
+
+    # Steps between consecutive elements: 1 within a range, and a jump to the
+    # start of the next range at each boundary.
+    steps = np.ones(counts.sum(), dtype=np.intp)
+    ends = np.cumsum(counts)
+    steps[0] = starts[0]
+    steps[ends[: -1]] = starts[1 :] - (starts[: -1] + counts[: -1] - 1)
+    return np.cumsum(steps)
+
+
+def take_fill(arr, idxs):
+    """
+    Gathers elements of `arr`, using the default value for negative indices.
+
+    :param idxs:
+      An array of indices into `arr`, or -1 for a missing element.
+    """
+    if not isinstance(arr, np.ndarray):
+        # An array type such as `StrArray`, which fills itself.
+        return arr.take_fill(idxs)
+    missing = idxs < 0
+    if not missing.any():
+        return take(arr, idxs)
+    if len(arr) == 0:
+        return np.full(len(idxs), default_for_dtype(arr.dtype), dtype=arr.dtype)
+    res = take(arr, np.where(missing, 0, idxs))
+    res[missing] = default_for_dtype(arr.dtype)
+    return res
+
+
+def _get_struct_base(arr):
+    """
+    If `arr` is a field of a one-dimensional structured array, returns that
+    array; otherwise `None`.
+    """
+    base = arr.base
+    while isinstance(base, np.ndarray):
+        if base.dtype.names is not None:
+            if (
+                    base.shape == arr.shape
+                and base.strides == arr.strides
+                and not base.dtype.hasobject
+            ):
+                return base
+            else:
+                return None
+        base = base.base
+    return None
+
+
+def _get_data(arr):
+    return arr.__array_interface__["data"][0]
+
+
+def take_arrs(arrs, idxs):
+    """
+    Gathers the same elements from each of a mapping of parallel arrays.
+
+    Fields of a structured array (such as those produced by `from_array`)
+    are strided, which makes gathering them separately slow.  If enough of
+    the fields of a structured array are given, the records are instead
+    gathered together, and the results are fields of the gathered records.
+
+    :param arrs:
+      Mapping from names to parallel arrays.
+    :param idxs:
+      Indices as returned by `prepare_idxs`.
+    :return:
+      A dict from names to gathered arrays, which are new arrays.
+    """
+    if isinstance(idxs, slice):
+        return { n: a[idxs].copy() for n, a in arrs.items() }
+
+    # Group fields by their structured arrays.
+    bases = {}
+    fields = {}
+    for name, arr in arrs.items():
+        if isinstance(arr, np.ndarray) and not arr.flags.c_contiguous:
+            base = _get_struct_base(arr)
+            if base is not None:
+                key = _get_data(base), base.dtype
+                bases[key] = base
+                fields.setdefault(key, []).append(name)
+
+    # Gather the records of structured arrays, if this touches less memory
+    # than gathering the fields separately.
+    taken = {}
+    for key, names in fields.items():
+        base = bases[key]
+        if 2 * sum( arrs[n].dtype.itemsize for n in names ) < base.itemsize:
+            continue
+        # As in `take()`, the indices have already been checked.
+        recs = base.take(idxs, mode="wrap")
+        for name in names:
+            arr = arrs[name]
+            taken[name] = np.ndarray(
+                shape   =recs.shape,
+                dtype   =arr.dtype,
+                buffer  =recs,
+                offset  =_get_data(arr) - _get_data(base),
+                strides =recs.strides,
+            )
+
+    return {
+        n: taken[n] if n in taken else take(a, idxs)
+        for n, a in arrs.items()
+    }
+
+
+#-------------------------------------------------------------------------------
+# Factorization functions
+
+# FNV-1a hash parameters.
+FNV_OFFSET  = np.uint64(0xcbf29ce484222325)
+FNV_PRIME   = np.uint64(0x100000001b3)
+
+def hash_strs(arr):
+    """
+    Computes a 64-bit hash of each string in a `str` or `bytes` array.
+    """
+    arr = np.ascontiguousarray(arr)
+    if arr.dtype.kind == "U":
+        units = arr.view(np.uint32).reshape(len(arr), arr.itemsize // 4)
+    else:
+        units = arr.view(np.uint8).reshape(len(arr), arr.itemsize)
+
+    hashes = np.full(len(arr), FNV_OFFSET)
+    # Hash one character position at a time, across all strings.
+    for j in range(units.shape[1]):
+        hashes ^= units[:, j]
+        hashes *= FNV_PRIME
+    return hashes
+
+
+def _sort_codes(codes, unique):
+    """
+    Sorts `unique`, and renumbers `codes` to match.
+    """
+    order = np.argsort(unique, kind="stable")
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    return rank[codes], unique[order]
+
+
+def _factorize_objs(arr):
+    index = {}
+    try:
+        codes = np.fromiter(
+            ( index.setdefault(v, len(index)) for v in arr.tolist() ),
+            dtype=np.intp, count=len(arr)
+        )
+    except TypeError:
+        # Unhashable objects.
+        return None
+    unique = np.fromiter(index, dtype=object, count=len(index))
+    return _sort_codes(codes, unique)
+
+
+def _factorize_strs(arr):
+    # Factorize the hashes.  These need not be sorted stably.
+    hashes = hash_strs(arr)
+    order = np.argsort(hashes)
+    hashes = hashes[order]
+    start = np.concatenate(([True], hashes[1 :] != hashes[: -1]))
+    codes = np.empty(len(arr), dtype=np.intp)
+    codes[order] = np.cumsum(start) - 1
+    unique = arr[order[start]]
+
+    if (unique[codes] == arr).all():
+        return _sort_codes(codes, unique)
+    else:
+        # Hash collision.
+        return None
+
+
+def _factorize_ints(arr):
+    dtype = arr.dtype
+    if dtype.kind == "b":
+        arr = arr.view(np.uint8)
+    lo = int(arr.min())
+    hi = int(arr.max())
+    if hi - lo >= max(len(arr), 256):
+        # Too sparse to index directly.
+        return None
+
+    # Use offsets from the min value as indexes.
+    if arr.dtype.kind == "u":
+        offsets = (arr - arr.dtype.type(lo)).astype(np.intp)
+    else:
+        offsets = arr.astype(np.intp) - lo
+    present = np.bincount(offsets, minlength=hi - lo + 1) > 0
+    unique, = present.nonzero()
+    rank = np.cumsum(present) - 1
+    return rank[offsets], (unique + lo).astype(dtype)
+
+
+def _factorize_fast(arr):
+    """
+    Factorizes `arr` without sorting it, if possible.
+
+    :return:
+      `codes, unique` as for `factorize`, or `None`.
+    """
+    if not isinstance(arr, np.ndarray):
+        # An array type such as `StrArray`, which factorizes itself.
+        return arr.factorize()
+    kind = arr.dtype.kind
+    if kind == "O":
+        return _factorize_objs(arr)
+    elif kind in "SU":
+        return _factorize_strs(arr)
+    elif kind in "biu":
+        return _factorize_ints(arr)
+    else:
+        return None
+
+
+def factorize(arr):
+    """
+    Assigns an integer code to each distinct value in an array.
+
+    Object and string arrays are factorized by hashing, and integer arrays
+    with a small range of values by direct indexing.  Other arrays are
+    sorted.
+
+      >>> codes, unique = factorize(np.array(["foo", "bar", "foo", "baz"]))
+      >>> unique
+      array(['bar', 'baz', 'foo'], dtype='<U3')
+      >>> codes
+      array([2, 0, 2, 1])
+
+    :return:
+      `codes, unique`, where `unique` is the sorted array of distinct values,
+      and `unique[codes]` equals `arr`.
+    """
+    if len(arr) == 0:
+        return np.array((), dtype=np.intp), arr
+    result = _factorize_fast(arr)
+    if result is None:
+        unique, codes = np.unique(arr, return_inverse=True)
+        result = codes.astype(np.intp, copy=False), unique
+    return result
+
+
+def argsort_stable(arr):
+    """
+    Returns the stable sort order of `arr`.
+
+    For integer and datetime arrays with a small enough range, each value is
+    packed with its index into a single integer, and these are sorted.  This
+    is much faster than `np.argsort`, as numpy sorts values faster than it
+    sorts indices.
+    """
+    kind = arr.dtype.kind
+    n = len(arr)
+    if n > 1 and kind in "iumM":
+        # NaT is the smallest int64, but sorts last, so the range check below
+        # excludes it.
+        ints = arr.view(np.int64) if kind in "mM" else arr
+        lo = int(ints.min())
+        span = int(ints.max()) - lo + 1
+        if span * n < 1 << 63:
+            keys = (ints - lo).astype(np.int64) * n + np.arange(n)
+            keys.sort()
+            return keys % n
+    return np.argsort(arr, kind="stable")
+
+
+def argsort_codes(codes, num):
+    """
+    Stably sorts codes in `range(num)`.
+
+    :return:
+      `order, edge`, where `order` is the stable sort order, and `edge` is an
+      array of length `num + 1` giving the start index in `order` of each code,
+      followed by `len(codes)`.
+    """
+    edge = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=num))))
+    # Numpy's stable sort of 8- and 16-bit integers is a radix sort.
+    if num <= 1 << 8:
+        codes = codes.astype(np.uint8)
+    elif num <= 1 << 16:
+        codes = codes.astype(np.uint16)
+    return np.argsort(codes, kind="stable"), edge
+
+
+def argsort_keys(arrs, descending=None):
+    """
+    Returns the stable order that sorts parallel arrays lexicographically.
+
+    Each array is factorized, and the codes are packed into a single integer
+    key, which is sorted once.  For a descending array, the codes are
+    reversed, so its order is the reverse of the ascending order, except that
+    rows with equal keys stay in their original order.
+
+    :param arrs:
+      A sequence of one or more parallel arrays.
+    :param descending:
+      A sequence of bools for each of `arrs`, true to sort it in descending
+      order.  If `None`, all are sorted in ascending order.
+    """
+    if descending is None:
+        descending = [False] * len(arrs)
+    if len(arrs) == 1 and not descending[0]:
+        return argsort_stable(arrs[0])
+
+    key = np.zeros(len(arrs[0]), dtype=np.int64)
+    num = 1
+    for arr, desc in zip(arrs, descending):
+        codes, unique = factorize(arr)
+        n = len(unique)
+        if desc:
+            codes = n - 1 - codes
+        if num * n > 1 << 62:
+            # Renumber the keys seen so far, as in `factorize_keys`.
+            key, unique_keys = factorize(key)
+            num = len(unique_keys)
+        key = key * n + codes
+        num *= n
+
+    if num <= 1 << 16:
+        order, _ = argsort_codes(key, num)
+        return order
+    else:
+        return argsort_stable(key)
+
+
 #-------------------------------------------------------------------------------
 # Grouping functions
 
@@ -200,6 +899,14 @@ def argunique(arr, order=None):
         return e, arr, e
 
     if order is None:
+        # If possible, factorize by hashing or indexing, which is faster than
+        # sorting, and then sort the codes.
+        result = _factorize_fast(arr)
+        if result is not None:
+            codes, unique = result
+            order, edge = argsort_codes(codes, len(unique))
+            return order, unique, edge
+
         order = np.argsort(arr, kind="mergesort")
 
     sort    = arr[order]
@@ -210,6 +917,71 @@ def argunique(arr, order=None):
     return order, unique, edge
 
 
+def factorize_keys(arrs):
+    """
+    Assigns an integer code to each distinct key tuple across parallel arrays.
+
+    Each array is factorized, and the codes are packed into a single integer
+    key, so the arrays are never combined or sorted lexicographically.
+
+    :return:
+      `codes, num`, where codes are in `range(num)` and are ordered as the
+      key tuples are ordered lexicographically.
+    """
+    key = np.zeros(len(arrs[0]), dtype=np.int64)
+    num = 1
+    for arr in arrs:
+        codes, unique = factorize(arr)
+        n = len(unique)
+        if num * n > 1 << 62:
+            # The packed key would overflow; renumber the keys seen so far.
+            # Factorized codes are sorted, so this preserves the key order.
+            key, unique_keys = factorize(key)
+            num = len(unique_keys)
+        key = key * n + codes
+        num *= n
+
+    if len(arrs) > 1:
+        key, unique = factorize(key)
+        num = len(unique)
+    return key, num
+
+
+def argunique_keys(arrs):
+    """
+    Finds unique key tuples across parallel arrays.
+
+    :param arrs:
+      A sequence of one or more parallel arrays.
+    :return:
+      `order, unique, edge`, as for `argunique`, except that `unique` is a
+      list of arrays, one for each of `arrs`, giving the sorted unique key
+      tuples.
+    """
+    if len(arrs[0]) == 0:
+        e = np.array((), dtype=int)
+        return e, list(arrs), e
+
+    codes, num = factorize_keys(arrs)
+    order, edge = argsort_codes(codes, num)
+    first = order[edge[: -1]]
+    return order, [ a[first] for a in arrs ], edge
+
+
+def _merge_unique(arr0, arr1):
+    """
+    Merges two sorted arrays of unique values.
+    """
+    if len(arr0) == 0:
+        return arr1
+    # Find values in `arr1` that aren't in `arr0`, and where they go.
+    pos = np.searchsorted(arr0, arr1)
+    new = arr0[np.minimum(pos, len(arr0) - 1)] != arr1
+    new |= pos == len(arr0)
+    arr0 = arr0.astype(np.result_type(arr0, arr1), copy=False)
+    return np.insert(arr0, pos[new], arr1[new])
+
+
 def arguniquen(arrays, orders=None):
     """
     Finds sets of unique values across a number of arrays.
@@ -235,6 +1007,9 @@ def arguniquen(arrays, orders=None):
     (a[idxs] == u).all()
     ```
 
+    Given the orders, this takes time linear in the lengths of the arrays,
+    plus a binary search of each array's unique values among all of them.
+
     @param arrays
       One or more arrays, of the same time, to find unique values in.
     @param orders
@@ -247,41 +1022,28 @@ def arguniquen(arrays, orders=None):
     if num == 0:
         raise ValueError("no arrays given")
 
-    if orders is None:
-        orders = [None] * num
-    orders = [
-        np.argsort(a, kind="mergesort") if o is None else o
-        for a, o in zip(arrays, orders)
-    ]
-
-    lengths = np.array([ len(a) for a in arrays ])
-    arr = np.concatenate(arrays)
-
     # Special case: no elements at all.
-    if len(arr) == 0:
+    if sum( len(a) for a in arrays ) == 0:
         e = np.array((), dtype=int)
-        return (e, ) * num, arr, (e, ) * num
+        return (e, ) * num, np.concatenate(arrays), (e, ) * num
 
-    # FIXME: Use `orders` to do this in linear time.
-    order   = np.argsort(arr, kind="mergesort")
-    sort    = arr[order]
-    edge    = np.concatenate(([True], sort[1 :] != sort[: -1]))
-    unique  = sort[edge]
-    edge,   = edge.nonzero()
-
-    # Construct an array identifying which sorted value is from which array.
-    which   = np.repeat(np.arange(num), lengths)[order]
-    if True:  # FIXME: unravel_groups is faster!
-        # Slice this up by unique value, and count how many from which array.
-        ref     = np.arange(num)[:, np.newaxis]
-        edges   = [ (o == ref).sum(axis=1) for o in np.split(which, edge) ]
-        # For convenience, tack on an extra edge row with the length of each array.
-        edges.append(lengths)
-        # The cumsum of these gives positions in the individual order arrays.
-        edges   = np.vstack(edges).cumsum(axis=0)
-    else:
-        import nputil
-        edges = nputil.unravel_groups(num, which, edge).cumsum(axis=0)
+    if orders is None:
+        orders = [None] * num
+    # Find unique values in each array, which is linear given its order.
+    groups = [ argunique(a, o) for a, o in zip(arrays, orders) ]
+    orders = [ o for o, _, _ in groups ]
+
+    # Merge the sorted unique values.
+    unique = groups[0][1]
+    for _, u, _ in groups[1 :]:
+        unique = _merge_unique(unique, u)
+
+    # Count each array's values for each unique value.  The cumsum of these
+    # gives positions in the individual order arrays.
+    edges = np.zeros((len(unique) + 1, num), dtype=int)
+    for j, (_, u, edge) in enumerate(groups):
+        edges[np.searchsorted(unique, u) + 1, j] = np.diff(edge)
+    edges = edges.cumsum(axis=0)
 
     return orders, unique, edges
 
@@ -0,0 +1,241 @@
+"""
+Predicates for selecting rows by column values.
+
+Pass predicates as values to `fn.filter`, `fn.filter_mask`, or `fn.find`:
+
+    fn.filter(tab, px=pred.Between(10, 20), sym=pred.IsIn(["a", "b"]))
+
+A plain value is equivalent to `Eq(value)`.
+"""
+
+#-------------------------------------------------------------------------------
+
+import numpy as np
+
+from   .lib import format_ctor
+from   .strarr import StrArray
+
+#-------------------------------------------------------------------------------
+
+class Predicate:
+    """
+    Base class for predicates on array values.
+
+    A predicate is evaluated on one block of an array at a time, writing
+    results into a boolean array, so that no temporaries larger than a block
+    are allocated.
+    """
+
+    # Approximate relative cost of evaluating the predicate per element.
+    COST = 1
+
+    def __repr__(self):
+        args = ( v for n, v in self.__dict__.items() if not n.startswith("_") )
+        return format_ctor(self, *args)
+
+
+    def __call__(self, arr, out):
+        """
+        Evaluates the predicate on `arr`.
+
+        :param out:
+          Boolean array of the same length, into which results are written.
+        """
+        raise NotImplementedError("__call__")
+
+
+    def cost(self, arr):
+        """
+        Returns the approximate cost of evaluating the predicate per element
+        of `arr`.
+        """
+        # Comparing longer values costs more.
+        return self.COST * max(1, arr.dtype.itemsize // 8)
+
+
+    def mask(self, arr):
+        """
+        Evaluates the predicate on all of `arr`.
+        """
+        out = np.empty(len(arr), dtype=bool)
+        self(arr, out)
+        return out
+
+
+
+class Eq(Predicate):
+    """
+    Values equal to `value`.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+    def __call__(self, arr, out):
+        try:
+            np.equal(arr, self.value, out=out)
+        except TypeError:
+            # No ufunc loop for these types; compare as numpy does.
+            out[:] = arr == self.value
+
+
+
+class Ne(Predicate):
+    """
+    Values not equal to `value`.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+    def __call__(self, arr, out):
+        try:
+            np.not_equal(arr, self.value, out=out)
+        except TypeError:
+            # No ufunc loop for these types; compare as numpy does.
+            out[:] = arr != self.value
+
+
+
+class Between(Predicate):
+    """
+    Values in the half-open range `[lo, hi)`.
+
+    Either bound may be `None` for no bound.
+    """
+
+    COST = 2
+
+    def __init__(self, lo=None, hi=None):
+        self.lo = lo
+        self.hi = hi
+        self.__scratch = np.empty(0, dtype=bool)
+
+
+    def __call__(self, arr, out):
+        if self.lo is None:
+            out[:] = True
+        else:
+            np.greater_equal(arr, self.lo, out=out)
+        if self.hi is not None:
+            # Reuse a scratch buffer across blocks.
+            if len(self.__scratch) < len(arr):
+                self.__scratch = np.empty(len(arr), dtype=bool)
+            scratch = self.__scratch[: len(arr)]
+            np.less(arr, self.hi, out=scratch)
+            out &= scratch
+
+
+
+class IsIn(Predicate):
+    """
+    Values equal to any of `values`.
+    """
+
+    # Max number of values to compare individually.
+    MAX_COMPARE = 8
+
+    def __init__(self, values):
+        self.values = np.asarray(values)
+        self.__scratch = np.empty(0, dtype=bool)
+
+
+    def cost(self, arr):
+        num = len(self.values)
+        cost = num if num <= self.MAX_COMPARE else 2 * np.log2(num)
+        return cost * max(1, arr.dtype.itemsize // 8)
+
+
+    def __call__(self, arr, out):
+        if len(self.values) > self.MAX_COMPARE:
+            out[:] = np.isin(arr, self.values)
+            return
+
+        out[:] = False
+        if len(self.__scratch) < len(arr):
+            self.__scratch = np.empty(len(arr), dtype=bool)
+        scratch = self.__scratch[: len(arr)]
+        for value in self.values:
+            np.equal(arr, value, out=scratch)
+            out |= scratch
+
+
+
+class IsNan(Predicate):
+    """
+    NaN or NaT values.
+    """
+
+    def __call__(self, arr, out):
+        kind = arr.dtype.kind
+        if kind in "fc":
+            np.isnan(arr, out=out)
+        elif kind in "mM":
+            np.isnat(arr, out=out)
+        else:
+            out[:] = False
+
+
+
+class NotNan(Predicate):
+    """
+    Values other than NaN or NaT.
+    """
+
+    def __call__(self, arr, out):
+        IsNan.__call__(self, arr, out)
+        np.logical_not(out, out=out)
+
+
+
+class StartsWith(Predicate):
+    """
+    Strings that start with `prefix`.
+    """
+
+    COST = 4
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+
+    def __call__(self, arr, out):
+        if isinstance(arr, StrArray):
+            out[:] = arr.startswith(self.prefix)
+            return
+        kind = arr.dtype.kind
+        if kind not in "SU":
+            out[:] = [
+                isinstance(v, type(self.prefix)) and v.startswith(self.prefix)
+                for v in arr
+            ]
+            return
+
+        prefix = np.array([self.prefix], dtype=kind)
+        size = len(self.prefix) * (4 if kind == "U" else 1)
+        if size == 0:
+            out[:] = True
+        elif size > arr.itemsize:
+            out[:] = False
+        else:
+            # Compare the leading bytes of each value to the prefix.
+            width = arr.itemsize
+            units = np.ascontiguousarray(arr).view(np.uint8).reshape(-1, width)
+            np.all(
+                units[:, : size] == prefix.view(np.uint8)[: size],
+                axis=1, out=out
+            )
+
+
+
+#-------------------------------------------------------------------------------
+
+def as_predicate(value):
+    """
+    Returns `value` if it is a predicate, else a predicate for equality.
+    """
+    return value if isinstance(value, Predicate) else Eq(value)
+
+
@@ -0,0 +1,206 @@
+"""
+Tables in shared memory, for use by multiple processes without copying.
+
+`Table.to_shared()` copies a table's arrays into a shared memory block, and
+returns a `SharedTable` handle.  The handle is small and picklable; pass it
+to other processes, which call `Table.attach(handle)` to construct a table
+whose arrays are in the same shared memory.
+
+The block stays allocated until it is unlinked, usually by the process that
+created it.  Each process should also close its mapping of the block, once
+it no longer uses the table's arrays.  A handle used as a context manager
+does both.
+"""
+
+#-------------------------------------------------------------------------------
+
+import gc
+from   multiprocessing import shared_memory
+import numpy as np
+import sys
+
+from   .lib import format_ctor
+
+#-------------------------------------------------------------------------------
+
+# Column data offsets are aligned to this many bytes.
+ALIGNMENT = 64
+
+# Shared memory blocks mapped in this process, by name.
+_blocks = {}
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _open_block(name):
+    """
+    Returns the shared memory block `name`, mapping it if necessary.
+    """
+    try:
+        return _blocks[name]
+    except KeyError:
+        pass
+
+    if sys.version_info >= (3, 13):
+        block = shared_memory.SharedMemory(name, track=False)
+    else:
+        block = shared_memory.SharedMemory(name)
+        # Before Python 3.13, the resource tracker unlinks every block this
+        # process opened when it exits, even if another process created it.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(block._name, "shared_memory")
+
+    _blocks[name] = block
+    return block
+
+
+def _close_block(block):
+    try:
+        block.close()
+    except BufferError:
+        # Tables are in reference cycles with their proxies, so arrays may be
+        # referenced only by garbage.
+        gc.collect()
+        block.close()
+
+
+class SharedTable:
+    """
+    Handle to a table in shared memory.
+    """
+
+    def __init__(self, name, num_rows, cols):
+        """
+        :param name:
+          The name of the shared memory block.
+        :param cols:
+          Sequence of `name, dtype, offset` for each column, where `offset`
+          is the position of the column's data in the block.
+        """
+        self.name       = name
+        self.num_rows   = num_rows
+        self.cols       = tuple(cols)
+        # True if this process created the block.
+        self.owner      = False
+
+
+    def __repr__(self):
+        return format_ctor(self, self.name, self.num_rows, self.cols)
+
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        # Only the original handle owns the block.
+        state["owner"] = False
+        return state
+
+
+    def attach(self, Table=None):
+        """
+        Constructs a table whose arrays are in the shared memory block.
+        """
+        if Table is None:
+            from .tab import Table
+        buf = _open_block(self.name).buf
+        arrs = {
+            n: np.frombuffer(buf, dtype=d, count=self.num_rows, offset=o)
+            for n, d, o in self.cols
+        }
+        # The arrays were valid when shared, so don't check them again.
+        return Table.wrap(arrs, check=False)
+
+
+    def close(self):
+        """
+        Closes this process's mapping of the shared memory block.
+
+        :raise BufferError:
+          Arrays of a table attached to the block are still in use.
+        """
+        try:
+            block = _blocks.pop(self.name)
+        except KeyError:
+            return
+        try:
+            _close_block(block)
+        except BufferError:
+            _blocks[self.name] = block
+            raise BufferError(f"shared table arrays in use: {self.name}")
+
+
+    def unlink(self):
+        """
+        Requests that the shared memory block be freed, once every process has
+        closed it.  Subsequent attaches will fail.
+        """
+        try:
+            block = _blocks[self.name]
+        except KeyError:
+            block = shared_memory.SharedMemory(self.name)
+            block.close()
+        block.unlink()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        """
+        Closes the block, and if this handle created it, unlinks it.
+        """
+        try:
+            self.close()
+        finally:
+            if self.owner:
+                self.unlink()
+
+
+
+def to_shared(tab):
+    """
+    Copies a table's arrays into a new shared memory block.
+
+    :return:
+      A `SharedTable` handle, which owns the block.
+    :raise TypeError:
+      The table has an object column, which cannot be shared.
+    """
+    cols = []
+    size = 0
+    for name, arr in tab.arrs.items():
+        if arr.dtype.hasobject:
+            raise TypeError(f"can't share object array: {name}")
+        offset = _align(size)
+        cols.append((name, arr.dtype, offset))
+        size = offset + arr.nbytes
+
+    # A shared memory block can't be empty.
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    _blocks[block.name] = block
+    for (_, dtype, offset), arr in zip(cols, tab.arrs.values()):
+        dst = np.frombuffer(block.buf, dtype=dtype, count=len(arr), offset=offset)
+        dst[:] = arr
+        del dst
+
+    handle = SharedTable(block.name, tab.num_rows, cols)
+    handle.owner = True
+    return handle
+
+
+def close_all():
+    """
+    Closes all shared memory blocks mapped by this process.
+
+    Blocks whose arrays are still in use are left open.
+    """
+    for name, block in list(_blocks.items()):
+        try:
+            _close_block(block)
+        except BufferError:
+            pass
+        else:
+            del _blocks[name]
+
+
@@ -0,0 +1,491 @@
+"""
+Compact arrays of variable-length strings.
+
+A `StrArray` stores strings as UTF-8 in a single contiguous byte buffer,
+with an array of offsets into it.  Unlike a `<U` array, strings aren't padded
+to the longest one, and unlike an `object` array, there is no Python object
+per string.
+
+A `StrArray` may be used as a table column:
+
+    tab.arrs["label"] = StrArray(tab.arrs["label"])
+
+Gathering rows, equality comparisons, and grouping operate on the buffers
+directly.  Other numpy operations convert it to an `object` array first.
+"""
+
+#-------------------------------------------------------------------------------
+
+import bisect
+import numpy as np
+
+from   . import nplib
+from   .lib import format_ctor
+
+#-------------------------------------------------------------------------------
+
+# Parameters of the polynomial string hash, computed modulo 2**64.
+_HASH_MULT      = 0x100000001b3
+_HASH_MULT_INV  = pow(_HASH_MULT, -1, 1 << 64)
+
+# Max number of bytes to hash at a time, unless one string is longer.
+HASH_BLOCK_BYTES = 1 << 16
+
+def _powers(base, num):
+    """
+    Returns `base ** arange(num)` modulo 2**64.
+    """
+    pows = np.full(num, base, dtype=np.uint64)
+    pows[0] = 1
+    return np.cumprod(pows, dtype=np.uint64)
+
+
+# Powers for hashing a block, by base.
+_block_powers = {}
+
+def _block_powers_of(base, num):
+    pows = _block_powers.get(base)
+    if pows is None or len(pows) < num:
+        if num > HASH_BLOCK_BYTES + 1:
+            # A single long string.
+            return _powers(base, num)
+        pows = _block_powers[base] = _powers(base, HASH_BLOCK_BYTES + 1)
+    return pows[: num]
+
+
+def _hash_segments(data, offsets):
+    """
+    Hashes the byte strings `data[offsets[i] : offsets[i + 1]]`.
+    """
+    lengths = np.diff(offsets)
+    # Each string's hash is the sum of its bytes times powers of the
+    # multiplier, computed from prefix sums over all bytes, then shifted by
+    # the inverse power of the string's start.
+    mults = _block_powers_of(_HASH_MULT, len(data))
+    prefix = np.zeros(len(data) + 1, dtype=np.uint64)
+    np.cumsum(data * mults, dtype=np.uint64, out=prefix[1 :])
+    hashes = prefix[offsets[1 :]] - prefix[offsets[: -1]]
+    hashes *= _block_powers_of(_HASH_MULT_INV, len(data) + 1)[offsets[: -1]]
+    # Zero bytes don't change the sum; include the length.
+    hashes ^= lengths.astype(np.uint64) * np.uint64(0x9e3779b97f4a7c15)
+    return hashes
+
+
+#-------------------------------------------------------------------------------
+
+# Strings up to this many bytes are compared one byte position at a time,
+# rather than by expanding the range of each string.
+MAX_SHORT_BYTES = 32
+
+class StrArray:
+    """
+    One-dimensional array of strings, stored as UTF-8.
+
+    Elements are `str`.  Indexing with an integer returns a string; with a
+    slice, a `StrArray` view of the same buffer; with an index array or mask,
+    a new `StrArray` of the selected strings.
+    """
+
+    # Elements are exposed as Python objects.
+    dtype = np.dtype(object)
+    ndim = 1
+
+    def __init__(self, strs=()):
+        """
+        :param strs:
+          A sequence of strings, or an array of them.
+        """
+        if isinstance(strs, StrArray):
+            data, offsets = strs.__compact()
+            data = data.copy()
+        else:
+            if isinstance(strs, np.ndarray):
+                strs = strs.tolist()
+            try:
+                encoded = [ s.encode() for s in strs ]
+            except AttributeError:
+                raise TypeError("not a sequence of str")
+            data = np.frombuffer(b"".join(encoded), dtype=np.uint8).copy()
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum(
+                np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+                out=offsets[1 :]
+            )
+        self.__data = data
+        self.__offsets = offsets
+
+
+    @classmethod
+    def wrap(cls, data, offsets):
+        """
+        Constructs an array of existing buffers, without copying.
+
+        :param data:
+          A `uint8` array of UTF-8 bytes.
+        :param offsets:
+          A nondecreasing integer array with one more element than the number
+          of strings, of their start positions in `data`, followed by the end
+          position of the last string.
+        """
+        self = object.__new__(cls)
+        self.__data = np.asarray(data, dtype=np.uint8)
+        self.__offsets = np.asarray(offsets, dtype=np.int64)
+        if len(self.__offsets) == 0:
+            raise ValueError("offsets may not be empty")
+        return self
+
+
+    def __compact(self):
+        """
+        Returns data and offsets of only this array's strings.
+        """
+        offsets = self.__offsets
+        start = offsets[0]
+        return self.__data[start : offsets[-1]], offsets - start
+
+
+    def __reduce__(self):
+        return self.wrap, self.__compact()
+
+
+    def __repr__(self):
+        return format_ctor(self, self.tolist())
+
+
+    def __len__(self):
+        return len(self.__offsets) - 1
+
+
+    @property
+    def shape(self):
+        return (len(self), )
+
+
+    @property
+    def data(self):
+        """
+        The buffer of UTF-8 bytes.  It may contain bytes of other strings.
+        """
+        return self.__data
+
+
+    @property
+    def offsets(self):
+        """
+        The offsets of strings in `data`, followed by the end offset.
+        """
+        return self.__offsets
+
+
+    @property
+    def lengths(self):
+        """
+        The length of each string in UTF-8 bytes.
+        """
+        return np.diff(self.__offsets)
+
+
+    @property
+    def nbytes(self):
+        """
+        The number of bytes used by this array's strings and offsets.
+        """
+        offsets = self.__offsets
+        return int(offsets[-1] - offsets[0]) + offsets.nbytes
+
+
+    def copy(self):
+        return self.__class__(self)
+
+
+    #---------------------------------------------------------------------------
+    # Elements
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            num = len(self)
+            i = key + num if key < 0 else key
+            if not 0 <= i < num:
+                raise IndexError("index out of range")
+            start, stop = self.__offsets[i : i + 2]
+            return self.__data[start : stop].tobytes().decode()
+
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                # A view of the same buffer.
+                return self.wrap(
+                    self.__data, self.__offsets[start : max(start, stop) + 1])
+            key = np.arange(start, stop, step)
+
+        key = np.asarray(key)
+        if key.dtype.kind == "b":
+            if key.shape != self.shape:
+                raise IndexError("wrong mask length")
+            key, = key.nonzero()
+        return self.take(key)
+
+
+    def __iter__(self):
+        data = self.__data.tobytes()
+        offsets = self.__offsets.tolist()
+        return (
+            data[s : e].decode() for s, e in zip(offsets[: -1], offsets[1 :]) )
+
+
+    def tolist(self):
+        return list(self)
+
+
+    def __array__(self, dtype=None, copy=None):
+        if copy is False:
+            raise ValueError("can't convert StrArray without copying")
+        arr = np.empty(len(self), dtype=object)
+        arr[:] = self.tolist()
+        return arr if dtype is None else arr.astype(dtype)
+
+
+    def take(self, idxs, mode=None):
+        """
+        Gathers strings at `idxs`.
+
+        :param mode:
+          Ignored; indices are always checked.
+        """
+        idxs = np.asarray(idxs, dtype=np.intp)
+        num = len(self)
+        if len(idxs) > 0:
+            if idxs.min() < 0:
+                idxs = np.where(idxs < 0, idxs + num, idxs)
+            if idxs.min() < 0 or idxs.max() >= num:
+                raise IndexError("index out of range")
+        return self.__take(idxs)
+
+
+    def __take(self, idxs, lengths=None):
+        starts = self.__offsets[idxs]
+        if lengths is None:
+            lengths = self.__offsets[idxs + 1] - starts
+        offsets = np.zeros(len(idxs) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1 :])
+        data = self.__data[nplib.expand_ranges(starts, lengths)]
+        return self.wrap(data, offsets)
+
+
+    def take_fill(self, idxs):
+        """
+        Gathers strings at `idxs`, with an empty string for -1.
+        """
+        idxs = np.asarray(idxs, dtype=np.intp)
+        missing = idxs < 0
+        idxs = np.where(missing, 0, idxs)
+        if len(self) == 0:
+            return self.wrap(np.empty(0, dtype=np.uint8), np.zeros(len(idxs) + 1))
+        lengths = np.where(missing, 0, self.__offsets[idxs + 1] - self.__offsets[idxs])
+        return self.__take(idxs, lengths)
+
+
+    @classmethod
+    def concat(cls, arrs):
+        """
+        Concatenates `StrArray`s into a new one.
+        """
+        parts = [ a.__compact() for a in arrs ]
+        data = np.concatenate(
+            [np.empty(0, dtype=np.uint8)] + [ d for d, _ in parts ])
+        offsets = np.zeros(sum( len(o) - 1 for _, o in parts ) + 1, dtype=np.int64)
+        np.cumsum(
+            np.concatenate(
+                [np.empty(0, dtype=np.int64)] + [ np.diff(o) for _, o in parts ]),
+            out=offsets[1 :]
+        )
+        return cls.wrap(data, offsets)
+
+
+    #---------------------------------------------------------------------------
+    # Comparison
+
+    def __equal_str(self, value):
+        value = np.frombuffer(value.encode(), dtype=np.uint8)
+        size = len(value)
+        mask = self.lengths == size
+        if size > 0:
+            idxs, = mask.nonzero()
+            # Compare the bytes of strings with the same length.
+            chars = self.__data[self.__offsets[idxs][:, None] + np.arange(size)]
+            mask[idxs] = (chars == value).all(axis=1)
+        return mask
+
+
+    def __equal_at(self, idxs0, other, idxs1):
+        """
+        Compares strings at `idxs0` to strings of `other` at `idxs1`.
+        """
+        starts0 = self.__offsets[idxs0]
+        lengths = self.__offsets[idxs0 + 1] - starts0
+        starts1 = other.__offsets[idxs1]
+        mask = lengths == other.__offsets[idxs1 + 1] - starts1
+        idxs, = mask.nonzero()
+        lengths = lengths[idxs]
+        starts0 = starts0[idxs]
+        starts1 = starts1[idxs]
+        if len(idxs) == 0:
+            # No pair of strings has the same length.
+            return mask
+
+        width = lengths.max()
+        if width <= MAX_SHORT_BYTES:
+            # Compare one byte position at a time.
+            same = np.ones(len(idxs), dtype=bool)
+            min_length = lengths.min()
+            for j in range(width):
+                if j < min_length:
+                    same &= self.__data[starts0 + j] == other.__data[starts1 + j]
+                else:
+                    sel, = (lengths > j).nonzero()
+                    same[sel] &= (
+                        self.__data[starts0[sel] + j]
+                        == other.__data[starts1[sel] + j]
+                    )
+            mask[idxs] = same
+            return mask
+
+        chars0 = self.__data[nplib.expand_ranges(starts0, lengths)]
+        chars1 = other.__data[nplib.expand_ranges(starts1, lengths)]
+        # Count differing bytes in each string.
+        which = np.repeat(np.arange(len(idxs)), lengths)
+        diffs = np.bincount(which[chars0 != chars1], minlength=len(idxs))
+        mask[idxs] = diffs == 0
+        return mask
+
+
+    def __equal_arr(self, other):
+        if len(other) != len(self):
+            raise ValueError("arrays have different lengths")
+        idxs = np.arange(len(self))
+        return self.__equal_at(idxs, other, idxs)
+
+
+    def __equal(self, other):
+        """
+        Compares elementwise to a string or array.
+        """
+        if isinstance(other, str):
+            return self.__equal_str(other)
+        if not isinstance(other, StrArray):
+            other = np.asarray(other)
+            if other.dtype.kind not in "UO":
+                return np.asarray(self) == other
+            other = StrArray(other)
+        return self.__equal_arr(other)
+
+
+    def __eq__(self, other):
+        return self.__equal(other)
+
+
+    def __ne__(self, other):
+        return ~self.__equal(other)
+
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kw_args):
+        if (
+                ufunc in (np.equal, np.not_equal)
+            and method == "__call__"
+            and len(inputs) == 2
+            and set(kw_args) <= {"out"}
+        ):
+            other = inputs[1] if inputs[0] is self else inputs[0]
+            res = self.__equal(other)
+            if ufunc is np.not_equal:
+                np.logical_not(res, out=res)
+            out = kw_args.get("out")
+            if out is None:
+                return res
+            out, = out
+            out[...] = res
+            return out
+
+        # Otherwise, convert to object arrays.
+        inputs = [ np.asarray(i) if isinstance(i, StrArray) else i for i in inputs ]
+        return getattr(ufunc, method)(*inputs, **kw_args)
+
+
+    def startswith(self, prefix):
+        """
+        Returns a mask of strings that start with `prefix`.
+        """
+        prefix = np.frombuffer(prefix.encode(), dtype=np.uint8)
+        size = len(prefix)
+        mask = self.lengths >= size
+        if size > 0:
+            idxs, = mask.nonzero()
+            chars = self.__data[self.__offsets[idxs][:, None] + np.arange(size)]
+            mask[idxs] = (chars == prefix).all(axis=1)
+        return mask
+
+
+    def searchsorted(self, value, side="left"):
+        """
+        Finds the position of `value` in a sorted array, by binary search.
+        """
+        if side == "left":
+            return bisect.bisect_left(self, value)
+        elif side == "right":
+            return bisect.bisect_right(self, value)
+        else:
+            raise ValueError(f"invalid side: {side}")
+
+
+    #---------------------------------------------------------------------------
+    # Grouping
+
+    def hash(self):
+        """
+        Computes a 64-bit hash of each string.
+        """
+        data, offsets = self.__compact()
+        hashes = np.empty(len(self), dtype=np.uint64)
+        # Hash blocks of strings, to limit temporary memory.
+        i0 = 0
+        while i0 < len(self):
+            i1 = max(
+                i0 + 1,
+                int(np.searchsorted(offsets, offsets[i0] + HASH_BLOCK_BYTES, "right")) - 1
+            )
+            o = offsets[i0 : i1 + 1]
+            hashes[i0 : i1] = _hash_segments(data[o[0] : o[-1]], o - o[0])
+            i0 = i1
+        return hashes
+
+
+    def factorize(self):
+        """
+        Assigns an integer code to each distinct string.
+
+        :return:
+          `codes, unique` as for `nplib.factorize`, where `unique` is a sorted
+          `StrArray`.
+        """
+        # Factorize the hashes, as `nplib` does for fixed-width strings.
+        hashes = self.hash()
+        order = np.argsort(hashes)
+        hashes = hashes[order]
+        start = np.concatenate(([True], hashes[1 :] != hashes[: -1]))[: len(self)]
+        codes = np.empty(len(self), dtype=np.intp)
+        codes[order] = np.cumsum(start) - 1
+        first = order[start]
+
+        # Compare each string to the first with the same hash.
+        idxs, = (first[codes] != np.arange(len(self))).nonzero()
+        if not self.__equal_at(idxs, self, first[codes[idxs]]).all():
+            # Hash collision.
+            codes, unique = nplib.factorize(np.asarray(self))
+            unique = StrArray(unique)
+            return codes, unique
+
+        # Sort the distinct strings; UTF-8 byte order is code point order.
+        return nplib._sort_codes(codes, self.take(first))
+
+
+
@@ -6,10 +6,14 @@ Pandas-lite tables, in a more numpy-oriented manner.
 
 import collections.abc
 import numpy as np
+import pickle
 
 from   . import fmt
+from   . import nplib
+from   .index import Index
+from   .strarr import StrArray
 from   .lib import memo
-from   .lib import normalize_index, format_ctor, a_value
+from   .lib import normalize_index, format_ctor, a_value, tupleize
 
 __all__ = (
     "Table",
@@ -29,7 +33,7 @@ def _ensure_array(obj, length):
     """
     arr = None
 
-    if isinstance(obj, np.ndarray):
+    if isinstance(obj, (np.ndarray, StrArray)):
         arr = obj
 
     if arr is None and not isinstance(obj, (bytes, str)):
@@ -54,6 +58,190 @@ def _ensure_array(obj, length):
     return arr
 
 
+def _normalize_sel(sel, length):
+    """
+    Normalizes a row selection to a slice or an array of indices.
+
+    :return:
+      `sel, num`, where `sel` is a slice or an index array as returned by
+      `nplib.prepare_idxs`, and `num` is the number of rows selected.
+    """
+    if not isinstance(sel, slice):
+        sel = np.asarray(sel)
+        if len(sel.shape) != 1:
+            raise IndexError("not one-dimensional")
+        if sel.dtype.kind == "b":
+            if len(sel) != length:
+                raise IndexError("wrong mask length")
+            sel = np.flatnonzero(sel)
+        elif len(sel) > 0 and sel.dtype.kind not in "iu":
+            raise IndexError(f"not an index array: {sel.dtype}")
+        sel = nplib.prepare_idxs(sel, length)
+
+    if isinstance(sel, slice):
+        return sel, len(range(length)[sel])
+    else:
+        return sel, len(sel)
+
+
+class _SelectedArrs(collections.abc.MutableMapping):
+    """
+    Mapping from names to arrays, some of which are selected lazily.
+
+    Each column is stored as an `arr, idxs` pair.  If `idxs` is `None`, `arr` is
+    the column array itself.  Otherwise, the column consists of `arr[idxs]`;
+    this is gathered the first time the column is accessed, and stored in place
+    of the pair.
+
+    Columns that share a selection share the same `idxs` object.
+    """
+
+    def __init__(self, cols):
+        self.__cols = cols
+
+
+    def __len__(self):
+        return len(self.__cols)
+
+
+    def __iter__(self):
+        return iter(self.__cols)
+
+
+    def __contains__(self, name):
+        return name in self.__cols
+
+
+    def __getitem__(self, name):
+        arr, idxs = self.__cols[name]
+        if idxs is not None:
+            arr = nplib.take(arr, idxs)
+            self.__cols[name] = arr, None
+        return arr
+
+
+    def __setitem__(self, name, arr):
+        self.__cols[name] = arr, None
+
+
+    def __delitem__(self, name):
+        del self.__cols[name]
+
+
+    @property
+    def cols(self):
+        return self.__cols
+
+
+    def gather(self):
+        """
+        Gathers all columns.
+
+        :return:
+          A dict from names to arrays.
+        """
+        # Gather together the columns that share each selection.
+        groups = {}
+        for name, (arr, idxs) in self.__cols.items():
+            if idxs is not None:
+                groups.setdefault(id(idxs), (idxs, {}))[1][name] = arr
+        for idxs, arrs in groups.values():
+            for name, arr in nplib.take_arrs(arrs, idxs).items():
+                self.__cols[name] = arr, None
+        return { n: a for n, (a, _) in self.__cols.items() }
+
+
+
+def _is_ordered(sel):
+    """
+    Returns true if a normalized selection preserves the order of rows.
+    """
+    if isinstance(sel, slice):
+        return sel.step is None or sel.step > 0
+    else:
+        return len(sel) < 2 or bool((sel[1 :] >= sel[: -1]).all())
+
+
+def _select(arrs, sel, view=False):
+    """
+    Selects rows lazily from `arrs`.
+
+    Arrays that have not yet been gathered are not gathered; instead, their
+    index arrays are composed with `sel`.
+
+    :param arrs:
+      A mapping from names to arrays, or a `_SelectedArrs`.
+    :param sel:
+      A slice or index array, as returned by `_normalize_sel`.
+    :param view:
+      If true and `sel` is a slice, select arrays by views.  Otherwise, the
+      selected arrays are copies.
+    :return:
+      A `_SelectedArrs`.
+    """
+    if isinstance(arrs, _SelectedArrs):
+        cols = arrs.cols
+    else:
+        cols = { n: (a, None) for n, a in arrs.items() }
+
+    # Compose each distinct index array only once.
+    composed = {}
+    def compose(idxs):
+        key = id(idxs)
+        try:
+            return composed[key]
+        except KeyError:
+            if isinstance(idxs, slice):
+                # A consecutive run from `nplib.prepare_idxs`.
+                idxs = np.arange(idxs.start, idxs.stop)
+            new = composed[key] = idxs[sel]
+            return new
+
+    selected = {}
+    for name, (arr, idxs) in cols.items():
+        if idxs is not None:
+            selected[name] = arr, compose(idxs)
+        elif view and isinstance(sel, slice):
+            # Slicing produces a view, so there's no reason to defer it.
+            selected[name] = arr[sel], None
+        else:
+            selected[name] = arr, sel
+    return _SelectedArrs(selected)
+
+
+def _reduce_arr(arr, protocol):
+    """
+    Prepares an array for pickling.
+
+    With pickle protocol 5 or later, returns a `dtype, buf` pair, where `buf`
+    is a `pickle.PickleBuffer` of the array's data, which may be transferred
+    out-of-band.  Otherwise, or if the array has no raw data, returns the
+    array itself.
+    """
+    if protocol < 5 or arr.dtype.hasobject or arr.dtype.itemsize == 0:
+        return arr
+    else:
+        # A buffer requires contiguous data.  Exporting it as bytes also works
+        # for dtypes, like datetime64, that don't support the buffer protocol.
+        data = np.ascontiguousarray(arr).view(np.uint8)
+        return arr.dtype, pickle.PickleBuffer(data)
+
+
+def _unpickle_arr(obj):
+    if isinstance(obj, tuple):
+        dtype, buf = obj
+        return np.frombuffer(buf, dtype=np.uint8).view(dtype)
+    else:
+        return obj
+
+
+def _unpickle_table(cls, cols, sorted_by=()):
+    # The arrays were valid when pickled, so don't check them again.
+    table = cls.wrap({ n: _unpickle_arr(o) for n, o in cols }, check=False)
+    table._Table__sorted_by = sorted_by
+    return table
+
+
 #-------------------------------------------------------------------------------
 
 class ArraysObjectProxy:
@@ -257,23 +445,57 @@ class Table:
         return Row(self.__arrs, idx)
 
 
-    def _take_rows(self, idxs):
-        return self.__class__(
-            # FIXME: a.take(idxs) _should_ be faster, but its 1000x slower if
-            # a is not a contiguous array.
-            (n, a[idxs]) for n, a in self.__arrs.items()
+    def _take_rows(self, idxs, sorted_by=None):
+        """
+        Returns a subtable of rows at `idxs`, gathering all columns.
+
+        :param sorted_by:
+          Names of columns by which the selected rows are known to be sorted.
+        """
+        idxs, length = _normalize_sel(idxs, self.num_rows)
+        if sorted_by is None:
+            sorted_by = self.__select_sorted_by(idxs)
+        table = object.__new__(self.__class__)
+        table.__construct(
+            None if len(self.__arrs) == 0 else length,
+            # Gather from the original arrays of any lazy columns.
+            _select(self.__arrs, idxs).gather(),
+            tuple(sorted_by),
         )
+        return table
 
 
     def __get_subtable(self, sel):
-        # FIXME: Store the mask in the table and filter lazily.
-        return self.__class__(
-            (n, a[sel]) for n, a in self.__arrs.items() )
+        """
+        Returns a subtable of rows selected by a slice, mask, or index array.
+
+        The subtable is a lazy view: a column is gathered from this table's
+        arrays only when it is first accessed.  Until then, the subtable refers
+        to this table's array, so changes to its contents are visible.
+        """
+        # Only an explicit slice selects views.
+        view = isinstance(sel, slice)
+        sel, length = _normalize_sel(sel, self.num_rows)
+        table = object.__new__(self.__class__)
+        table.__construct(
+            None if len(self.__arrs) == 0 else length,
+            _select(self.__arrs, sel, view),
+            self.__select_sorted_by(sel),
+        )
+        return table
+
+
+    def __select_sorted_by(self, sel):
+        """
+        Returns the columns by which a selection of rows is sorted.
+        """
+        return self.__sorted_by if self.__sorted_by and _is_ordered(sel) else ()
 
 
-    def __construct(self, length, arrs):
+    def __construct(self, length, arrs, sorted_by=()):
         self.__length = length
         self.__arrs = arrs
+        self.__sorted_by = sorted_by
 
 
     @memo.lazy_property
@@ -295,7 +517,7 @@ class Table:
         for name, arr in arrs.items():
             if not isinstance(name, str):
                 raise TypeError(f"not a string name: {name}")
-            if not isinstance(arr, np.ndarray):
+            if not isinstance(arr, (np.ndarray, StrArray)):
                 raise TypeError(f"not an ndarray: {name}")
             if len(arr.shape) != 1:
                 raise ValueError(f"not 1-dimensional array: {name}")
@@ -360,7 +582,8 @@ class Table:
         # Construct an instance without calling __init__().
         self = object.__new__(cls)
 
-        self.__construct(arrs)
+        length = len(a_value(arrs)) if len(arrs) > 0 else None
+        self.__construct(length, arrs)
         if check:
             self.__check(self.__arrs)
         return self
@@ -379,8 +602,9 @@ class Table:
         )
 
 
-    def __reduce__(self):
-        return self.__class__, (self.__arrs, )
+    def __reduce_ex__(self, protocol):
+        cols = [ (n, _reduce_arr(a, protocol)) for n, a in self.__arrs.items() ]
+        return _unpickle_table, (self.__class__, cols, self.__sorted_by)
 
 
     @property
@@ -403,6 +627,81 @@ class Table:
         return Row({ n: [a.dtype] for n, a in self.__arrs.items() }, 0)
 
 
+    #---------------------------------------------------------------------------
+    # Cache
+
+    @memo.lazy_property
+    def _cache(self):
+        # Map from `kind, names` to `arrs, value` of values computed from
+        # columns.
+        return {}
+
+
+    def _get_cached(self, kind, names, fn):
+        """
+        Returns a value computed from columns, computing it only if necessary.
+
+        The value is cached until any of the columns is replaced or removed.
+        Changes to the contents of column arrays are not detected.
+
+        :param kind:
+          The kind of value, distinguishing different values of the same
+          columns.
+        :param names:
+          A column name, or a tuple of column names.
+        :param fn:
+          Function that computes the value from the array, or from a list of
+          arrays if `names` is a tuple.
+        """
+        arrs = [ self.__arrs[n] for n in tupleize(names) ]
+        try:
+            cached_arrs, val = self._cache[kind, names]
+        except KeyError:
+            pass
+        else:
+            # Make sure the columns are the same arrays.
+            if all( a is c for a, c in zip(arrs, cached_arrs) ):
+                return val
+
+        val = fn(arrs) if isinstance(names, tuple) else fn(arrs[0])
+        self._cache[kind, names] = arrs, val
+        return val
+
+
+    def __forget_sorted(self, names):
+        """
+        Forgets sortedness by any of columns `names`, and subsequent columns.
+        """
+        for i, name in enumerate(self.__sorted_by):
+            if name in names:
+                self.__sorted_by = self.__sorted_by[: i]
+                break
+
+
+    def _peek_cached(self, kind, names):
+        """
+        Returns a cached value computed from columns, or `None` if none.
+        """
+        try:
+            cached_arrs, val = self._cache[kind, names]
+        except KeyError:
+            return None
+        arrs = [ self.__arrs.get(n) for n in tupleize(names) ]
+        return val if all( a is c for a, c in zip(arrs, cached_arrs) ) else None
+
+
+    def __invalidate(self, names):
+        """
+        Discards cached values computed from any of columns `names`.
+        """
+        cache = self.__dict__.get("_cache")
+        if cache:
+            names = set(names)
+            for key in list(cache):
+                if not names.isdisjoint(tupleize(key[1])):
+                    del cache[key]
+
+
     #---------------------------------------------------------------------------
     # Mutators
 
@@ -426,10 +725,14 @@ class Table:
 
         self.__check(arrs)
 
+        self.__invalidate(arrs)
+        self.__forget_sorted(arrs)
         self.__arrs.update(arrs)
 
 
     def remove(self, *names):
+        self.__invalidate(names)
+        self.__forget_sorted(names)
         try:
             for name in names:
                 try:
@@ -442,6 +745,95 @@ class Table:
                 self.__length = 0
 
 
+    def sort_by(self, *names):
+        """
+        Sorts rows in place, by the values of one or more columns.
+
+        Rows are sorted by the first column, then by the second column among
+        rows with equal values in the first, and so on.  The sort is stable.
+
+        The table records that it is sorted by these columns, until one of
+        them is replaced or removed.  Selecting rows from a sorted table in
+        order produces a sorted table.  Functions that select rows by value,
+        such as `fn.filter`, use binary search on sorted columns.
+        """
+        if len(names) == 0:
+            raise TypeError("no names given")
+        names = tuple( str(n) for n in names )
+        key = names[0] if len(names) == 1 else names
+        if self.__sorted_by[: len(names)] == names:
+            # Already sorted.
+            return
+
+        # The grouping's order is the stable sort order.
+        order, unique, edge = self._get_cached(
+            "argunique", key,
+            nplib.argunique if len(names) == 1 else nplib.argunique_keys
+        )
+        idxs = nplib.prepare_idxs(order, self.num_rows)
+        arrs = _select(self.__arrs, idxs).gather()
+        self.__invalidate(arrs)
+        self.__arrs.update(arrs)
+        self.__sorted_by = names
+
+        # The rows are now grouped by the sort columns already.
+        self._get_cached(
+            "argunique", key,
+            lambda _: (np.arange(self.num_rows), unique, edge)
+        )
+
+
+    def create_index(self, name):
+        """
+        Creates an index on a column, for looking up rows by value.
+
+        The table keeps the index until the column is replaced or removed.
+        While it exists, `fn.find` and `fn.filter` use it to select rows by
+        values of the column.
+
+        :return:
+          The `Index`.
+        """
+        return self._get_cached(
+            "index", name,
+            lambda arr: Index(
+                arr, self._get_cached("argunique", name, nplib.argunique))
+        )
+
+
+    @property
+    def sorted_by(self):
+        """
+        The names of columns by which rows are known to be sorted.
+        """
+        return self.__sorted_by
+
+
+    #---------------------------------------------------------------------------
+    # Shared memory
+
+    def to_shared(self):
+        """
+        Copies the table into shared memory.
+
+        :return:
+          A picklable `shared.SharedTable` handle, for use with `attach()`.
+        """
+        from . import shared
+        return shared.to_shared(self)
+
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Constructs a table in shared memory, without copying.
+
+        :param handle:
+          A `shared.SharedTable` handle, as returned by `to_shared()`.
+        """
+        return handle.attach(cls)
+
+
     #---------------------------------------------------------------------------
     # Input/output
 
@@ -474,31 +866,38 @@ def from_dataframe(df, Table=Table):
     return Table( (n, df[n].values) for n in df.names )
 
 
-def from_recs(recs, Table=Table):
+def from_recs(recs, Table=Table, *, schema=None):
     """
-    Constructs a table from an array of mapping records.
+    Constructs a table from an iterable of mapping records.
 
-    All mappings must have the same keys.
+    Records may have different keys; missing values are filled with defaults
+    for the column dtypes.  See `nplib.columnize_recs`.
+
+    :param schema:
+      A mapping from names to dtypes.  If given, only these columns are
+      constructed, and dtypes are not inferred.
     """
-    # FIXME: There are much faster implementations for this.
-    recs = iter(recs)
-    cols = { n: [v] for n, v in next(recs).items() }
-    for rec in recs:
-        for n, v in rec.items():
-            cols[n].append(v)
-    return Table( (n, np.array(v)) for n, v in cols.items() )
+    arrs = nplib.columnize_recs(recs, schema)
+    # The arrays are new and of equal lengths.
+    return Table.wrap(arrs, check=False)
 
 
 def from_row_seqs(names, rows, *, dtypes={}) -> Table:
     """
     Constructs a table from an iterable of sequences.
+
+    :param dtypes:
+      Mapping from names to dtypes for columns.  Other column dtypes are
+      inferred by numpy from the values.
     """
-    # FIXME: Do better with type conversions.
     cols = [ [] for n in names ]
     for row in rows:
         for col, val in zip(cols, row):
             col.append(val)
-    return Table({ n: np.array(c) for n, c in zip(names, cols) })
+    return Table({
+        n: np.array(c, dtype=dtypes.get(n, None))
+        for n, c in zip(names, cols)
+    })
 
 
 #-------------------------------------------------------------------------------
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from   ntab import Table
+
+#-------------------------------------------------------------------------------
+
+def make_table():
+    """
+    Returns a table with columns of various dtypes and layouts.
+    """
+    recs = np.array(
+        [ (i, i / 2) for i in range(3, 9) ], dtype=[("x", "i8"), ("z", "f8")])
+    return Table(
+        # A strided field of a structured array.
+        x=recs["x"],
+        # A strided array.
+        y=(np.arange(12) / 2 + 1.5)[:: 2],
+        s=["a", "b", "c", "d", "e", "f"],
+        f=[1.5, np.nan, -2.25, 1e10, 0.0, -0.5],
+        b=[True, False, False, True, True, False],
+        t=np.array(
+            ["2020-01-01", "NaT", "2021-06-30T12:00", "1970-01-01",
+             "2020-01-01", "2020-01-02"],
+            dtype="datetime64[ns]"
+        ),
+        o=np.array([None, "foo", 42, (1, 2), 2.5, "bar"], dtype=object),
+    )
+
+
+def check_table(tab):
+    """
+    Checks that `tab` has the values of `make_table()`, except for any
+    columns that were removed.  Dtypes and layouts may differ.
+    """
+    expected = make_table()
+    assert tab.names == [ n for n in expected.names if n in tab.names ]
+    assert tab.num_rows == expected.num_rows
+    for name, arr in tab.arrs.items():
+        exp = expected.arrs[name]
+        if exp.dtype.kind in "fM":
+            assert np.array_equal(arr, exp, equal_nan=True), name
+        else:
+            assert list(arr) == list(exp), name
+
+
+@pytest.fixture
+def tab():
+    """
+    A new table from `make_table()`.
+    """
+    return make_table()
+
+
+@pytest.fixture
+def check():
+    """
+    The function `check_table()`.
+    """
+    return check_table
+
+
@@ -107,3 +107,30 @@ def test_to_array():
     assert arr[2].w == 4
 
 
+def test_sort_by():
+    tab = Table(
+        x=[2, 1, 2, 1, 0],
+        y=[5, 6, 3, 4, 9],
+        z=list("abcde"),
+    )
+    assert tab.sorted_by == ()
+    tab.sort_by("x", "y")
+    assert tab.sorted_by == ("x", "y")
+    assert list(tab.a.x) == [0, 1, 1, 2, 2]
+    assert list(tab.a.y) == [9, 4, 6, 3, 5]
+    assert list(tab.a.z) == list("edbca")
+
+    # Ordered selections remain sorted.
+    assert tab.rows[1 :].sorted_by == ("x", "y")
+    assert tab.rows[tab.a.y > 4].sorted_by == ("x", "y")
+    assert tab.rows[[0, 2, 3]].sorted_by == ("x", "y")
+    assert tab.rows[[2, 0]].sorted_by == ()
+    assert tab.rows[:: -1].sorted_by == ()
+
+    # Replacing a sort column forgets it and subsequent columns.
+    tab.a.z = list("vwxyz")
+    assert tab.sorted_by == ("x", "y")
+    tab.a.y = [0, 0, 0, 0, 0]
+    assert tab.sorted_by == ("x", )
+    tab.remove("x")
+    assert tab.sorted_by == ()
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from   ntab import Table, TableBuilder
+from   ntab.nplib import RecAccumulator
+
+#-------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("size_hint", [1, 3, 1024])
+def test_append(size_hint):
+    builder = TableBuilder(size_hint=size_hint)
+    for i in range(100):
+        builder.append(i=i, x=i * 0.5)
+        if i >= 50:
+            builder.append(i=-i, s=str(i))
+    assert len(builder) == 150
+
+    tab = builder.finish()
+    assert tab.num_rows == 150
+    assert tab.names == ["i", "x", "s"]
+    assert tab.a.i.dtype == int
+    assert list(tab.a.i[: 51]) == list(range(51))
+    assert list(tab.a.i[51 : 54]) == [-50, 51, -51]
+    assert np.isnan(tab.a.x[51])
+    assert tab.a.x[52] == 25.5
+    assert tab.a.s.dtype == object
+    assert list(tab.a.s[49 : 53]) == [None, None, "50", None]
+
+    # The builder is reset.
+    assert len(builder) == 0
+    assert builder.finish().num_rows == 0
+
+
+def test_append_table():
+    builder = TableBuilder(size_hint=4)
+    builder.append(x=1, y="a")
+    src = Table(x=[2, 3], z=[1.5, 2.5])
+    builder.append_table(src)
+    builder.append_rows([ dict(x=4, y="long string") for _ in range(5) ])
+    builder.append_table(Table(x=np.array([], dtype=int)))
+    builder.append_table(Table(x=[10], y=["b"]))
+    assert builder.num_rows == 9
+
+    tab = builder.finish()
+    assert list(tab.a.x) == [1, 2, 3, 4, 4, 4, 4, 4, 10]
+    assert list(tab.a.y) == ["a", None, None] + ["long string"] * 5 + ["b"]
+    assert list(np.isnan(tab.a.z)) == [True, False, False] + [True] * 6
+    # The table's arrays are copied.
+    assert not np.shares_memory(tab.a.x, src.a.x)
+
+
+def test_growth():
+    acc = RecAccumulator(size_hint=10, growth=1.5)
+    for i in range(1000):
+        acc.append(x=i)
+    arrs = acc.arrays
+    assert list(arrs["x"]) == list(range(1000))
+    # Retrieving the arrays doesn't reset.
+    assert len(acc) == 1000
+    acc.append(x=1000)
+    assert list(acc.pop_arrays()["x"]) == list(range(1001))
+
+    with pytest.raises(ValueError):
+        RecAccumulator(growth=1)
+
+
@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 import ntab
 
 #-------------------------------------------------------------------------------
@@ -18,3 +21,90 @@ def test_from_row_seqs():
     assert tab.rows[3].baz == "Maybe..."
 
 
+
+def test_from_row_seqs_dtypes():
+    tab = ntab.from_row_seqs(
+        ("x", "y"),
+        [("1", 2), ("3", 4)],
+        dtypes=dict(x=float, y="int8"),
+    )
+    assert tab.a.x.dtype == float
+    assert list(tab.a.x) == [1.0, 3.0]
+    assert tab.a.y.dtype == "int8"
+
+
+def test_from_recs():
+    tab = ntab.from_recs([
+        dict(x=1, y=2.5, s="foo"),
+        dict(x=2, s="barbaz"),
+        dict(y=4.5, x=3, s="q", z=True),
+    ])
+    assert tab.names == ["x", "y", "s", "z"]
+    assert list(tab.a.x) == [1, 2, 3]
+    assert tab.a.y[0] == 2.5 and np.isnan(tab.a.y[1])
+    assert list(tab.a.s) == ["foo", "barbaz", "q"]
+    assert list(tab.a.z) == [False, False, True]
+
+    assert ntab.from_recs([]).num_rows == 0
+
+
+def test_from_recs_schema():
+    recs = [ dict(x=i, y=str(i), w=0) for i in range(5) ] + [dict(x=5)]
+    tab = ntab.from_recs(recs, schema=dict(x="int16", y="U2"))
+    assert tab.names == ["x", "y"]
+    assert tab.a.x.dtype == "int16"
+    assert list(tab.a.x) == [0, 1, 2, 3, 4, 5]
+    assert list(tab.a.y) == ["0", "1", "2", "3", "4", ""]
+
+    tab = ntab.from_recs([], schema=dict(x=float))
+    assert tab.names == ["x"]
+    assert tab.a.x.dtype == float
+    with pytest.raises(ValueError):
+        ntab.from_recs([dict(x="foo")], schema=dict(x=float))
+
+
+def test_columnize_recs_batches():
+    recs = (
+          [ dict(i=i, x=float(i)) for i in range(5) ]
+        + [ dict(i=1.5, x=5, s="a") ]
+        + [ dict(i=i, x=None) for i in range(7, 10) ]
+        + [ dict(i=10, y=1) ]
+    )
+    arrs = ntab.nplib.columnize_recs(recs, batch_size=2)
+    assert list(arrs) == ["i", "x", "s", "y"]
+    # Integers are promoted when a float appears.
+    assert arrs["i"].dtype == float
+    assert list(arrs["i"]) == [0, 1, 2, 3, 4, 1.5, 7, 8, 9, 10]
+    assert arrs["x"].dtype == float
+    assert list(arrs["x"][: 6]) == [0, 1, 2, 3, 4, 5]
+    assert np.isnan(arrs["x"][6 :]).all()
+    assert list(arrs["s"]) == [None] * 5 + ["a"] + [None] * 4
+    assert list(arrs["y"][-1 :]) == [1]
+
+
+def test_columnize_recs_batch_size():
+    recs = (
+          [ dict(i=i, x=float(i), s=str(i)) for i in range(4) ]
+        + [ dict(i=None, x=None, t=np.datetime64("2020-01-01")) ]
+        + [ dict(i=5, x=5.5, t=None) ]
+        + [ dict(j=6, s="b") ]
+        + [ dict(j=7.5) ]
+    )
+    expected = ntab.nplib.columnize_recs(recs, batch_size=1024)
+    assert expected["i"].dtype == object
+    assert list(expected["s"]) == ["0", "1", "2", "3", None, None, "b", None]
+    assert np.isnan(expected["j"][: 6]).all()
+    for batch_size in (1, 2, 3, 5):
+        arrs = ntab.nplib.columnize_recs(recs, batch_size=batch_size)
+        assert list(arrs) == list(expected)
+        for name, arr in arrs.items():
+            assert arr.dtype == expected[name].dtype
+            assert arr.tolist() == expected[name].tolist() \
+                or np.array_equal(arr, expected[name], equal_nan=True)
+
+    # The accumulator fills missing strings the same way.
+    acc = ntab.nplib.RecAccumulator()
+    acc.extend( { n: v for n, v in r.items() if n == "s" } for r in recs )
+    assert list(acc.pop_arrays()["s"]) == list(expected["s"])
+
+
@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 
-from   ntab import Table, fn
+from   ntab import Table, GroupBy, fn, pred
 from   ntab.lib.container import ALL, all_but
 
 #-------------------------------------------------------------------------------
@@ -76,3 +77,329 @@ def test_get_const():
     assert set(tab.arrs) == {"x", "z", "u"}
 
 
+def test_find_grouped():
+    tab = Table(x=[1, 2, 1, 2, 3], y=[3, 4, 5, 6, 7])
+    len(GroupBy(tab, "x"))
+    assert fn.find(tab, x=1, y=5).y == 5
+    assert fn.find(tab, x=3).y == 7
+    with pytest.raises(LookupError):
+        fn.find(tab, x=2)
+    with pytest.raises(LookupError):
+        fn.find(tab, x=4)
+    assert list(fn.filter(tab, x=2).a.y) == [4, 6]
+
+    fn.rename(tab, z="x")
+    assert tab._peek_cached("argunique", "x") is None
+    assert list(fn.filter(tab, z=1).a.y) == [3, 5]
+
+
+def test_filter_sorted():
+    tab = Table(
+        t=[5, 1, 3, 3, 8, 3],
+        s=list("abcdcf"),
+        x=[0, 1, 2, 3, 4, 5],
+    )
+    tab.sort_by("t", "s")
+    assert list(tab.a.x) == [1, 2, 3, 5, 0, 4]
+
+    res = fn.filter(tab, t=3)
+    assert list(res.a.x) == [2, 3, 5]
+    # The result is a view.
+    assert np.shares_memory(res.a.x, tab.a.x)
+
+    assert list(fn.filter(tab, t=3, s="c").a.x) == [2]
+    assert list(fn.filter(tab, t=3, x=3).a.x) == [3]
+    assert fn.filter(tab, t=4).num_rows == 0
+    assert fn.find(tab, t=3, s="d").x == 3
+    with pytest.raises(LookupError):
+        fn.find(tab, t=3)
+
+
+def test_select_range():
+    tab = Table(t=[8, 1, 4, 3, 6], x=[0, 1, 2, 3, 4])
+    assert list(fn.select_range(tab, "t", 3, 7).a.x) == [2, 3, 4]
+
+    tab.sort_by("t")
+    res = fn.select_range(tab, "t", 3, 7)
+    assert list(res.a.x) == [3, 2, 4]
+    assert np.shares_memory(res.a.x, tab.a.x)
+    assert list(fn.select_range(tab, "t", lo=5).a.t) == [6, 8]
+    assert list(fn.select_range(tab, "t", hi=4).a.t) == [1, 3]
+    assert fn.select_range(tab, "t", 7, 2).num_rows == 0
+
+
+@pytest.mark.parametrize("sort", [False, True])
+def test_select_missing(sort):
+    tab = Table(
+        f=[2.5, np.nan, 1.5, np.nan, 3.5],
+        d=np.array(["2020-01-03", "NaT", "2020-01-01", "NaT", "2020-01-02"],
+                   dtype="M8[D]"),
+        x=[0, 1, 2, 3, 4],
+    )
+    if sort:
+        tab.sort_by("f")
+    # NaN and NaT values are never selected.
+    assert fn.filter(tab, f=np.nan).num_rows == 0
+    assert sorted(fn.select_range(tab, "f", 1.5).a.x) == [0, 2, 4]
+    assert sorted(fn.filter(tab, f=pred.Between(2)).a.x) == [0, 4]
+
+    if sort:
+        tab.sort_by("d")
+    assert fn.filter(tab, d=np.datetime64("NaT")).num_rows == 0
+    assert sorted(fn.select_range(tab, "d", np.datetime64("2020-01-02")).a.x) == [0, 4]
+    assert sorted(fn.filter(tab, d=pred.Between(hi=np.datetime64("2020-01-02"))).a.x) == [2]
+
+
+def _join_tabs():
+    left = Table(k=[1, 2, 3, 2, 5], x=[10, 20, 30, 40, 50])
+    right = Table(k=[2, 4, 1, 2], y=[0.5, 1.5, 2.5, 3.5])
+    return left, right
+
+
+@pytest.mark.parametrize("prepare", [None, "sort", "index"])
+def test_join(prepare):
+    left, right = _join_tabs()
+    if prepare == "sort":
+        left.sort_by("k")
+        right.sort_by("k")
+    elif prepare == "index":
+        right.create_index("k")
+
+    res = fn.join(left, right, "k")
+    assert res.names == ["k", "x", "y"]
+    rows = sorted(zip(res.a.k, res.a.x, res.a.y))
+    assert rows == [
+        (1, 10, 2.5), (2, 20, 0.5), (2, 20, 3.5), (2, 40, 0.5), (2, 40, 3.5)]
+
+    res = fn.join(left, right, "k", how="left")
+    assert res.num_rows == 7
+    assert sorted(res.a.x[np.isnan(res.a.y)]) == [30, 50]
+
+    res = fn.join(left, right, "k", how="outer")
+    assert res.num_rows == 8
+    assert list(res.a.k[-1 :]) == [4]
+    assert list(res.a.y[-1 :]) == [1.5]
+    assert res.a.x[-1] == np.iinfo(res.a.x.dtype).min
+
+    assert sorted(fn.join(left, right, "k", how="semi").a.x) == [10, 20, 40]
+    assert sorted(fn.join(left, right, "k", how="anti").a.x) == [30, 50]
+
+
+def test_join_order():
+    left, right = _join_tabs()
+    res = fn.join(left, right, "k", how="left")
+    assert list(res.a.x) == [10, 20, 20, 30, 40, 40, 50]
+    assert list(res.a.y[: 3]) == [2.5, 0.5, 3.5]
+
+
+@pytest.mark.parametrize("prepare", [None, "sort", "index"])
+def test_join_nan(prepare):
+    left = Table(k=[1.0, np.nan, 2.0], x=[0, 1, 2])
+    right = Table(k=[np.nan, 2.0, 1.0], y=[3, 4, 5])
+    if prepare == "sort":
+        right.sort_by("k")
+    elif prepare == "index":
+        right.create_index("k")
+
+    # NaN keys match nothing.
+    res = fn.join(left, right, "k")
+    assert sorted(zip(res.a.x, res.a.y)) == [(0, 5), (2, 4)]
+    assert list(fn.join(left, right, "k", how="anti").a.x) == [1]
+    res = fn.join(left, right, "k", how="outer")
+    assert res.num_rows == 4
+    assert list(res.a.y[-1 :]) == [3]
+
+
+def test_join_multi():
+    left = Table(a=[1, 1, 2, 2], b=["x", "y", "x", "y"], v=[0, 1, 2, 3])
+    right = Table(b=["y", "x", "y"], a=[1, 2, 2], w=[4, 5, 6])
+    res = fn.join(left, right, ["a", "b"])
+    assert list(res.a.v) == [1, 2, 3]
+    assert list(res.a.w) == [4, 5, 6]
+
+    res = fn.join(left, right, ("a", "b"), how="anti")
+    assert list(res.a.v) == [0]
+
+
+def test_join_empty():
+    left, right = _join_tabs()
+    empty = right.rows[: 0]
+    assert fn.join(left, empty, "k").num_rows == 0
+    res = fn.join(left, empty, "k", how="left")
+    assert list(res.a.x) == [10, 20, 30, 40, 50]
+    assert np.isnan(res.a.y).all()
+    assert fn.join(empty, left, "k", how="outer").num_rows == 5
+
+
+def test_join_errors():
+    left, right = _join_tabs()
+    with pytest.raises(ValueError):
+        fn.join(left, right, "k", how="cross")
+    right.a.x = [0, 0, 0, 0]
+    with pytest.raises(ValueError):
+        fn.join(left, right, "k")
+
+
+def _asof_tabs():
+    trades = Table(
+        time=np.array(["09:30:02", "09:30:05", "09:30:05", "09:30:09", "NaT"]),
+        sym=["a", "b", "a", "a", "b"],
+        qty=[1, 2, 3, 4, 5],
+    )
+    trades.a.time = np.array(
+        [ "2024-01-02T" + t if t != "NaT" else t for t in trades.a.time ],
+        dtype="datetime64[s]")
+    quotes = Table(
+        time=np.array([
+            "2024-01-02T09:30:01", "2024-01-02T09:30:03", "2024-01-02T09:30:05",
+            "2024-01-02T09:30:05", "2024-01-02T09:30:06",
+        ], dtype="datetime64[s]"),
+        sym=["a", "b", "a", "a", "b"],
+        bid=[10.0, 20.0, 11.0, 12.0, 21.0],
+    )
+    return trades, quotes
+
+
+@pytest.mark.parametrize("sort", [False, True])
+def test_asof_join(sort):
+    trades, quotes = _asof_tabs()
+    if sort:
+        quotes.sort_by("time")
+
+    res = fn.asof_join(trades, quotes, "time", by="sym")
+    assert res.names == ["time", "sym", "qty", "bid"]
+    assert list(res.a.qty) == [1, 2, 3, 4, 5]
+    assert list(res.a.bid[: 4]) == [10.0, 20.0, 12.0, 12.0]
+    assert np.isnan(res.a.bid[4])
+
+    res = fn.asof_join(
+        trades, quotes, "time", by="sym", tolerance=np.timedelta64(2, "s"))
+    assert list(res.a.bid[: 3]) == [10.0, 20.0, 12.0]
+    assert np.isnan(res.a.bid[3 :]).all()
+
+
+def test_asof_join_no_by():
+    trades, quotes = _asof_tabs()
+    quotes.a.qtime = quotes.a.time
+    quotes.remove("sym")
+    res = fn.asof_join(trades, quotes, "time")
+    assert list(res.a.bid[: 4]) == [10.0, 12.0, 12.0, 21.0]
+    assert list(res.a.qtime[: 1]) == [quotes.a.time[0]]
+    assert np.isnat(res.a.qtime[4])
+
+    res = fn.asof_join(trades, quotes.rows[: 0], "time")
+    assert np.isnan(res.a.bid).all()
+
+
+def test_asof_join_errors():
+    trades, quotes = _asof_tabs()
+    with pytest.raises(ValueError):
+        fn.asof_join(trades, quotes, "time")
+
+
+@pytest.mark.parametrize("sort", [False, True])
+def test_interval_join(sort):
+    events = Table(t=[7.0, 1.0, 5.0, np.nan, 3.0, 5.0], e=[0, 1, 2, 3, 4, 5])
+    windows = Table(
+        t0=[0.0, 4.0, 5.0, 9.0, np.nan, 6.0],
+        t1=[4.0, 8.0, 6.0, 9.5, 10.0, 2.0],
+        w=["a", "b", "c", "d", "e", "f"],
+    )
+    if sort:
+        events.sort_by("t")
+    res = fn.interval_join(events, windows, "t", "t0", "t1")
+    assert res.names == ["t", "e", "t0", "t1", "w"]
+    pairs = sorted(zip(res.a.w, res.a.t))
+    assert pairs == [
+        ("a", 1.0), ("a", 3.0),
+        ("b", 5.0), ("b", 5.0), ("b", 7.0),
+        ("c", 5.0), ("c", 5.0),
+    ]
+
+    res = fn.interval_join(events.rows[: 0], windows, "t", "t0", "t1")
+    assert res.num_rows == 0
+
+    windows.a.e = 0
+    with pytest.raises(ValueError):
+        fn.interval_join(events, windows, "t", "t0", "t1")
+
+
+def _sort_brute(tab, names, descending):
+    # Sort by each column in turn, from last to first.
+    idxs = np.arange(tab.num_rows)
+    for name, desc in reversed(list(zip(names, descending))):
+        arr = tab.arrs[name][idxs]
+        order = np.argsort(arr, kind="stable")
+        if desc:
+            # Reverse, keeping equal values in order.
+            _, inv = np.unique(arr, return_inverse=True)
+            order = np.argsort(-inv.ravel(), kind="stable")
+        idxs = idxs[order]
+    return idxs
+
+
+@pytest.mark.parametrize("descending", [False, True, [False, True], [True, False]])
+def test_sort(descending):
+    rng = np.random.default_rng(0)
+    tab = Table(
+        x=rng.integers(0, 5, 200),
+        s=rng.choice(["foo", "bar", "baz", "quux"], 200),
+        y=rng.normal(size=200).round(1),
+        i=np.arange(200),
+    )
+    names = ("x", "s")
+    flags = [descending] * 2 if isinstance(descending, bool) else descending
+    res = fn.sort(tab, *names, descending=descending)
+    assert list(res.a.i) == list(_sort_brute(tab, names, flags))
+    assert res.sorted_by == (() if any(flags) else names)
+    assert list(tab.a.i) == list(range(200))
+
+    res = fn.sort(tab, "y", descending=flags[0])
+    assert list(res.a.i) == list(_sort_brute(tab, ["y"], flags[:1]))
+
+
+def test_sort_errors():
+    tab = Table(x=[1, 2], y=[3, 4])
+    with pytest.raises(TypeError):
+        fn.sort(tab)
+    with pytest.raises(ValueError):
+        fn.sort(tab, "x", "y", descending=[True])
+    with pytest.raises(KeyError):
+        fn.sort(tab, "z")
+
+
+@pytest.mark.parametrize("k", [0, 1, 5, 17, 100, 300])
+@pytest.mark.parametrize("largest", [True, False])
+@pytest.mark.parametrize("min_group_rows", [1, 1024])
+def test_top_k(k, largest, min_group_rows, monkeypatch):
+    monkeypatch.setattr(fn, "TOP_K_MIN_GROUP_ROWS", min_group_rows)
+    rng = np.random.default_rng(1)
+    x = rng.integers(0, 20, 200).astype(float)
+    x[rng.integers(0, 200, 10)] = np.nan
+    tab = Table(
+        x=x,
+        s=rng.choice(["foo", "bar", "baz"], 200),
+        g=rng.integers(0, 4, 200),
+        i=np.arange(200),
+    )
+
+    for name in ("x", "s"):
+        res = fn.top_k(tab, name, k, largest=largest)
+        expected = fn.sort(tab, name, descending=largest).a.i[: k]
+        assert list(res.a.i) == list(expected)
+
+    res = fn.top_k(tab, "x", k, by="g", largest=largest)
+    expected = np.concatenate([
+        fn.sort(fn.filter(tab, g=g), "x", descending=largest).a.i[: k]
+        for g in range(4)
+    ])
+    assert list(res.a.i) == list(expected)
+
+
+def test_top_k_errors():
+    tab = Table(x=[1, 2])
+    with pytest.raises(ValueError):
+        fn.top_k(tab, "x", -1)
+    assert fn.top_k(Table(x=[]), "x", 3).num_rows == 0
+
+
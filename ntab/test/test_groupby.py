@@ -1,4 +1,8 @@
+import numpy as np
+import pytest
+
 from   ntab import Table, GroupBy
+from   ntab.groupby import Aggregation
 
 #-------------------------------------------------------------------------------
 
@@ -43,3 +47,249 @@ def test_agg_0():
     assert list(val(lambda a: a[-1])) == [1, 9]
 
 
+def test_composite():
+    tbl = Table(
+        sym=["foo", "bar", "foo", "foo", "bar", "foo", ],
+        day=[    2,     1,     1,     2,     1,     1, ],
+        val=[    3,     7,     8,     4,     1,     9, ],
+    )
+    grp = GroupBy(tbl, ("sym", "day"))
+    assert len(grp) == 3
+    assert list(grp) == [("bar", 1), ("foo", 1), ("foo", 2)]
+
+    keys = grp.keys()
+    assert keys.num_rows == 3
+    assert list(keys.names) == ["sym", "day"]
+    assert list(keys.a.sym) == ["bar", "foo", "foo"]
+    assert list(keys.a.day) == [1, 1, 2]
+
+    assert list(grp["foo", 1].a.val) == [8, 9]
+    assert list(grp[("foo", 2)].a.val) == [3, 4]
+    assert list(grp.counts()) == [2, 2, 2]
+    assert list(grp.agg.val.sum()) == [8, 17, 7]
+    for key in [("bar", 2), ("baz", 1), "foo"]:
+        with pytest.raises(KeyError):
+            grp[key]
+
+    assert [ (k, g.num_rows) for k, g in grp.items() ] == [
+        (("bar", 1), 2), (("foo", 1), 2), (("foo", 2), 2)]
+
+
+@pytest.mark.parametrize("unit", ["D", "ns"])
+def test_composite_datetime(unit):
+    tbl = Table(
+        day=np.array(["2020-01-02", "2020-01-01", "2020-01-02"], dtype=f"M8[{unit}]"),
+        sym=["foo", "bar", "foo"],
+        val=[3, 7, 8],
+    )
+    grp = GroupBy(tbl, ("day", "sym"))
+    day = np.datetime64("2020-01-02")
+    assert list(grp[day, "foo"].a.val) == [3, 8]
+    assert list(grp[np.datetime64("2020-01-01", "ns"), np.str_("bar")].a.val) == [7]
+    for key in [(day, "bar"), (np.datetime64("2020-01-02T12:00"), "foo"), (1, "foo")]:
+        with pytest.raises(KeyError):
+            grp[key]
+
+    grp = GroupBy(Table(k=[1, 2, 1], d=tbl.a.day, val=[3, 7, 8]), ("k", "d"))
+    assert list(grp[np.int64(1), day].a.val) == [3, 8]
+    assert list(grp[1.0, day].a.val) == [3, 8]
+    with pytest.raises(KeyError):
+        grp[1.5, day]
+
+
+def test_composite_many():
+    # Enough distinct values that the packed key has to be renumbered.
+    n = 1000
+    arrs = { str(i): np.arange(n) % (97 + i) for i in range(10) }
+    tbl = Table(arrs)
+    grp = GroupBy(tbl, tuple(arrs))
+    assert len(grp) == n
+    keys = grp.keys()
+    # Keys are sorted lexicographically.
+    order = np.lexsort([ keys.arrs[n] for n in reversed(list(arrs)) ])
+    assert (order == np.arange(n)).all()
+
+
+def test_missing_key():
+    tbl = Table(sym=["foo", "bar"], val=[3, 4])
+    grp = GroupBy(tbl, "sym")
+    with pytest.raises(KeyError):
+        grp["zzz"]
+
+
+def test_agg_vectorized():
+    tbl = Table(
+        sym=["foo", "bar", "foo", "foo", "bar", "foo", ],
+        val=[  3.0,   7.0,   8.0, np.nan,  1.0,   9.0, ],
+        cnt=[    3,     7,     8,     3,     0,     9, ],
+    )
+    agg = GroupBy(tbl, "sym").agg
+
+    cnt = agg.cnt
+    assert list(cnt.count()) == [2, 4]
+    assert list(cnt.mean()) == [3.5, 5.75]
+    assert list(cnt(np.mean)) == [3.5, 5.75]
+    assert np.allclose(cnt.var(), [12.25, 7.6875])
+    assert np.allclose(cnt.std(ddof=1), np.sqrt([24.5, 10.25]))
+    assert list(cnt.first()) == [7, 3]
+    assert list(cnt.last()) == [0, 9]
+    assert list(cnt.nunique()) == [2, 3]
+    assert list(cnt.any()) == [True, True]
+    assert list(cnt.all()) == [False, True]
+    assert list(cnt.argmin()) == [1, 0]
+    assert list(cnt(np.argmax)) == [0, 3]
+
+    val = agg.val
+    assert list(val.max()[: 1]) == [7.0]
+    assert np.isnan(val.max()[1])
+    assert list(val.nanmax()) == [7.0, 9.0]
+    assert list(val.nanmin()) == [1.0, 3.0]
+    assert list(val.nansum()) == [8.0, 20.0]
+    assert list(val.nancount()) == [2, 3]
+    assert np.allclose(val(np.nanmean), [4.0, 20 / 3])
+    assert list(val.argmax()) == [0, 2]
+
+
+def test_agg_funcs_match():
+    rng = np.random.default_rng(0)
+    tbl = Table(
+        key=rng.integers(0, 20, 500),
+        val=np.where(rng.random(500) < 0.1, np.nan, rng.normal(size=500)),
+    )
+    grp = GroupBy(tbl, "key")
+    agg = grp.agg.val
+    for fn in [
+            np.sum, np.mean, np.var, np.std, np.argmax,
+            np.nansum, np.nanmin, np.nanmean, np.nanstd,
+    ]:
+        expected = [ fn(g.a.val) for g in grp.values() ]
+        assert np.allclose(agg(fn), expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("fn", [len, sum, min, max, any, all])
+def test_aggregate_builtins(fn, monkeypatch):
+    tbl = Table(key=[1, 2, 1, 2, 1], val=[3, 0, 0, 5, 2])
+    grp = GroupBy(tbl, "key")
+    expected = [ fn(g.a.val) for g in grp.values() ]
+    assert list(grp.aggregate(val=fn).a.val) == expected
+
+    # The vectorized aggregation is used, rather than calling `fn` per group.
+    name = Aggregation.FUNCTIONS[fn]
+    monkeypatch.setattr(Aggregation, name, lambda self: np.array([-1, -1]))
+    assert list(grp.aggregate(val=fn).a.val) == [-1, -1]
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.complex64, np.int16])
+def test_agg_funcs_dtype(dtype):
+    rng = np.random.default_rng(0)
+    tbl = Table(
+        key=rng.integers(0, 5, 100),
+        val=(rng.normal(size=100) * 10).astype(dtype),
+    )
+    grp = GroupBy(tbl, "key")
+    agg = grp.agg.val
+    for fn in [
+            np.mean, np.var, np.std,
+            np.nanmean, np.nanvar, np.nanstd,
+    ]:
+        expected = np.array([ fn(g.a.val) for g in grp.values() ])
+        res = agg(fn)
+        assert res.dtype == expected.dtype
+        assert np.allclose(res, expected, rtol=1e-4)
+
+
+def test_aggregate():
+    tbl = Table(
+        sym=["foo", "bar", "foo", "foo", "bar", "foo", ],
+        day=[    2,     1,     1,     2,     1,     1, ],
+        val=[    3,     7,     8,     4,     1,     9, ],
+    )
+    res = GroupBy(tbl, "sym").aggregate(
+        val=["sum", "mean", np.max], day="nunique", n="count")
+    assert list(res.names) == [
+        "sym", "val_sum", "val_mean", "val_max", "day", "n"]
+    assert list(res.a.sym) == ["bar", "foo"]
+    assert list(res.a.val_sum) == [8, 24]
+    assert list(res.a.val_mean) == [4.0, 6.0]
+    assert list(res.a.val_max) == [7, 9]
+    assert list(res.a.day) == [1, 2]
+    assert list(res.a.n) == [2, 4]
+
+    res = GroupBy(tbl, ["sym", "day"]).aggregate(val="first")
+    assert list(res.names) == ["sym", "day", "val"]
+    assert list(res.a.val) == [7, 8, 3]
+
+    with pytest.raises(KeyError):
+        GroupBy(tbl, "sym").aggregate(foo="sum")
+    with pytest.raises(ValueError):
+        GroupBy(tbl, "sym").aggregate(sym="first")
+
+
+def test_cached():
+    tbl = Table(
+        sym=["foo", "bar", "foo", "foo", "bar", "foo", ],
+        val=[    3,     7,     8,     4,     1,     9, ],
+    )
+    grp = GroupBy(tbl, "sym")
+    assert list(grp.counts()) == [2, 4]
+    grouping = tbl._peek_cached("argunique", "sym")
+    assert grouping is not None
+    # Another groupby reuses the cached grouping.
+    assert list(GroupBy(tbl, "sym").keys()) == ["bar", "foo"]
+    assert tbl._peek_cached("argunique", "sym") is grouping
+
+    # Replacing the column invalidates the cache.
+    tbl.a.sym = ["x", "y", "x", "y", "x", "y"]
+    assert tbl._peek_cached("argunique", "sym") is None
+    assert list(GroupBy(tbl, "sym").counts()) == [3, 3]
+
+    tbl.arrs["sym"] = ["x", "x", "x", "y", "y", "y"]
+    assert list(GroupBy(tbl, "sym").agg.val.sum()) == [18, 14]
+
+    GroupBy(tbl, ("sym", "val")).counts()
+    assert tbl._peek_cached("argunique", ("sym", "val")) is not None
+    tbl.remove("val")
+    assert tbl._peek_cached("argunique", ("sym", "val")) is None
+    assert tbl._peek_cached("argunique", "sym") is not None
+
+
+def test_multi():
+    from ntab.groupby import MultiGroupBy
+
+    tbl0 = Table(sym=["foo", "bar", "foo", "baz"], val=[0, 1, 2, 3])
+    tbl1 = Table(sym=["qux", "foo", "bar", "bar"], val=[4, 5, 6, 7])
+    grp = MultiGroupBy([tbl0, tbl1], "sym")
+    assert len(grp) == 4
+    assert list(grp) == ["bar", "baz", "foo", "qux"]
+
+    sub0, sub1 = grp["bar"]
+    assert list(sub0.a.val) == [1]
+    assert list(sub1.a.val) == [6, 7]
+    sub0, sub1 = grp["qux"]
+    assert sub0.num_rows == 0
+    assert list(sub1.a.val) == [4]
+
+    sizes = [ [ t.num_rows for t in g ] for g in grp.itervalues() ]
+    assert sizes == [[1, 2], [1, 0], [2, 1], [0, 1]]
+
+
+def test_arguniquen_orders():
+    from ntab import nplib
+
+    arrs = [np.array([3, 1, 3, 2]), np.array([5, 1, 1]), np.array([], dtype=int)]
+    orders = [ np.argsort(a, kind="stable") for a in arrs ]
+    res_orders, unique, edges = nplib.arguniquen(arrs, orders)
+    assert all( (o == r).all() for o, r in zip(orders, res_orders) )
+    assert list(unique) == [1, 2, 3, 5]
+    assert edges.tolist() == [
+        [0, 0, 0], [1, 2, 0], [2, 2, 0], [4, 2, 0], [4, 3, 0]]
+
+
+def test_bool_key():
+    tbl = Table(b=[True, False, True], val=[1, 2, 3])
+    grp = GroupBy(tbl, "b")
+    assert grp.keys().dtype == bool
+    assert list(grp.keys()) == [False, True]
+    assert list(grp.agg.val.sum()) == [2, 4]
+
+
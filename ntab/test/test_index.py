@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from   ntab import Table, fn
+
+#-------------------------------------------------------------------------------
+
+def test_get():
+    tab = Table(sym=["foo", "bar", "foo", "baz", "foo"], x=[0, 1, 2, 3, 4])
+    index = tab.create_index("sym")
+    assert len(index) == 3
+    assert list(index.values) == ["bar", "baz", "foo"]
+    assert "bar" in index
+    assert "zzz" not in index
+    assert list(index.get("foo")) == [0, 2, 4]
+    assert list(index.get("baz")) == [3]
+    assert list(index.get("zzz")) == []
+    assert list(index.get(["unhashable"])) == []
+    # The index is kept.
+    assert tab.create_index("sym") is index
+
+
+@pytest.mark.parametrize("unit", ["D", "ns"])
+def test_get_datetime(unit):
+    dates = np.array(
+        ["2020-01-02", "2020-01-01", "NaT", "2020-01-02"], dtype=f"M8[{unit}]")
+    tab = Table(d=dates, x=[0, 1, 2, 3])
+    expected = list(fn.filter(tab, d=np.datetime64("2020-01-02")).a.x)
+    assert expected == [0, 3]
+
+    index = tab.create_index("d")
+    assert np.datetime64("2020-01-01") in index
+    assert np.datetime64("2020-01-01T12:00") not in index
+    assert list(index.get(np.datetime64("2020-01-02", "ns"))) == [0, 3]
+    assert list(index.get(np.datetime64("NaT"))) == []
+    assert list(index.get("zzz")) == []
+    assert list(fn.filter(tab, d=np.datetime64("2020-01-02")).a.x) == expected
+    assert fn.find(tab, d=np.datetime64("2020-01-01")).x == 1
+
+
+def test_lookup():
+    tab = Table(key=[50, 10, 30, 10, 20])
+    index = tab.create_index("key")
+    res = index.lookup([10, 20, 25, 30, 50, 60, 0])
+    assert list(res) == [1, 4, -1, 2, 0, -1, -1]
+    assert list(index.lookup([])) == []
+
+    empty = Table(key=np.array([], dtype=int)).create_index("key")
+    assert list(empty.lookup([1, 2])) == [-1, -1]
+
+
+def test_lookup_str():
+    tab = Table(sym=["foo", "bar", "foo", "baz"])
+    res = tab.create_index("sym").lookup(np.array(["baz", "fooo", "foo", "a"]))
+    assert list(res) == [3, -1, 0, -1]
+
+
+def test_find():
+    tab = Table(sym=["foo", "bar", "foo", "baz"], x=[0, 1, 2, 3])
+    tab.create_index("sym")
+    assert fn.find(tab, sym="bar").x == 1
+    assert fn.find(tab, sym="foo", x=2).x == 2
+    assert list(fn.filter(tab, sym="foo").a.x) == [0, 2]
+    assert fn.filter(tab, sym="zzz").num_rows == 0
+
+    # Replacing the column discards the index.
+    tab.a.sym = ["a", "b", "c", "d"]
+    assert tab._peek_cached("index", "sym") is None
+    assert fn.find(tab, sym="c").x == 2
+
+
+def test_lookup_bytes():
+    tab = Table(sym=np.array([b"foo", b"bar", b"foo", b"baz"]))
+    index = tab.create_index("sym")
+    res = index.lookup(np.array([b"baz", b"fooo", b"foo", b"fo", b""]))
+    assert list(res) == [3, -1, 0, -1, -1]
+    # Keys of a different kind are compared directly.
+    assert list(index.lookup(np.array([b"bar", b"x"], dtype=object))) == [1, -1]
+
+
@@ -0,0 +1,305 @@
+import numpy as np
+import pytest
+
+from   ntab import Table, io
+
+#-------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_save_load(tmpdir, mmap, tab, check):
+    io.save(tab, tmpdir / "tab")
+    res = io.load(tmpdir / "tab", mmap=mmap)
+
+    check(res)
+    assert res.names == tab.names
+    for name, arr in tab.arrs.items():
+        assert res.arrs[name].dtype == arr.dtype
+    assert isinstance(res.a.y, np.memmap) == mmap
+    assert isinstance(res.a.t, np.memmap) == mmap
+
+
+def test_save_load_strided(tmpdir):
+    recs = np.array([(1, 2.5), (2, 3.5)], dtype=[("i", "i8"), ("x", "f8")])
+    tab = Table( (n, recs[n]) for n in recs.dtype.names )
+    io.save(tab, tmpdir)
+    res = io.load(tmpdir)
+    assert list(res.a.i) == [1, 2]
+    assert list(res.a.x) == [2.5, 3.5]
+
+
+def test_save_load_empty(tmpdir):
+    io.save(Table(), tmpdir)
+    res = io.load(tmpdir)
+    assert res.num_cols == 0
+    assert res.num_rows == 0
+
+
+#-------------------------------------------------------------------------------
+
+CSV = """i,x,b,t,s,n
+1,1.5,True,2020-01-01,foo,3
+2,,False,2020-01-02T12:30,bar,
+3,-2.5e3,true,,"baz, bif",5
+"""
+
+def test_load_csv():
+    tab = io.load_csv(CSV.splitlines())
+    assert tab.names == ["i", "x", "b", "t", "s", "n"]
+    assert tab.num_rows == 3
+    assert tab.a.i.dtype == np.int64
+    assert tab.a.x.dtype == np.float64
+    assert tab.a.b.dtype == bool
+    assert tab.a.t.dtype.kind == "M"
+    assert tab.a.s.dtype.kind == "U"
+    # Missing values make an int column float.
+    assert tab.a.n.dtype == np.float64
+
+    assert list(tab.a.i) == [1, 2, 3]
+    assert np.array_equal(tab.a.x, [1.5, np.nan, -2500], equal_nan=True)
+    assert list(tab.a.b) == [True, False, True]
+    assert tab.a.t[1] == np.datetime64("2020-01-02T12:30")
+    assert np.isnat(tab.a.t[2])
+    assert list(tab.a.s) == ["foo", "bar", "baz, bif"]
+    assert np.array_equal(tab.a.n, [3, np.nan, 5], equal_nan=True)
+
+
+def test_load_csv_dtypes():
+    tab = io.load_csv(
+        CSV.splitlines(),
+        dtypes=dict(i="int8", x="float32", n="int32", s=object))
+    assert tab.a.i.dtype == np.int8
+    assert tab.a.x.dtype == np.float32
+    assert tab.a.s.dtype == object
+    assert tab.a.n.dtype == np.int32
+    assert tab.a.n[1] == np.iinfo(np.int32).min
+    assert list(tab.a.s) == ["foo", "bar", "baz, bif"]
+
+    with pytest.raises(ValueError):
+        io.load_csv(CSV.splitlines(), dtypes=dict(s=float))
+
+
+def test_load_csv_promote():
+    lines = ["x,y,z"] + [ f"{i},{i},{i}" for i in range(10) ]
+    lines += ["2.5,3,foo", "3,3,4"]
+    tab = io.load_csv(lines, block_rows=4, sample_rows=2)
+    assert tab.a.x.dtype == np.float64
+    assert list(tab.a.x) == list(range(10)) + [2.5, 3]
+    assert tab.a.y.dtype == np.int64
+    assert tab.a.z.dtype.kind == "U"
+    assert list(tab.a.z) == [ str(i) for i in range(10) ] + ["foo", "4"]
+
+
+def test_load_csv_empty():
+    tab = io.load_csv(["x,y"])
+    assert tab.names == ["x", "y"]
+    assert tab.num_rows == 0
+
+
+def test_load_csv_file(tmpdir):
+    path = tmpdir / "test.csv"
+    with open(path, "w") as file:
+        file.write(CSV)
+    tab = io.load_csv_file(path, dtypes=dict(i=float))
+    assert tab.num_rows == 3
+    assert list(tab.a.i) == [1.0, 2.0, 3.0]
+
+
+def test_load_csv_quoted_newline():
+    lines = 'x,s\n1,"foo\nbar"\n\n2,"a ""quoted"" word"\n3,baz\n'
+    tab = io.load_csv(lines.splitlines(keepends=True), block_rows=1)
+    assert list(tab.a.x) == [1, 2, 3]
+    assert list(tab.a.s) == ["foo\nbar", 'a "quoted" word', "baz"]
+
+
+@pytest.mark.parametrize("num_procs", [1, 2, 3, 8])
+def test_load_csv_file_parallel(tmpdir, num_procs):
+    path = tmpdir / "test.csv"
+    with open(path, "w") as file:
+        file.write("i,x,s,n\n")
+        for i in range(1000):
+            # Include quoted fields spanning lines, that might straddle
+            # partition boundaries.
+            s = f'"line {i}\n""next"" line"' if i % 7 == 0 else f"s{i}"
+            # A column whose dtype is promoted only in the middle of the file.
+            n = "foo" if i == 500 else str(i)
+            file.write(f"{i},{i / 4},{s},{n}\n")
+
+    tab = io.load_csv_file(path, num_procs=num_procs, sample_rows=10)
+    assert tab.names == ["i", "x", "s", "n"]
+    assert tab.num_rows == 1000
+    assert list(tab.a.i) == list(range(1000))
+    assert list(tab.a.x) == [ i / 4 for i in range(1000) ]
+    assert tab.a.s[7] == 'line 7\n"next" line'
+    assert tab.a.s[8] == "s8"
+    assert tab.a.n.dtype.kind == "U"
+    assert tab.a.n[499] == "499"
+    assert tab.a.n[500] == "foo"
+
+
+@pytest.mark.parametrize("num_procs", [1, 2])
+def test_load_csv_file_control_chars(tmpdir, num_procs):
+    path = tmpdir / "test.csv"
+    with open(path, "w", newline="") as file:
+        file.write("x,s\n")
+        for i in range(20):
+            # Characters that str.splitlines() would split on.
+            file.write(f"{i},a\x0cb\x0bc\x1cd\x85e\u2028f\n")
+    tab = io.load_csv_file(path, num_procs=num_procs)
+    assert list(tab.a.x) == list(range(20))
+    assert tab.a.s[19] == "a\x0cb\x0bc\x1cd\x85e\u2028f"
+
+
+def test_load_csv_file_parallel_empty(tmpdir):
+    path = tmpdir / "test.csv"
+    with open(path, "w") as file:
+        file.write("x,y\n")
+    tab = io.load_csv_file(path, num_procs=4)
+    assert tab.names == ["x", "y"]
+    assert tab.num_rows == 0
+
+
+def test_iter_csv(tmpdir):
+    path = tmpdir / "test.csv"
+    with open(path, "w") as file:
+        file.write("i,x,s\n")
+        for i in range(10):
+            file.write(f"{i},{i / 2},{'x' * i}\n")
+
+    tabs = list(io.iter_csv(path, chunk_rows=4))
+    assert [ t.num_rows for t in tabs ] == [4, 4, 2]
+    for tab in tabs:
+        assert tab.names == ["i", "x", "s"]
+        assert tab.a.i.dtype == np.int64
+        assert tab.a.x.dtype == np.float64
+        assert tab.a.s.dtype == object
+    assert [ i for t in tabs for i in t.a.i ] == list(range(10))
+    assert tabs[2].a.s[1] == "x" * 9
+
+
+def test_iter_csv_bad(tmpdir):
+    path = tmpdir / "test.csv"
+    with open(path, "w") as file:
+        file.write("i,x\n1,2\n3,4\n5,foo\n")
+
+    tabs = io.iter_csv(path, chunk_rows=2)
+    tab = next(tabs)
+    assert list(tab.a.x) == [2, 4]
+    with pytest.raises(ValueError):
+        next(tabs)
+
+    # A missing value in a later chunk of an inferred int column.
+    with open(path, "w") as file:
+        file.write("i,b\n1,true\n2,false\n,true\n4,\n")
+    tabs = io.iter_csv(path, chunk_rows=2)
+    assert list(next(tabs).a.i) == [1, 2]
+    with pytest.raises(ValueError):
+        next(tabs)
+
+    # With a given dtype, the default value is filled in.
+    tabs = list(io.iter_csv(path, chunk_rows=2, dtypes=dict(i=int, b=bool)))
+    assert list(tabs[1].a.i) == [np.iinfo(int).min, 4]
+
+
+def test_iter_csv_datetime(tmpdir):
+    path = tmpdir / "test.csv"
+    with open(path, "w") as file:
+        file.write("t,x\n2020-01-01,1\n2020-01-02,2\n2020-01-03,3\n,4\n")
+    tabs = list(io.iter_csv(path, chunk_rows=2))
+    assert [ t.a.t.dtype for t in tabs ] == [np.dtype("M8[D]")] * 2
+    assert str(tabs[1].a.t[0]) == "2020-01-03"
+    assert np.isnat(tabs[1].a.t[1])
+
+    # A finer datetime in a later chunk isn't truncated.
+    with open(path, "w") as file:
+        file.write("t\n2020-01-01\n2020-01-02\n2020-01-01T12:34\n")
+    tabs = io.iter_csv(path, chunk_rows=2)
+    assert next(tabs).a.t.dtype == np.dtype("M8[D]")
+    with pytest.raises(ValueError):
+        next(tabs)
+
+
+def test_dump_csv(tmpdir, tab, check):
+    tab.remove("o")
+    path = tmpdir / "test.csv"
+    io.dump_csv_file(tab, path)
+    res = io.load_csv_file(path)
+
+    check(res)
+    assert res.names == tab.names
+    assert res.a.t.dtype.kind == "M"
+
+
+def test_dump_csv_options():
+    import csv
+    import io as _io
+
+    tab = Table(
+        x=[1 / 3, 2.5],
+        s=['a,b', 'say "hi"'],
+        t=np.array(["2020-01-01T12:34:56", "2021-02-03"], dtype="M8[s]"),
+    )
+
+    def dump(**kw_args):
+        file = _io.StringIO()
+        io.dump_csv(tab, file, **kw_args)
+        return file.getvalue().splitlines()
+
+    assert dump() == [
+        "x,s,t",
+        '0.3333333333333333,"a,b",2020-01-01T12:34:56',
+        '2.5,"say ""hi""",2021-02-03T00:00:00',
+    ]
+    assert dump(float_precision=2, datetime_unit="D")[1 :] == [
+        '0.33,"a,b",2020-01-01',
+        '2.50,"say ""hi""",2021-02-03',
+    ]
+    assert dump(quoting=csv.QUOTE_ALL)[1] \
+        == '"0.3333333333333333","a,b","2020-01-01T12:34:56"'
+    with pytest.raises(ValueError):
+        dump(quoting=csv.QUOTE_NONE)
+
+    # Strings and datetimes are quoted as csv.writer quotes them.
+    tab = Table(
+        o=np.array([None, "x"], dtype=object),
+        i=[1, 2],
+        t=np.array(["2020-01-01", "NaT"], dtype="M8[D]"),
+    )
+    for quoting in (csv.QUOTE_MINIMAL, csv.QUOTE_NONNUMERIC, csv.QUOTE_ALL):
+        file = _io.StringIO()
+        writer = csv.writer(file, quoting=quoting, lineterminator="\n")
+        writer.writerow(tab.names)
+        writer.writerows(
+            (o, i, str(t)) for o, i, t in zip(tab.a.o, tab.a.i, tab.a.t))
+        assert dump(quoting=quoting) == file.getvalue().splitlines()
+
+
+def test_dump_csv_one_col(tmpdir):
+    import csv
+    import io as _io
+
+    tab = Table(s=np.array(["a", "", None, "b"], dtype=object))
+    file = _io.StringIO()
+    io.dump_csv(tab, file)
+    assert file.getvalue().splitlines() == ["s", "a", '""', '""', "b"]
+    file.seek(0)
+    assert list(io.load_csv(file).a.s) == ["a", "", "", "b"]
+
+    path = tmpdir / "test.csv"
+    io.dump_csv_file(tab, path)
+    assert list(io.load_csv_file(path).a.s) == ["a", "", "", "b"]
+    with pytest.raises(ValueError):
+        io.dump_csv(tab, _io.StringIO(), quoting=csv.QUOTE_NONE)
+
+
+def test_dump_csv_blocks():
+    import io as _io
+
+    tab = Table(i=np.arange(10), s=[ f"s,{i}" for i in range(10) ])
+    file = _io.StringIO()
+    io.dump_csv(tab, file, block_rows=3)
+    file.seek(0)
+    res = io.load_csv(file)
+    assert list(res.a.i) == list(range(10))
+    assert list(res.a.s) == list(tab.a.s)
+
+
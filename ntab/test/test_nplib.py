@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from   ntab import nplib
+
+#-------------------------------------------------------------------------------
+
+def test_prepare_idxs():
+    assert nplib.prepare_idxs([], 5) == slice(0, 0)
+    assert nplib.prepare_idxs([1, 2, 3], 5) == slice(1, 4)
+    assert nplib.prepare_idxs([-2, -1], 5) == slice(3, 5)
+    assert list(nplib.prepare_idxs([4, -5, 2], 5)) == [4, 0, 2]
+    with pytest.raises(IndexError):
+        nplib.prepare_idxs([0, 5], 5)
+    with pytest.raises(IndexError):
+        nplib.prepare_idxs([-6], 5)
+
+
+def test_take_arrs_struct():
+    recs = np.array(
+        [(i, 2.5 * i, str(i)) for i in range(10)],
+        dtype=[("i", "i8"), ("x", "f8"), ("s", "U4")]
+    )
+    arrs = { n: recs[n] for n in recs.dtype.names }
+    arrs["c"] = np.arange(10) * 10
+    idxs = nplib.prepare_idxs([7, 2, 2, 9], 10)
+
+    taken = nplib.take_arrs(arrs, idxs)
+    assert list(taken) == ["i", "x", "s", "c"]
+    assert list(taken["i"]) == [7, 2, 2, 9]
+    assert list(taken["x"]) == [17.5, 5.0, 5.0, 22.5]
+    assert list(taken["s"]) == ["7", "2", "2", "9"]
+    assert list(taken["c"]) == [70, 20, 20, 90]
+    # Fields of the same structured array were gathered together.
+    assert np.may_share_memory(taken["i"], taken["s"])
+
+
+def test_take_arrs_object():
+    arrs = dict(
+        o=np.array([None, "foo", 3, 4.5], dtype=object),
+        x=np.arange(4.0)[::-1],
+    )
+    taken = nplib.take_arrs(arrs, nplib.prepare_idxs([3, 1], 4))
+    assert list(taken["o"]) == [4.5, "foo"]
+    assert list(taken["x"]) == [0.0, 2.0]
+
+
+def _check_factorize(arr, unique):
+    codes, u = nplib.factorize(arr)
+    assert list(u) == unique
+    assert codes.dtype == np.intp
+    assert list(u[codes]) == list(arr)
+    assert u.dtype == arr.dtype
+
+
+def test_factorize():
+    _check_factorize(np.array(["foo", "bar", "", "foo", "bar"]), ["", "bar", "foo"])
+    _check_factorize(np.array([b"xy", b"x", b"xy"]), [b"x", b"xy"])
+    _check_factorize(np.array([9, -3, 9, 4, -3]), [-3, 4, 9])
+    _check_factorize(np.array([3, 1, 3], dtype=np.uint8), [1, 3])
+    _check_factorize(np.array([True, False, True]), [False, True])
+    # Too sparse to index directly.
+    _check_factorize(np.array([10**12, 0, 10**12]), [0, 10**12])
+    _check_factorize(np.array([2.5, np.inf, 2.5]), [2.5, np.inf])
+    _check_factorize(np.array([], dtype="U3"), [])
+
+
+def test_factorize_objs():
+    _check_factorize(np.array(["b", "a", "b"], dtype=object), ["a", "b"])
+    # Unhashable objects.
+    arr = np.empty(3, dtype=object)
+    arr[:] = [[2], [1], [2]]
+    _check_factorize(arr, [[1], [2]])
+
+
+def test_argunique_fast():
+    arr = np.array(["c", "a", "c", "b", "a", "c"])
+    order, unique, edge = nplib.argunique(arr)
+    assert list(unique) == ["a", "b", "c"]
+    assert list(order) == [1, 4, 3, 0, 2, 5]
+    assert list(edge) == [0, 2, 3, 6]
+
+
+def test_expand_ranges():
+    res = nplib.expand_ranges(np.array([3, 7, 0, 1]), np.array([2, 0, 1, 3]))
+    assert list(res) == [3, 4, 0, 1, 2, 3]
+    assert len(nplib.expand_ranges(np.array([4]), np.array([0]))) == 0
+
+
+def test_take_fill():
+    arr = np.array([1.5, 2.5, 3.5])
+    res = nplib.take_fill(arr, np.array([2, -1, 0]))
+    assert list(res[[0, 2]]) == [3.5, 1.5]
+    assert np.isnan(res[1])
+    res = nplib.take_fill(np.array([], dtype="U3"), np.array([-1, -1]))
+    assert list(res) == ["", ""]
+
+
+def test_factorize_keys():
+    codes, num = nplib.factorize_keys([
+        np.array([2, 1, 2, 1, 2]),
+        np.array(["b", "a", "a", "a", "b"]),
+    ])
+    assert num == 3
+    assert list(codes) == [2, 0, 1, 0, 2]
+
+
+@pytest.mark.parametrize("arr", [
+    np.array([5, -3, 5, 2, -3, 9]),
+    np.array([3, 1, 3, 0], dtype=np.uint8),
+    np.array([2**62, 0, 2**62, -2**62]),
+    np.array(["2020-01-02", "NaT", "2020-01-01", "2020-01-02"], dtype="M8[D]"),
+    np.array([2.5, np.nan, 1.0, 2.5]),
+    np.array([], dtype=int),
+])
+def test_argsort_stable(arr):
+    assert list(nplib.argsort_stable(arr)) == list(np.argsort(arr, kind="stable"))
+
+
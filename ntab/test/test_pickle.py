@@ -1,3 +1,4 @@
+import numpy as np
 from   pathlib import Path
 import pickle
 import pytest
@@ -22,3 +23,36 @@ def test_pickle0(tmpdir, protocol):
     assert sorted(tab.names) == ["x", "y", "z"]
 
 
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle_dtypes(protocol, tab, check):
+    check(pickle.loads(pickle.dumps(tab, protocol=protocol)))
+
+
+@pytest.mark.skipif(pickle.HIGHEST_PROTOCOL < 5, reason="no protocol 5")
+def test_pickle_out_of_band(tab, check):
+    bufs = []
+    data = pickle.dumps(tab, protocol=5, buffer_callback=bufs.append)
+    # All columns except the object column are out-of-band.
+    assert len(bufs) == 6
+    assert len(data) < 512
+
+    res = pickle.loads(data, buffers=bufs)
+    check(res)
+    # The arrays share the buffers' memory.
+    assert np.shares_memory(res.a.y, np.asarray(bufs[1]))
+
+
+def test_pickle_subtable():
+    tab = Table(x=np.arange(1000), y=np.arange(1000.0))
+    sub = tab.rows[[5, 1, 3]]
+    res = pickle.loads(pickle.dumps(sub))
+    assert list(res.a.x) == [5, 1, 3]
+    assert list(res.a.y) == [5.0, 1.0, 3.0]
+
+
+def test_pickle_sorted():
+    tab = Table(x=[3, 1, 2], y=[4, 5, 6])
+    tab.sort_by("x")
+    res = pickle.loads(pickle.dumps(tab))
+    assert res.sorted_by == ("x", )
+    assert list(res.a.y) == [5, 6, 4]
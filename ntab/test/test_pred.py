@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from   ntab import Table, fn, pred
+
+#-------------------------------------------------------------------------------
+
+@pytest.mark.parametrize(
+    "arr, p, expected",
+    [
+        ([1, 2, 3, 2], pred.Eq(2), [0, 1, 0, 1]),
+        ([1, 2, 3, 2], pred.Ne(2), [1, 0, 1, 0]),
+        ([1, 2, 3], pred.Eq("a"), [0, 0, 0]),
+        ([1, 2, 3], pred.Ne("a"), [1, 1, 1]),
+        (["a", "b"], pred.Eq(1), [0, 0]),
+        (["a", "b"], pred.Ne(1), [1, 1]),
+        ([1, 2, 3, 4], pred.Between(2, 4), [0, 1, 1, 0]),
+        ([1, 2, 3, 4], pred.Between(hi=3), [1, 1, 0, 0]),
+        ([1, 2, 3, 4], pred.Between(lo=3), [0, 0, 1, 1]),
+        ([1, 2, 3, 4], pred.IsIn([4, 1, 9]), [1, 0, 0, 1]),
+        (list(range(12)), pred.IsIn(range(1, 20, 2)), [0, 1] * 6),
+        ([1.0, np.nan, 3.0], pred.IsNan(), [0, 1, 0]),
+        ([1.0, np.nan, 3.0], pred.NotNan(), [1, 0, 1]),
+        ([1, 2, 3], pred.IsNan(), [0, 0, 0]),
+        (["foo", "fo", "bar", "food"], pred.StartsWith("foo"), [1, 0, 0, 1]),
+        ([b"foo", b"fo", b"bar"], pred.StartsWith(b"fo"), [1, 1, 0]),
+        (["ab", "cd"], pred.StartsWith(""), [1, 1]),
+        (["ab", "cd"], pred.StartsWith("abc"), [0, 0]),
+        (np.array(["foo", 1, "bar"], dtype=object), pred.StartsWith("f"), [1, 0, 0]),
+    ]
+)
+def test_mask(arr, p, expected):
+    res = p.mask(np.asarray(arr))
+    assert res.dtype == bool
+    assert list(res) == [ bool(e) for e in expected ]
+
+
+def test_isnat():
+    arr = np.array(["2020-01-01", "NaT"], dtype="datetime64[D]")
+    assert list(pred.IsNan().mask(arr)) == [False, True]
+    assert list(pred.NotNan().mask(arr)) == [True, False]
+
+
+def test_filter_blocks(monkeypatch):
+    monkeypatch.setattr(fn, "FILTER_BLOCK_ROWS", 7)
+    rng = np.random.default_rng(0)
+    x = rng.integers(0, 10, 100)
+    y = rng.normal(size=100)
+    s = rng.choice(["apple", "banana", "cherry"], 100)
+    y[::9] = np.nan
+    tab = Table(x=x, y=y, s=s)
+
+    mask = fn.filter_mask(
+        tab,
+        x=pred.Between(2, 8),
+        y=pred.NotNan(),
+        s=pred.IsIn(["apple", "cherry"]),
+    )
+    expected = (2 <= x) & (x < 8) & ~np.isnan(y) & ((s == "apple") | (s == "cherry"))
+    assert (mask == expected).all()
+
+    # A selection that no row matches.
+    assert not fn.filter_mask(tab, x=pred.Eq(20), s="apple").any()
+    assert fn.filter_mask(tab).all()
+
+
+def test_filter_sorted_between():
+    tab = Table(x=[1, 1, 2, 2, 2, 3], y=[1, 2, 3, 4, 5, 6])
+    tab.sort_by("x", "y")
+    assert list(fn.filter(tab, x=2, y=pred.Between(4, 9)).a.y) == [4, 5]
+    assert list(fn.filter(tab, x=pred.Between(2)).a.y) == [3, 4, 5, 6]
+    assert list(fn.filter(tab, x=pred.Eq(1), y=pred.Ne(1)).a.y) == [2]
+    assert fn.find(tab, x=pred.Between(3, 4)).y == 6
+
+
+def test_filter_grouped():
+    tab = Table(x=[1, 2, 1, 2, 1], y=[5, 6, 7, 8, 9])
+    tab.create_index("x")
+    assert list(fn.filter(tab, x=pred.Eq(1), y=pred.Between(6, 9)).a.y) == [7]
+    assert list(fn.filter(tab, x=pred.Ne(1), y=pred.Between(6, 9)).a.y) == [6, 8]
+
+
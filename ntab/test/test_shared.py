@@ -0,0 +1,66 @@
+import multiprocessing
+import numpy as np
+import pickle
+import pytest
+
+from   ntab import Table
+from   ntab import shared
+
+#-------------------------------------------------------------------------------
+
+@pytest.fixture
+def shared_tab(tab):
+    # Object columns can't be shared.
+    tab.remove("o")
+    return tab
+
+
+def test_attach(shared_tab, check):
+    with shared_tab.to_shared() as handle:
+        handle = pickle.loads(pickle.dumps(handle))
+        tab = Table.attach(handle)
+        check(tab)
+        assert all(
+            tab.arrs[n].dtype == a.dtype for n, a in shared_tab.arrs.items() )
+
+        # Both tables are in the same memory.
+        other = Table.attach(handle)
+        other.a.x[3] = -1
+        assert tab.a.x[3] == -1
+
+        # Can't close while arrays are in use.
+        with pytest.raises(BufferError):
+            handle.close()
+        del tab, other
+
+
+def _sum_x(handle):
+    with handle:
+        tab = Table.attach(handle)
+        result = tab.a.x.sum()
+        del tab
+    return result
+
+
+def test_attach_process(shared_tab, check):
+    with shared_tab.to_shared() as handle:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(2) as pool:
+            assert pool.map(_sum_x, [handle] * 2) == [33, 33]
+        # Workers' handles didn't unlink the block.
+        check(Table.attach(handle))
+
+
+def test_object():
+    with pytest.raises(TypeError):
+        Table(o=np.array([None, 1], dtype=object)).to_shared()
+
+
+def test_empty():
+    with Table(x=np.array([], dtype=float)).to_shared() as handle:
+        tab = Table.attach(handle)
+        assert tab.names == ["x"]
+        assert tab.num_rows == 0
+        del tab
+
+
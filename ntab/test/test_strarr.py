@@ -0,0 +1,174 @@
+import numpy as np
+import pickle
+import pytest
+
+from   ntab import Table, GroupBy, StrArray, fn, nplib, pred, strarr
+
+#-------------------------------------------------------------------------------
+
+STRS = ["foo", "bär", "", "foo", "quux", "a\0", "a", "日本語", "bär"]
+
+def _random_strs(num, seed=0):
+    rng = np.random.default_rng(seed)
+    alphabet = ["a", "b", "\0", "é", "字"]
+    return [
+        "".join(rng.choice(alphabet, rng.integers(0, 40)))
+        for _ in range(num)
+    ]
+
+
+def test_basic():
+    arr = StrArray(STRS)
+    assert len(arr) == len(STRS)
+    assert arr.shape == (len(STRS), )
+    assert list(arr) == STRS
+    assert arr.tolist() == STRS
+    assert arr[1] == "bär"
+    assert arr[-2] == "日本語"
+    with pytest.raises(IndexError):
+        arr[len(STRS)]
+    assert list(arr.lengths) == [ len(s.encode()) for s in STRS ]
+    assert arr.nbytes < np.array(STRS).nbytes
+
+    obj = np.asarray(arr)
+    assert obj.dtype == object
+    assert list(obj) == STRS
+    # Numpy strips trailing NULs.
+    assert list(StrArray(np.array(STRS))) == np.array(STRS).tolist()
+    assert list(StrArray(arr)) == STRS
+    with pytest.raises(TypeError):
+        StrArray([1, 2])
+
+
+def test_select():
+    arr = StrArray(STRS)
+    view = arr[2 : 6]
+    assert list(view) == STRS[2 : 6]
+    # A slice shares the buffer.
+    assert view.data is arr.data
+    assert list(arr[5 : 2]) == []
+    assert list(arr[:: 3]) == STRS[:: 3]
+    assert list(arr[[8, 0, -1]]) == ["bär", "foo", "bär"]
+    mask = np.array([ len(s) > 2 for s in STRS ])
+    assert list(arr[mask]) == [ s for s in STRS if len(s) > 2 ]
+    assert list(view.take([3, 0])) == ["a\0", ""]
+    assert list(view.take_fill([1, -1, 0])) == ["foo", "", ""]
+    with pytest.raises(IndexError):
+        arr.take([9])
+    # Pickling copies only the view's strings.
+    res = pickle.loads(pickle.dumps(view))
+    assert list(res) == STRS[2 : 6]
+    assert len(res.data) == view.nbytes - view.offsets.nbytes
+
+
+@pytest.mark.parametrize("max_short", [0, 32])
+def test_equal(max_short, monkeypatch):
+    monkeypatch.setattr(strarr, "MAX_SHORT_BYTES", max_short)
+    strs = _random_strs(500)
+    arr = StrArray(strs)
+    obj = np.array(strs, dtype=object)
+    for value in ["", "a", strs[3], "zzz"]:
+        assert ((arr == value) == (obj == value)).all()
+        assert ((arr != value) == (obj != value)).all()
+        assert (np.equal(arr, value) == (obj == value)).all()
+        assert (np.not_equal(value, arr) == (obj != value)).all()
+        out = np.empty(len(arr), dtype=bool)
+        np.equal(arr, value, out=out)
+        assert (out == (obj == value)).all()
+
+    other = strs[250 :] + strs[: 250]
+    expected = obj == np.array(other, dtype=object)
+    assert ((arr == StrArray(other)) == expected).all()
+    assert ((arr == np.array(other)) == expected).all()
+    assert (arr[:: -1] == arr[:: -1]).all()
+
+    for prefix in ["", "a", "ab", "字"]:
+        expected = [ s.startswith(prefix) for s in strs ]
+        assert list(arr.startswith(prefix)) == expected
+
+
+@pytest.mark.parametrize("block", [4, 1 << 16])
+def test_factorize(block, monkeypatch):
+    monkeypatch.setattr(strarr, "HASH_BLOCK_BYTES", block)
+    strs = _random_strs(1000) + STRS
+    codes, unique = nplib.factorize(StrArray(strs))
+    assert isinstance(unique, StrArray)
+    assert list(unique) == sorted(set(strs))
+    assert [ unique[c] for c in codes ] == strs
+
+
+@pytest.mark.parametrize("max_short", [0, 32])
+def test_distinct(max_short, monkeypatch):
+    monkeypatch.setattr(strarr, "MAX_SHORT_BYTES", max_short)
+    # All strings distinct.
+    codes, unique = StrArray(["b", "a", "c"]).factorize()
+    assert list(codes) == [1, 0, 2]
+    assert list(unique) == ["a", "b", "c"]
+    codes, unique = StrArray([]).factorize()
+    assert len(codes) == 0 and len(unique) == 0
+    # No pair of strings with equal lengths.
+    assert list(StrArray(["a"]) == StrArray(["bb"])) == [False]
+    assert list(StrArray(["a", "bb"]) != StrArray(["cc", "d"])) == [True, True]
+
+    tab = Table(s=StrArray(["b", "a", "c"]), x=[0, 1, 2])
+    assert list(GroupBy(tab, "s").keys()) == ["a", "b", "c"]
+    tab.sort_by("s")
+    assert list(tab.a.x) == [1, 0, 2]
+
+
+def test_factorize_collision(monkeypatch):
+    monkeypatch.setattr(
+        StrArray, "hash", lambda self: np.zeros(len(self), dtype=np.uint64))
+    codes, unique = StrArray(STRS).factorize()
+    assert list(unique) == sorted(set(STRS))
+    assert [ unique[c] for c in codes ] == STRS
+
+
+def test_table():
+    tab = Table(s=StrArray(STRS), x=np.arange(len(STRS)))
+    assert list(fn.filter(tab, s="bär").a.x) == [1, 8]
+    assert list(fn.filter(tab, s=pred.StartsWith("a"), x=pred.Ne(6)).a.x) == [5]
+    assert fn.find(tab, s="quux").x == 4
+    assert tab.rows[7].s == "日本語"
+    assert isinstance(tab.rows[2 : 5].arrs["s"], StrArray)
+
+    group_by = GroupBy(tab, "s")
+    assert list(group_by.keys()) == sorted(set(STRS))
+    assert list(group_by.counts()) == [1, 1, 1, 2, 2, 1, 1]
+
+    tab.sort_by("s")
+    assert list(tab.arrs["s"]) == sorted(STRS)
+    assert list(fn.filter(tab, s="foo").a.x) == [0, 3]
+
+    res = pickle.loads(pickle.dumps(tab, protocol=5))
+    assert isinstance(res.arrs["s"], StrArray)
+    assert list(res.arrs["s"]) == sorted(STRS)
+
+    other = Table(s=StrArray(["foo", "zzz"]), y=[1, 2])
+    res = fn.join(other, tab, "s", how="left")
+    assert list(res.arrs["s"]) == ["foo", "foo", "zzz"]
+
+
+def test_table_ops():
+    tab = Table(s=StrArray(STRS), x=np.arange(len(STRS)))
+    res = fn.top_k(tab, "s", 3)
+    assert isinstance(res.arrs["s"], StrArray)
+    assert list(res.arrs["s"]) == sorted(STRS, reverse=True)[: 3]
+    assert list(fn.top_k(tab, "s", 2, largest=False).a.x) == [2, 6]
+    res = fn.top_k(tab, "x", 1, by="s")
+    assert list(res.arrs["s"]) == sorted(set(STRS))
+    assert list(res.a.x) == [2, 6, 5, 8, 3, 4, 7]
+
+    res = fn.concat(tab, tab.rows[: 2], tab.rows[: 0])
+    assert isinstance(res.arrs["s"], StrArray)
+    assert list(res.arrs["s"]) == STRS + STRS[: 2]
+
+    other = Table(s=StrArray(["foo", "zzz"]), y=[1, 2])
+    for how in ("inner", "left", "outer"):
+        res = fn.join(other, tab, "s", how=how)
+        assert isinstance(res.arrs["s"], StrArray)
+    assert list(res.arrs["s"]) == ["foo", "foo", "zzz"] + [
+        s for s in STRS if s not in ("foo", "zzz") ]
+
+
+
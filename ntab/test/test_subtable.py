@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+#-------------------------------------------------------------------------------
+
+def test_mask(tab):
+    sub = tab.rows[tab.a.x % 2 == 0]
+    assert sub.num_rows == 3
+    assert sub.names == tab.names
+    assert list(sub.a.x) == [4, 6, 8]
+    assert list(sub.a.s) == ["b", "d", "f"]
+
+
+def test_idxs(tab):
+    sub = tab.rows[[5, 0, -2]]
+    assert sub.num_rows == 3
+    assert list(sub.a.x) == [8, 3, 7]
+    assert list(sub.a.y) == [6.5, 1.5, 5.5]
+
+
+def test_slice(tab):
+    sub = tab.rows[1 : 5 : 2]
+    assert sub.num_rows == 2
+    assert list(sub.a.x) == [4, 6]
+    # Slices are views.
+    assert np.shares_memory(sub.a.x, tab.a.x)
+
+
+def test_lazy(tab):
+    sub = tab.rows[tab.a.x > 4]
+    cols = sub._Table__arrs.cols
+    assert all( i is not None for _, i in cols.values() )
+
+    assert list(sub.a.y) == [3.5, 4.5, 5.5, 6.5]
+    assert cols["y"][1] is None
+    assert cols["x"][1] is not None
+    assert cols["s"][1] is not None
+
+
+def test_chained(tab):
+    sub0 = tab.rows[tab.a.x > 3]
+    assert list(sub0.a.x) == [4, 5, 6, 7, 8]
+
+    sub1 = sub0.rows[[True, False, True, False, True]]
+    assert sub1.num_rows == 3
+    assert list(sub1.a.x) == [4, 6, 8]
+    assert list(sub1.a.s) == ["b", "d", "f"]
+    # Ungathered columns compose their selections, and still refer to the
+    # original arrays.
+    arr, idxs = sub1._Table__arrs.cols["y"]
+    assert arr is tab.a.y
+    assert list(idxs) == [1, 3, 5]
+
+    sub2 = sub1.rows[1 :]
+    assert list(sub2.a.y) == [4.5, 6.5]
+    assert list(sub2.rows[::-1].a.s) == ["f", "d"]
+
+
+def test_modify(tab):
+    names = tab.names
+    sub = tab.rows[[1, 2]]
+    sub.a.n = [10, 20]
+    del sub.a.y
+    assert sub.names == [ n for n in names if n != "y" ] + ["n"]
+    assert list(sub.a.n) == [10, 20]
+    assert tab.names == names
+
+
+def test_bad_sel(tab):
+    with pytest.raises(IndexError):
+        tab.rows[[0, 6]]
+    with pytest.raises(IndexError):
+        tab.rows[[True, False]]
+    with pytest.raises(IndexError):
+        tab.rows[[0.5, 1.5]]
+
+
+def test_empty_sel(tab):
+    sub = tab.rows[[]]
+    assert sub.num_rows == 0
+    assert len(sub.a.x) == 0
+    assert sub.a.x.dtype == tab.a.x.dtype
+
+
+def test_consecutive(tab):
+    # A consecutive run of rows is gathered by slicing, but copied.
+    sub = tab.rows[[2, 3, 4]]
+    assert list(sub.a.x) == [5, 6, 7]
+    assert not np.shares_memory(sub.a.x, tab.a.x)
+    sub = tab.rows[tab.a.x > 5]
+    sub.a.x[:] = 0
+    assert list(tab.a.x) == [3, 4, 5, 6, 7, 8]
+    sub = tab._take_rows([3, 4, 5])
+    sub.a.y[:] = 0
+    assert list(tab.a.y) == [1.5, 2.5, 3.5, 4.5, 5.5, 6.5]
+    # Chained selections of runs compose.
+    sub = tab.rows[[1, 2, 3, 4]].rows[[False, True, True, False]]
+    assert list(sub.a.s) == ["c", "d"]
+    assert list(tab.rows[[1, 2, 3]]._take_rows([2, 0]).a.x) == [6, 4]
+    # Columns that share a run share its composition with a further selection.
+    sub = tab.rows[[1, 2, 3, 4]].rows[[3, 0]]
+    cols = sub._Table__arrs.cols
+    assert cols["x"][1] is cols["y"][1] is cols["s"][1]
+    assert list(sub.a.x) == [7, 4]
+
+
+def test_take_rows(tab):
+    sub = tab._take_rows([4, 1, 1])
+    assert list(sub.a.x) == [7, 4, 4]
+    assert list(sub.a.s) == ["e", "b", "b"]
+
+    sub = tab.rows[tab.a.x != 4]._take_rows([-1, 0])
+    assert list(sub.a.y) == [6.5, 1.5]
+
+